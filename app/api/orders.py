@@ -3,9 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from app.models.schemas import OrderCreate, OrderResponse
 from app.core.order_manager import OrderManager
-from app.core.angel_client import AngelOneClient  # Add this import
-from app.core.risk_manager import RiskManager
-from app.dependencies import get_db, get_current_user, get_angel_client
+from app.dependencies import get_db, get_current_user, get_order_manager
 import structlog
 from sqlalchemy.future import select  # Add for database queries
 
@@ -17,10 +15,9 @@ async def create_order(
     order: OrderCreate,
     db: AsyncSession = Depends(get_db),
     user: str = Depends(get_current_user),
-    angel_client: AngelOneClient = Depends(get_angel_client)
+    order_manager: OrderManager = Depends(get_order_manager)
 ):
     """Create a new order"""
-    order_manager = OrderManager(angel_client, RiskManager())
     result = await order_manager.place_order(order, db)
     
     if not result['success']:
@@ -37,10 +34,9 @@ async def create_order(
 async def get_orders(
     db: AsyncSession = Depends(get_db),
     user: str = Depends(get_current_user),
-    angel_client: AngelOneClient = Depends(get_angel_client)
+    order_manager: OrderManager = Depends(get_order_manager)
 ):
     """Get all orders"""
-    order_manager = OrderManager(angel_client, RiskManager())
     orders = await order_manager.get_pending_orders()
     return [OrderResponse(**order['order'].dict()) for order in orders]
 
@@ -49,10 +45,9 @@ async def cancel_order(
     order_id: str,
     db: AsyncSession = Depends(get_db),
     user: str = Depends(get_current_user),
-    angel_client: AngelOneClient = Depends(get_angel_client)
+    order_manager: OrderManager = Depends(get_order_manager)
 ):
     """Cancel an order"""
-    order_manager = OrderManager(angel_client, RiskManager())
     result = await order_manager.cancel_order(order_id, db)
     
     if not result['success']:
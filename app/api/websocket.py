@@ -1,5 +1,6 @@
 from fastapi import APIRouter, WebSocket, Depends
 from app.core.websocket_handler import WebSocketHandler
+from app.core.tick_queue import DeliveryMode
 from app.dependencies import get_current_user, get_angel_client
 import structlog
 from app.core.angel_client import AngelOneClient
@@ -23,7 +24,7 @@ async def websocket_endpoint(
         except Exception as e:
             logger.error(f"WebSocket send error: {str(e)}")
     
-    ws_handler.add_callback(f"ws_{user}", ws_callback)
+    ws_handler.add_callback(f"ws_{user}", ws_callback, mode=DeliveryMode.CONFLATE)
     
     try:
         while True:
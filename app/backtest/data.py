@@ -0,0 +1,60 @@
+# app/backtest/data.py
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Union
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.price_history import HistoryWindow, COLUMNS
+from app.models.database import MarketData
+
+def history_from_arrays(timestamp, open_, high, low, close, volume=None) -> HistoryWindow:
+    """Wrap OHLCV arrays as the HistoryWindow strategies read"""
+    close = np.asarray(close, dtype=np.float64)
+    volume = np.zeros(len(close)) if volume is None else volume
+    block = np.vstack([np.asarray(c, dtype=np.float64) for c in (timestamp, open_, high, low, close, volume)])
+    block.flags.writeable = False
+    return HistoryWindow(block, block.shape[1])
+
+def history_from_frame(frame: pd.DataFrame) -> HistoryWindow:
+    """HistoryWindow from a DataFrame with timestamp, open, high, low, close and volume columns"""
+    frame = frame.sort_values('timestamp')
+    timestamp = frame['timestamp']
+    if not pd.api.types.is_numeric_dtype(timestamp):
+        # Datetime strings; naive values are taken as UTC
+        timestamp = pd.to_datetime(timestamp, utc=True).astype('int64') / 1e9
+    return history_from_arrays(
+        timestamp, frame['open'], frame['high'], frame['low'], frame['close'],
+        frame['volume'] if 'volume' in frame else None
+    )
+
+def load_file(path: Union[str, Path]) -> HistoryWindow:
+    """Load OHLCV bars from a CSV or Parquet file"""
+    path = Path(path)
+    if path.suffix == '.parquet':
+        frame = pd.read_parquet(path)
+    else:
+        frame = pd.read_csv(path)
+    frame.columns = [c.lower() for c in frame.columns]
+    missing = [c for c in COLUMNS if c not in frame and c != 'volume']
+    if missing:
+        raise ValueError(f"{path} is missing columns: {missing}")
+    return history_from_frame(frame)
+
+async def load_market_data(db: AsyncSession, symbol: str, start: Optional[datetime] = None,
+                           end: Optional[datetime] = None) -> HistoryWindow:
+    """Load stored MarketData bars of a symbol, oldest first"""
+    query = select(
+        MarketData.timestamp, MarketData.open_price, MarketData.high_price,
+        MarketData.low_price, MarketData.close_price, MarketData.volume
+    ).where(MarketData.symbol == symbol).order_by(MarketData.timestamp)
+    if start is not None:
+        query = query.where(MarketData.timestamp >= start)
+    if end is not None:
+        query = query.where(MarketData.timestamp < end)
+
+    result = await db.execute(query)
+    frame = pd.DataFrame(result.all(), columns=COLUMNS)
+    frame['volume'] = frame['volume'].fillna(0)
+    return history_from_frame(frame)
@@ -0,0 +1,173 @@
+# app/backtest/engine.py
+from typing import Dict, Any, Optional
+import numpy as np
+from app.core.price_history import HistoryWindow
+from app.strategies.base_strategy import BaseStrategy
+
+# NSE cash session: 375 minutes a day, about 252 sessions a year
+TRADING_SECONDS_PER_YEAR = 252 * 375 * 60
+
+FILL_DTYPE = np.dtype([
+    ('bar', np.int64), ('timestamp', np.float64), ('quantity', np.float64), ('price', np.float64), ('cost', np.float64)
+])
+
+class BacktestResult:
+    """Signals, fills, equity curve and statistics of one backtest run"""
+
+    def __init__(self, strategy: str, data: HistoryWindow, signals: np.ndarray, position: np.ndarray,
+                 fills: np.ndarray, equity: np.ndarray, stats: Dict[str, float]):
+        self.strategy = strategy
+        self.data = data
+        self.signals = signals
+        self.position = position
+        self.fills = fills
+        self.equity = equity
+        self.stats = stats
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'strategy': self.strategy,
+            'stats': self.stats,
+            'fills': [dict(zip(FILL_DTYPE.names, fill.tolist())) for fill in self.fills]
+        }
+
+class Backtester:
+    """Replays a strategy's vectorized signals over a whole bar history.
+
+    A signal on bar ``i`` is filled at the open of bar ``i + 1``, so nothing
+    is traded on information the bar had not produced yet. BUY targets a long
+    position of ``parameters['quantity']``; SELL targets the same size short,
+    or flat when ``allow_short`` is off. Positions are held until the
+    opposite signal. With ``brackets`` on, strategies with ``stop_loss`` and
+    ``profit_target`` fractions (scalping) are also closed when a bar closes
+    beyond either bracket, filling at the next open like any signal. It is
+    off by default because live trading does not execute those exits yet,
+    and a default backtest should only model what production does.
+    Slippage is charged against every fill and commission is a fraction of
+    traded value. Apart from the bracket scan and per-trade statistics
+    everything is computed with array operations, so years of minute bars
+    take seconds.
+    """
+
+    def __init__(self, initial_capital: float = 100000.0, commission: float = 0.0003,
+                 slippage: float = 0.0, allow_short: bool = True, brackets: bool = False):
+        self.initial_capital = initial_capital
+        self.commission = commission
+        self.slippage = slippage
+        self.allow_short = allow_short
+        self.brackets = brackets
+
+    def run(self, strategy: BaseStrategy, data: HistoryWindow, signals: Optional[np.ndarray] = None) -> BacktestResult:
+        """Backtest a strategy over ``data``"""
+        if signals is None:
+            signals = strategy.vectorized_signals(data)
+            if signals is None:
+                raise ValueError(f"Strategy {strategy.name} has no vectorized signals; pass signals to backtest it")
+        quantity = strategy.parameters.get('quantity', 1)
+        held = self._targets(signals)
+        stop_loss, profit_target = getattr(strategy, 'stop_loss', None), getattr(strategy, 'profit_target', None)
+        if self.brackets and stop_loss and profit_target:
+            held = self._apply_brackets(data, signals, held, stop_loss, profit_target)
+        position = np.zeros(len(signals))
+        position[1:] = held[:-1] * quantity
+        fills = self._fills(data, position)
+        equity = self._equity(data, position, fills)
+        stats = self._stats(data, equity, fills)
+        return BacktestResult(strategy.name, data, signals, position, fills, equity, stats)
+
+    def _targets(self, signals: np.ndarray) -> np.ndarray:
+        """Direction wanted after each bar's close (1, -1 or 0)"""
+        targets = signals.astype(np.float64)
+        if not self.allow_short:
+            targets[targets < 0] = 0
+        # Carry the latest signal forward: index of the last bar that signalled
+        last = np.where(signals != 0, np.arange(len(signals)), -1)
+        np.maximum.accumulate(last, out=last)
+        return np.where(last >= 0, targets[last], 0)
+
+    @staticmethod
+    def _apply_brackets(data: HistoryWindow, signals: np.ndarray, held: np.ndarray,
+                        stop_loss: float, profit_target: float) -> np.ndarray:
+        """Go flat after the first close beyond the stop or target of each position"""
+        held = held.copy()
+        n = len(held)
+        signal_bars = np.flatnonzero(signals)
+        direction, entry_bar, entry_price = 0.0, n, 0.0
+        for bar, next_bar in zip(signal_bars.tolist(), np.append(signal_bars[1:], n).tolist()):
+            if held[bar] != direction:
+                direction, entry_bar = held[bar], bar + 1
+                if entry_bar < n:
+                    entry_price = data.open[entry_bar]
+            if direction == 0 or entry_bar >= n:
+                continue
+
+            start = max(bar, entry_bar)
+            closes = data.close[start:next_bar]
+            if direction > 0:
+                hit = (closes <= entry_price * (1 - stop_loss)) | (closes >= entry_price * (1 + profit_target))
+            else:
+                hit = (closes >= entry_price * (1 + stop_loss)) | (closes <= entry_price * (1 - profit_target))
+            if hit.any():
+                # Flat until the next signal, which may re-enter either way
+                held[start + int(hit.argmax()):next_bar] = 0
+                direction = 0.0
+        return held
+
+    def _fills(self, data: HistoryWindow, position: np.ndarray) -> np.ndarray:
+        change = np.diff(position, prepend=0.0)
+        bars = np.flatnonzero(change)
+        fills = np.empty(len(bars), dtype=FILL_DTYPE)
+        traded = change[bars]
+        price = data.open[bars] * (1 + self.slippage * np.sign(traded))
+        fills['bar'] = bars
+        fills['timestamp'] = data.timestamp[bars]
+        fills['quantity'] = traded
+        fills['price'] = price
+        fills['cost'] = np.abs(traded) * price * self.commission
+        return fills
+
+    def _equity(self, data: HistoryWindow, position: np.ndarray, fills: np.ndarray) -> np.ndarray:
+        """Mark-to-market equity at each bar close"""
+        cash_flow = np.zeros(len(position))
+        np.add.at(cash_flow, fills['bar'], -fills['quantity'] * fills['price'] - fills['cost'])
+        return self.initial_capital + np.cumsum(cash_flow) + position * data.close
+
+    def _stats(self, data: HistoryWindow, equity: np.ndarray, fills: np.ndarray) -> Dict[str, float]:
+        if len(equity) == 0:
+            return {
+                'total_return': 0.0, 'sharpe': 0.0, 'max_drawdown': 0.0, 'trades': 0, 'win_rate': 0.0,
+                'commission': 0.0, 'final_equity': self.initial_capital
+            }
+        returns = np.diff(equity, prepend=self.initial_capital) / np.concatenate(([self.initial_capital], equity[:-1]))
+        bar_seconds = np.median(np.diff(data.timestamp)) if len(data) > 1 else 60
+        periods_per_year = TRADING_SECONDS_PER_YEAR / bar_seconds if bar_seconds > 0 else 0
+        std = returns.std()
+        peak = np.maximum.accumulate(equity)
+        trade_pnl = self._trade_pnl(fills)
+
+        return {
+            'total_return': float(equity[-1] / self.initial_capital - 1),
+            'sharpe': float(returns.mean() / std * np.sqrt(periods_per_year)) if std > 0 else 0.0,
+            'max_drawdown': float(((peak - equity) / peak).max()),
+            'trades': len(trade_pnl),
+            'win_rate': float((trade_pnl > 0).mean()) if len(trade_pnl) else 0.0,
+            'commission': float(fills['cost'].sum()),
+            'final_equity': float(equity[-1])
+        }
+
+    @staticmethod
+    def _trade_pnl(fills: np.ndarray) -> np.ndarray:
+        """P&L of each round trip, closed whenever the position returns to flat or reverses"""
+        pnl = []
+        position = entry_value = 0.0
+        for quantity, price, cost in zip(fills['quantity'].tolist(), fills['price'].tolist(), fills['cost'].tolist()):
+            new_position = position + quantity
+            entry_value -= cost
+            if position != 0 and (new_position == 0 or np.sign(new_position) != np.sign(position)):
+                # Close the open trade at this price; any remainder opens the next one
+                pnl.append(entry_value + position * price)
+                position, entry_value = 0.0, 0.0
+                quantity = new_position
+            entry_value -= quantity * price
+            position += quantity
+        return np.array(pnl)
@@ -0,0 +1,171 @@
+# app/backtest/optimizer.py
+import bisect
+import itertools
+import multiprocessing
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from typing import Dict, Any, Callable, Iterable, Iterator, List, Optional, Sequence, Tuple, Type, Union
+import numpy as np
+import structlog
+from app.backtest.engine import Backtester
+from app.core.price_history import HistoryWindow
+from app.strategies.base_strategy import BaseStrategy
+
+logger = structlog.get_logger()
+
+# Metrics where smaller is better; everything else is ranked descending
+MINIMIZE = {'max_drawdown', 'commission'}
+
+def grid(space: Dict[str, Sequence]) -> Iterator[Dict[str, Any]]:
+    """Every combination of the listed parameter values"""
+    names = list(space)
+    for values in itertools.product(*(space[name] for name in names)):
+        yield dict(zip(names, values))
+
+def random_search(space: Dict[str, Union[Sequence, Tuple[float, float]]], samples: int,
+                  seed: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """Random combinations: lists are sampled from, (low, high) tuples drawn uniformly.
+
+    Integer bounds give integers, float bounds give floats.
+    """
+    rng = random.Random(seed)
+    for _ in range(samples):
+        params = {}
+        for name, values in space.items():
+            if isinstance(values, tuple) and len(values) == 2:
+                low, high = values
+                if isinstance(low, int) and isinstance(high, int):
+                    params[name] = rng.randint(low, high)
+                else:
+                    params[name] = rng.uniform(low, high)
+            else:
+                params[name] = rng.choice(list(values))
+        yield params
+
+class SharedHistory:
+    """One copy of a bar history in shared memory that worker processes map read-only"""
+
+    def __init__(self, data: HistoryWindow):
+        block = np.vstack([data.timestamp, data.open, data.high, data.low, data.close, data.volume])
+        self.shape = block.shape
+        self._shm = shared_memory.SharedMemory(create=True, size=max(block.nbytes, 1))
+        np.ndarray(self.shape, dtype=np.float64, buffer=self._shm.buf)[:] = block
+
+    @property
+    def spec(self) -> Tuple[str, Tuple[int, int]]:
+        """What a worker needs to attach: segment name and array shape"""
+        return self._shm.name, self.shape
+
+    def close(self):
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self) -> 'SharedHistory':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class OptimizationResult:
+    __slots__ = ('params', 'stats', 'score')
+
+    def __init__(self, params: Dict[str, Any], stats: Dict[str, float], score: float):
+        self.params = params
+        self.stats = stats
+        self.score = score
+
+    def __repr__(self):
+        return f"OptimizationResult(score={self.score:.4f}, params={self.params})"
+
+class Optimizer:
+    """Parallel parameter sweep of one strategy class over one bar history.
+
+    The history is placed in shared memory once and every pool worker maps
+    it on start-up, so only parameter dicts and statistics cross process
+    boundaries. Combinations are sent in chunks; ``stream`` yields results
+    as chunks finish while ``leaderboard`` stays ranked by ``metric``.
+    """
+
+    def __init__(self, strategy_cls: Type[BaseStrategy], base_parameters: Optional[Dict[str, Any]] = None,
+                 backtester: Optional[Backtester] = None, metric: str = 'sharpe',
+                 workers: Optional[int] = None, chunksize: int = 16):
+        self.strategy_cls = strategy_cls
+        self.base_parameters = base_parameters or {}
+        self.backtester = backtester or Backtester()
+        self.metric = metric
+        self.workers = workers
+        self.chunksize = chunksize
+        self.leaderboard: List[OptimizationResult] = []
+        self._keys: List[float] = []
+
+    def stream(self, data: HistoryWindow, combinations: Iterable[Dict[str, Any]],
+               constraint: Optional[Callable[[Dict[str, Any]], bool]] = None) -> Iterator[OptimizationResult]:
+        """Backtest every combination, yielding results as they complete"""
+        self.leaderboard, self._keys = [], []
+        combinations = [c for c in combinations if constraint is None or constraint(c)]
+        chunks = [combinations[i:i + self.chunksize] for i in range(0, len(combinations), self.chunksize)]
+        logger.info(f"Optimizing {self.strategy_cls.__name__}: {len(combinations)} combinations")
+
+        with SharedHistory(data) as shared:
+            # spawn, not fork: the API process runs feed threads that must not be forked
+            with ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(shared.spec, self.strategy_cls, self.base_parameters, self.backtester)
+            ) as pool:
+                futures = [pool.submit(_run_chunk, chunk) for chunk in chunks]
+                for future in as_completed(futures):
+                    for params, stats in future.result():
+                        yield self._rank(params, stats)
+
+    def run(self, data: HistoryWindow, combinations: Iterable[Dict[str, Any]], top: Optional[int] = None,
+            constraint: Optional[Callable[[Dict[str, Any]], bool]] = None) -> List[OptimizationResult]:
+        """Backtest every combination and return the best ``top`` results"""
+        for _ in self.stream(data, combinations, constraint):
+            pass
+        return self.leaderboard[:top]
+
+    def _rank(self, params: Dict[str, Any], stats: Dict[str, float]) -> OptimizationResult:
+        score = stats.get(self.metric, float('nan'))
+        result = OptimizationResult(params, stats, score)
+        # Keys sort ascending with the best result first; NaN scores go last
+        key = score if self.metric in MINIMIZE else -score
+        if key != key:
+            key = float('inf')
+        index = bisect.bisect_right(self._keys, key)
+        self._keys.insert(index, key)
+        self.leaderboard.insert(index, result)
+        return result
+
+# Worker process state, set once by the pool initializer
+_worker: Dict[str, Any] = {}
+
+def _init_worker(spec: Tuple[str, Tuple[int, int]], strategy_cls: Type[BaseStrategy],
+                 base_parameters: Dict[str, Any], backtester: Backtester):
+    name, shape = spec
+    # Spawned workers share the parent's resource tracker, so attaching does
+    # not hand ownership of the segment to the worker
+    shm = shared_memory.SharedMemory(name=name)
+    block = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    block.flags.writeable = False
+    _worker.update(
+        shm=shm,
+        data=HistoryWindow(block, shape[1]),
+        strategy_cls=strategy_cls,
+        base_parameters=base_parameters,
+        backtester=backtester
+    )
+
+def _run_chunk(chunk: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], Dict[str, float]]]:
+    results = []
+    for params in chunk:
+        try:
+            strategy = _worker['strategy_cls']({**_worker['base_parameters'], **params})
+            stats = _worker['backtester'].run(strategy, _worker['data']).stats
+        except Exception as e:
+            logger.error(f"Error backtesting {params}: {str(e)}")
+            stats = {}
+        results.append((params, stats))
+    return results
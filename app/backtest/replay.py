@@ -0,0 +1,238 @@
+# app/backtest/replay.py
+import asyncio
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Callable, Iterable, List, Optional, Set, Union
+from uuid import uuid4
+import numpy as np
+import structlog
+from app.core.bar_aggregator import BarAggregator
+from app.core.indicator_cache import IndicatorCache
+from app.core.order_manager import OrderManager
+from app.core.price_history import PriceHistory
+from app.core.risk_manager import RiskManager
+from app.core.strategy_engine import StrategyEngine
+from app.core.tick_decoder import encode_tick
+from app.core.tick_queue import TickQueue, OverflowPolicy, DeliveryMode
+from app.core.websocket_handler import WebSocketHandler
+from app.strategies.base_strategy import BaseStrategy
+from app.config import settings
+
+logger = structlog.get_logger()
+
+def load_ticks(path: Union[str, Path]) -> List[Dict[str, Any]]:
+    """Load ticks recorded one JSON object per line"""
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+class TickRecorder:
+    """Market data callback that appends every tick to a JSON lines file"""
+
+    def __init__(self, path: Union[str, Path]):
+        self._file = open(path, 'a')
+
+    async def __call__(self, data: Dict[str, Any]):
+        self._file.write(json.dumps(data) + '\n')
+
+    def close(self):
+        self._file.close()
+
+class SimulatedBroker:
+    """Stands in for AngelOneClient during a replay.
+
+    Market orders fill immediately at the replayed LTP, and order listeners
+    hear about the fill right after ``place_order`` returns, as they would
+    from PaperBroker. Each order's tick-to-order latency is measured from
+    the moment the newest delivered tick of its symbol was injected into the
+    feed.
+    """
+
+    def __init__(self):
+        self.api_key = self.username = "replay"
+        self.auth_token = self.feed_token = "replay"
+        self.ltp: Dict[str, float] = {}
+        self.positions: Dict[str, int] = {}
+        self.orders: List[Dict[str, Any]] = []
+        self.latencies: List[float] = []
+        self.tick_injected_at: Dict[str, float] = {}  # symbol -> perf_counter of its newest delivered tick
+        self.order_listeners: Dict[str, Callable] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def authenticate(self) -> bool:
+        return True
+
+    def add_order_listener(self, name: str, callback: Callable):
+        """Add a callback receiving (order_id, status, filled_qty, avg_price) on every fill"""
+        self.order_listeners[name] = callback
+
+    async def drain(self):
+        """Wait until every fill has been reported to the listeners"""
+        while self._tasks:
+            await asyncio.gather(*self._tasks)
+
+    async def place_order(self, order_data: Dict[str, Any]) -> Dict[str, Any]:
+        symbol = order_data['symbol']
+        injected_at = self.tick_injected_at.get(symbol)
+        if injected_at is not None:
+            self.latencies.append(time.perf_counter() - injected_at)
+
+        price = self.ltp.get(symbol)
+        if price is None:
+            return {'status': False, 'message': f'No market price for {symbol}'}
+        side = str(getattr(order_data['transaction_type'], 'value', order_data['transaction_type']))
+        quantity = int(order_data['quantity'])
+        order_id = uuid4().hex[:15]
+        self.positions[symbol] = self.positions.get(symbol, 0) + (quantity if side == 'BUY' else -quantity)
+        order = {
+            'orderid': order_id, 'tradingsymbol': symbol, 'transactiontype': side,
+            'quantity': quantity, 'averageprice': price, 'status': 'complete'
+        }
+        self.orders.append(order)
+        # Reported after the caller has seen the order id, like a broker update
+        task = asyncio.ensure_future(self._notify(order))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return {'status': True, 'message': 'SUCCESS', 'data': {'orderid': order_id}}
+
+    async def cancel_order(self, order_id: str, variety: str = "NORMAL") -> Dict[str, Any]:
+        return {'status': False, 'message': 'Order already complete'}
+
+    async def get_ltp(self, symbol: str, exchange: str) -> Optional[float]:
+        return self.ltp.get(symbol)
+
+    async def get_positions(self) -> List[Dict[str, Any]]:
+        return [{'tradingsymbol': s, 'netqty': q, 'ltp': self.ltp.get(s)} for s, q in self.positions.items()]
+
+    async def get_orders(self) -> List[Dict[str, Any]]:
+        return list(self.orders)
+
+    async def get_candle_data(self, *args, **kwargs) -> List[Dict[str, Any]]:
+        return []
+
+    async def _notify(self, order: Dict[str, Any]):
+        for name, callback in list(self.order_listeners.items()):
+            try:
+                await callback(order['orderid'], order['status'].upper(), order['quantity'], order['averageprice'])
+            except Exception as e:
+                logger.error(f"Error in replay order listener {name}: {str(e)}")
+
+class ReplaySession:
+    """Replays recorded ticks through the production tick path.
+
+    Ticks are encoded as SmartWebSocketV2 packets and handed to
+    ``WebSocketHandler._on_data`` from a feed thread, exactly like live
+    frames. From there they pass the decoder, ingestion queue, bar aggregator
+    and StrategyEngine, and signals reach a SimulatedBroker through an
+    OrderManager, wired as in the live app, so fills update its RiskManager.
+
+    ``speed`` paces the feed by exchange timestamps: 1 is real time, N is N
+    times faster, None is as fast as the pipeline accepts. The ingestion
+    queue blocks instead of dropping, and with ``conflate`` off (the default)
+    strategies see every tick, so a replay is deterministic. ``conflate``
+    mirrors production delivery, where slow strategies skip stale ticks.
+    Bars are closed by tick time rather than the wall clock. Each session
+    builds bars into its own PriceHistory and IndicatorCache, which its
+    strategies are pointed at, so sessions never see each other's history.
+    """
+
+    def __init__(self, strategies: Iterable[BaseStrategy], broker: Optional[SimulatedBroker] = None,
+                 conflate: bool = False):
+        self.broker = broker or SimulatedBroker()
+        self.handler = WebSocketHandler(self.broker)
+        self.handler.tick_queue = TickQueue(settings.tick_queue_size, OverflowPolicy.BLOCK)
+        self.order_manager = OrderManager(self.broker, RiskManager())
+        self.broker.add_order_listener("order_manager", self.order_manager.update_order_status)
+        self.engine = StrategyEngine(self.broker, self.order_manager)
+        self.history = PriceHistory()
+        self.indicator_cache = IndicatorCache()
+        self.bars = BarAggregator(history=self.history)
+        self.bars.add_callback("indicator_cache", self.indicator_cache.on_bar_closed)
+        self.bars.add_callback("strategies", self.engine.process_bar)
+
+        # In-order callbacks run in registration order: the broker's view of the
+        # market is updated first, and a tick counts as delivered after the last
+        self.handler.add_callback("replay_clock", self._on_tick)
+        self.handler.add_callback("bars", self.bars.process_tick)
+        mode = DeliveryMode.CONFLATE if conflate else DeliveryMode.ALL
+        self.handler.add_callback("market_data", self.engine.process_market_data, mode=mode)
+        self.handler.add_callback("replay_delivered", self._on_delivered)
+
+        for strategy in strategies:
+            strategy.history = self.history
+            strategy.indicator_cache = self.indicator_cache
+            self.engine.add_strategy(strategy)
+            strategy.activate()
+
+        self._injected_at: List[float] = []
+        self.delivered = 0
+
+    async def run(self, ticks: List[Dict[str, Any]], speed: Optional[float] = None) -> Dict[str, Any]:
+        """Replay ``ticks`` and return throughput and latency statistics"""
+        for tick in ticks:
+            if 'symbol' in tick:
+                self.handler.token_symbols[str(tick['token'])] = tick['symbol']
+        # Sequence numbers identify each tick's injection time once decoded
+        frames = [encode_tick({**tick, 'sequence_number': i}) for i, tick in enumerate(ticks)]
+        self._injected_at = [0.0] * len(frames)
+        self.delivered = 0
+
+        self.engine.start()
+        self.handler._start_dispatcher()
+        start = time.perf_counter()
+        feeder = threading.Thread(target=self._feed, args=(frames, ticks, speed), name="replay-feed", daemon=True)
+        feeder.start()
+        try:
+            await self._drain(len(frames))
+            # Close the bars still open at the end of the recording
+            await self.bars.flush(now=float('inf'))
+            await self.engine.drain_bars()
+            await self.broker.drain()
+        finally:
+            elapsed = time.perf_counter() - start
+            self.engine.stop()
+            # Closing the queue releases a feed thread blocked on it
+            await self.handler.disconnect()
+            feeder.join()
+
+        latencies = np.array(self.broker.latencies) * 1000
+        stats = {
+            'ticks': len(frames),
+            'seconds': elapsed,
+            'ticks_per_second': len(frames) / elapsed if elapsed > 0 else 0.0,
+            'orders': len(self.broker.orders),
+            'latency_ms_p50': float(np.percentile(latencies, 50)) if len(latencies) else None,
+            'latency_ms_p99': float(np.percentile(latencies, 99)) if len(latencies) else None,
+            'latency_ms_max': float(latencies.max()) if len(latencies) else None
+        }
+        logger.info(f"Replay finished: {stats}")
+        return stats
+
+    def _feed(self, frames: List[bytes], ticks: List[Dict[str, Any]], speed: Optional[float]):
+        """Feed thread: inject frames, paced by exchange timestamps unless running flat out"""
+        on_data = self.handler._on_data
+        injected_at = self._injected_at
+        first = ticks[0].get('exchange_timestamp', 0) if ticks else 0
+        start = time.perf_counter()
+        for i, frame in enumerate(frames):
+            if speed:
+                due = start + (ticks[i].get('exchange_timestamp', 0) - first) / 1000 / speed
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            injected_at[i] = time.perf_counter()
+            on_data(None, frame)
+
+    async def _on_tick(self, data: Dict[str, Any]):
+        symbol = data['symbol']
+        self.broker.ltp[symbol] = data['ltp']
+        self.broker.tick_injected_at[symbol] = self._injected_at[data['sequence_number']]
+
+    async def _on_delivered(self, data: Dict[str, Any]):
+        self.delivered += 1
+
+    async def _drain(self, total: int):
+        """Wait until every tick went through the callbacks and conflated consumers"""
+        while self.delivered < total or any(m.pending() for m in self.handler.mailboxes.values()):
+            await asyncio.sleep(0.001)
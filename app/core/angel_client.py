@@ -1,15 +1,75 @@
 # app/core/angel_client.py
 from SmartApi import SmartConnect
+import SmartApi.smartExceptions as smart_exceptions
 import pyotp
-import redis
+import requests
 import json
 import asyncio
-from typing import Optional, Dict, Any, List
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Callable
+from urllib.parse import urljoin
 import structlog
+from jose import jwt
+from app.core.broker_scheduler import broker_scheduler
+from app.core.broker_session import BrokerSession
+from app.core.instruments import instrument_master
+from app.core.redis_pool import redis_pool
 from app.config import settings
+from app.utils.metrics import broker_requests_in_flight, broker_request_latency, track_api_error
 
 logger = structlog.get_logger()
 
+# SmartConnect is blocking; every call runs here so the event loop never waits on the network
+_executor = ThreadPoolExecutor(max_workers=settings.broker_max_concurrency, thread_name_prefix="smartapi")
+
+class PooledSmartConnect(SmartConnect):
+    """SmartConnect that sends every request through one keep-alive session.
+
+    The stock client calls ``requests.request`` for each call, so every call
+    opens a new TLS connection even when it is given a ``pool``. Timeouts
+    can also be set per route, e.g. longer for historical candles.
+    """
+
+    def __init__(self, *args, timeouts: Optional[Dict[str, float]] = None, pool_size: int = 10, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.timeouts = timeouts or {}
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _request(self, route, method, parameters=None):
+        params = parameters.copy() if parameters else {}
+        url = urljoin(self.root, self._routes[route].format(**params))
+        headers = self.requestHeaders()
+        if self.access_token:
+            headers["Authorization"] = f"Bearer {self.access_token}"
+
+        response = self.session.request(
+            method,
+            url,
+            data=json.dumps(params) if method in ("POST", "PUT") else None,
+            params=json.dumps(params) if method in ("GET", "DELETE") else None,
+            headers=headers,
+            verify=not self.disable_ssl,
+            timeout=self.timeouts.get(route, self.timeout),
+            proxies=self.proxies
+        )
+        try:
+            data = json.loads(response.content.decode("utf8"))
+        except ValueError:
+            raise smart_exceptions.DataException(f"Couldn't parse the JSON response received from the server: {response.content}")
+
+        if data.get("error_type"):
+            if self.session_expiry_hook and response.status_code == 403 and data["error_type"] == "TokenException":
+                self.session_expiry_hook()
+            error = getattr(smart_exceptions, data["error_type"], smart_exceptions.GeneralException)
+            raise error(data["message"], code=response.status_code)
+        return data
+
 class AngelOneClient:
     def __init__(self):
         self.api_key = settings.api_key
@@ -19,27 +79,39 @@ class AngelOneClient:
         self.smart_api = None
         self.auth_token = None
         self.feed_token = None
-        self.redis_client = redis.from_url(settings.redis_url)
+        self.refresh_token = None
+        self.token_expiry = 0.0
+        self.session = BrokerSession(self)
         
+    def _new_smart_api(self) -> PooledSmartConnect:
+        return PooledSmartConnect(
+            api_key=self.api_key,
+            root=settings.smartapi_root_url,
+            timeout=settings.broker_request_timeout,
+            timeouts={'api.candle.data': settings.broker_historical_timeout},
+            pool_size=settings.broker_max_concurrency
+        )
+    
     async def authenticate(self) -> bool:
-        """Authenticate with Angel One API"""
+        """Authenticate with Angel One API (prefer ``session.ensure``, which avoids repeat logins)"""
         try:
-            self.smart_api = SmartConnect(api_key=self.api_key)
+            self.smart_api = self._new_smart_api()
             
             # Generate TOTP
             totp = pyotp.TOTP(self.totp_key)
             totp_code = totp.now()
             
             # Login
-            data = self.smart_api.generateSession(
+            data = await self._call(
+                'login',
+                self.smart_api.generateSession,
                 self.username, 
                 self.password, 
                 totp_code
             )
             
             if data['status']:
-                self.auth_token = data['data']['jwtToken']
-                self.feed_token = data['data']['feedToken']
+                self._set_tokens(data['data'])
                 
                 # Cache tokens in Redis
                 await self._cache_tokens()
@@ -54,26 +126,56 @@ class AngelOneClient:
             logger.error(f"Authentication error: {str(e)}")
             return False
     
+    async def refresh_session(self) -> bool:
+        """Exchange the refresh token for new session tokens without a TOTP login"""
+        try:
+            data = await self._call('login', self.smart_api.generateToken, self.refresh_token)
+            if not data or not data.get('status'):
+                logger.error(f"Token refresh failed: {data and data.get('message')}")
+                return False
+            self._set_tokens(data['data'])
+            await self._cache_tokens()
+            logger.info("Angel One session refreshed")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Token refresh error: {str(e)}")
+            return False
+    
+    def _set_tokens(self, data: Dict[str, Any]):
+        jwt_token = data['jwtToken'].removeprefix('Bearer ')
+        self.smart_api.setAccessToken(jwt_token)
+        self.smart_api.setFeedToken(data['feedToken'])
+        self.auth_token = f"Bearer {jwt_token}"
+        self.feed_token = data['feedToken']
+        self.refresh_token = data.get('refreshToken') or self.refresh_token
+        self.smart_api.setRefreshToken(self.refresh_token)
+        self.token_expiry = _token_expiry(jwt_token)
+    
     async def _cache_tokens(self):
-        """Cache authentication tokens in Redis"""
+        """Cache authentication tokens in Redis until they expire"""
         token_data = {
             'auth_token': self.auth_token,
-            'feed_token': self.feed_token
+            'feed_token': self.feed_token,
+            'refresh_token': self.refresh_token,
+            'expires_at': self.token_expiry
         }
-        self.redis_client.setex(
-            'angel_tokens', 
-            3600,  # 1 hour expiry
-            json.dumps(token_data)
-        )
+        await redis_pool.set_json('angel_tokens', token_data, ttl=max(1, int(self.token_expiry - time.time())))
     
     async def get_cached_tokens(self) -> bool:
-        """Get cached tokens from Redis"""
+        """Resume the session cached in Redis, e.g. by a previous process"""
         try:
-            cached_data = self.redis_client.get('angel_tokens')
-            if cached_data:
-                token_data = json.loads(cached_data)
-                self.auth_token = token_data['auth_token']
-                self.feed_token = token_data['feed_token']
+            token_data = await redis_pool.get_json('angel_tokens')
+            if token_data:
+                if token_data.get('expires_at', 0) <= time.time():
+                    return False
+                self.smart_api = self._new_smart_api()
+                self._set_tokens({
+                    'jwtToken': token_data['auth_token'],
+                    'feedToken': token_data['feed_token'],
+                    'refreshToken': token_data.get('refresh_token')
+                })
+                self.token_expiry = token_data['expires_at']
                 return True
             return False
         except Exception as e:
@@ -83,25 +185,29 @@ class AngelOneClient:
     async def place_order(self, order_data: Dict[str, Any]) -> Dict[str, Any]:
         """Place order through Angel One API"""
         try:
-            if not self.smart_api:
-                await self.authenticate()
-            
-            result = self.smart_api.placeOrder(
-                variety="NORMAL",
-                tradingsymbol=order_data['symbol'],
-                symboltoken=await self._get_symbol_token(order_data['symbol']),
-                transactiontype=order_data['transaction_type'],
-                exchange=order_data['exchange'],
-                ordertype=order_data['order_type'],
-                producttype="INTRADAY",
-                duration="DAY",
-                price=str(order_data.get('price', '0')),
-                squareoff="0",
-                stoploss="0",
-                quantity=str(order_data['quantity'])
-            )
+            await self.session.ensure()
             
-            return result
+            token = await self._get_symbol_token(order_data['symbol'], order_data['exchange'])
+            if token is None:
+                return {'status': False, 'message': f"Unknown instrument {order_data['exchange']}:{order_data['symbol']}"}
+            
+            # placeOrder returns only the order id; the full response carries status and message
+            result = await self._call('place_order', self.smart_api.placeOrderFullResponse, {
+                "variety": "NORMAL",
+                "tradingsymbol": order_data['symbol'],
+                "symboltoken": token,
+                "transactiontype": order_data['transaction_type'],
+                "exchange": order_data['exchange'],
+                "ordertype": order_data['order_type'],
+                "producttype": "INTRADAY",
+                "duration": "DAY",
+                "price": str(order_data.get('price') or 0),
+                "squareoff": "0",
+                "stoploss": "0",
+                "quantity": str(order_data['quantity'])
+            })
+            
+            return result or {'status': False, 'message': 'No response from broker'}
             
         except Exception as e:
             logger.error(f"Order placement error: {str(e)}")
@@ -110,11 +216,10 @@ class AngelOneClient:
     async def get_positions(self) -> List[Dict[str, Any]]:
         """Get current positions"""
         try:
-            if not self.smart_api:
-                await self.authenticate()
+            await self.session.ensure()
                 
-            result = self.smart_api.position()
-            return result.get('data', [])
+            result = await self._call('positions', self.smart_api.position)
+            return result.get('data') or []
             
         except Exception as e:
             logger.error(f"Error getting positions: {str(e)}")
@@ -123,11 +228,10 @@ class AngelOneClient:
     async def get_orders(self) -> List[Dict[str, Any]]:
         """Get order history"""
         try:
-            if not self.smart_api:
-                await self.authenticate()
+            await self.session.ensure()
                 
-            result = self.smart_api.orderBook()
-            return result.get('data', [])
+            result = await self._call('orders', self.smart_api.orderBook)
+            return result.get('data') or []
             
         except Exception as e:
             logger.error(f"Error getting orders: {str(e)}")
@@ -136,11 +240,12 @@ class AngelOneClient:
     async def get_ltp(self, symbol: str, exchange: str) -> Optional[float]:
         """Get Last Traded Price"""
         try:
-            if not self.smart_api:
-                await self.authenticate()
+            await self.session.ensure()
                 
-            token = await self._get_symbol_token(symbol)
-            result = self.smart_api.ltpData(exchange, symbol, token)
+            token = await self._get_symbol_token(symbol, exchange)
+            if token is None:
+                return None
+            result = await self._call('ltp', self.smart_api.ltpData, exchange, symbol, token)
             
             if result['status']:
                 return float(result['data']['ltp'])
@@ -150,25 +255,91 @@ class AngelOneClient:
             logger.error(f"Error getting LTP: {str(e)}")
             return None
     
-    async def _get_symbol_token(self, symbol: str) -> str:
-        """Get symbol token from cache or API"""
-        # This is a simplified implementation
-        # In production, you'd maintain a symbol master cache
-        return "3045"  # Example token for SBIN
+    async def get_market_data(self, mode: str, exchange_tokens: Dict[str, List[str]]) -> List[Dict[str, Any]]:
+        """Get quotes for up to 50 tokens in one request (mode LTP, OHLC or FULL)"""
+        try:
+            await self.session.ensure()
+
+            result = await self._call('quote', self.smart_api.getMarketData, mode, exchange_tokens)
+
+            if not result or not result.get('status'):
+                return []
+            return (result.get('data') or {}).get('fetched') or []
+
+        except Exception as e:
+            logger.error(f"Error getting market data: {str(e)}")
+            return []
+
+    async def get_candle_data(self, exchange: str, token: str, interval: str,
+                              from_date: str, to_date: str) -> List[Dict[str, Any]]:
+        """Get historical candles (dates as 'YYYY-MM-DD HH:MM' in IST)"""
+        try:
+            await self.session.ensure()
+            
+            result = await self._call('candles', self.smart_api.getCandleData, {
+                "exchange": exchange,
+                "symboltoken": token,
+                "interval": interval,
+                "fromdate": from_date,
+                "todate": to_date
+            })
+            
+            if not result or not result.get('status'):
+                return []
+            return [
+                {
+                    'timestamp': datetime.fromisoformat(row[0]).timestamp(),
+                    'open': float(row[1]),
+                    'high': float(row[2]),
+                    'low': float(row[3]),
+                    'close': float(row[4]),
+                    'volume': int(row[5])
+                }
+                for row in result.get('data') or []
+            ]
+            
+        except Exception as e:
+            logger.error(f"Error getting candle data: {str(e)}")
+            return []
+    
+    async def _get_symbol_token(self, symbol: str, exchange: str = "NSE") -> Optional[str]:
+        """Get symbol token from the instrument master"""
+        token = instrument_master.token(symbol, exchange)
+        if token is None:
+            logger.warning(f"No instrument token for {exchange}:{symbol}")
+        return token
     
-    async def cancel_order(self, order_id: str) -> Dict[str, Any]:
+    async def cancel_order(self, order_id: str, variety: str = "NORMAL") -> Dict[str, Any]:
         """Cancel an order"""
         try:
-            if not self.smart_api:
-                await self.authenticate()
+            await self.session.ensure()
                 
-            result = self.smart_api.cancelOrder(
-                variety="NORMAL",
-                orderid=order_id
-            )
+            result = await self._call('cancel_order', self.smart_api.cancelOrder, order_id, variety)
             
             return result
             
         except Exception as e:
             logger.error(f"Order cancellation error: {str(e)}")
-            return {'status': False, 'message': str(e)}
\ No newline at end of file
+            return {'status': False, 'message': str(e)}
+    
+    async def _call(self, endpoint: str, func: Callable, *args) -> Any:
+        """Run a blocking SmartConnect call on the broker executor once the scheduler admits it"""
+        async with broker_scheduler.slot(endpoint):
+            in_flight = broker_requests_in_flight.labels(endpoint=endpoint)
+            in_flight.inc()
+            start = time.perf_counter()
+            try:
+                return await asyncio.get_running_loop().run_in_executor(_executor, functools.partial(func, *args))
+            except Exception:
+                track_api_error(endpoint)
+                raise
+            finally:
+                in_flight.dec()
+                broker_request_latency.labels(endpoint=endpoint).observe(time.perf_counter() - start)
+
+def _token_expiry(token: str) -> float:
+    """Expiry of a session JWT, or ``broker_session_ttl`` from now if it carries none"""
+    try:
+        return float(jwt.get_unverified_claims(token)['exp'])
+    except Exception:
+        return time.time() + settings.broker_session_ttl
@@ -0,0 +1,248 @@
+# app/core/bar_aggregator.py
+import asyncio
+import time
+from typing import Dict, Any, Callable, Optional, List, Tuple
+import structlog
+from app.core.price_history import PriceHistory, HistoryWindow, COLUMNS, price_history
+
+logger = structlog.get_logger()
+
+TIMEFRAMES = {
+    '1s': 1,
+    '1m': 60,
+    '5m': 300,
+    '15m': 900
+}
+
+TIMEFRAME_ALIASES = {
+    '1sec': '1s',
+    '1min': '1m',
+    '5min': '5m',
+    '15min': '15m'
+}
+
+def normalize_timeframe(timeframe: str) -> str:
+    """Map aliases such as '1min' onto the canonical timeframe names"""
+    timeframe = TIMEFRAME_ALIASES.get(timeframe, timeframe)
+    if timeframe not in TIMEFRAMES:
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+    return timeframe
+
+class Bar:
+    __slots__ = ('symbol', 'timeframe', 'start', 'end', 'open', 'high', 'low', 'close', 'volume', 'ticks')
+
+    def __init__(self, symbol: str, timeframe: str, start: float, seconds: int, price: float, volume: float = 0):
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.start = start
+        self.end = start + seconds
+        self.open = price
+        self.high = price
+        self.low = price
+        self.close = price
+        self.volume = volume
+        self.ticks = 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'symbol': self.symbol,
+            'timeframe': self.timeframe,
+            'timestamp': self.start,
+            'open': self.open,
+            'high': self.high,
+            'low': self.low,
+            'close': self.close,
+            'volume': self.volume
+        }
+
+    def __repr__(self):
+        return f"Bar({self.symbol} {self.timeframe} @{self.start} O={self.open} H={self.high} L={self.low} C={self.close} V={self.volume})"
+
+class BarAggregator:
+    """Builds OHLCV bars per symbol and timeframe from the tick stream.
+
+    Each tick updates the open bar of every timeframe in O(1). When a tick
+    lands in a later bucket the open bar is closed, appended to the shared
+    PriceHistory ring buffers and published to the bar callbacks. ``flush``
+    closes bars whose interval has elapsed without a new tick, and runs
+    every second once ``start`` is called.
+    """
+
+    def __init__(self, timeframes: Optional[List[str]] = None, history: Optional[PriceHistory] = None):
+        names = [normalize_timeframe(tf) for tf in (timeframes or TIMEFRAMES)]
+        self.timeframes: List[Tuple[str, int]] = [(tf, TIMEFRAMES[tf]) for tf in names]
+        self.history = history if history is not None else price_history
+        self.callbacks: Dict[str, Callable] = {}
+        self._current: Dict[str, List[Optional[Bar]]] = {}
+        self._last_volume: Dict[str, int] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def add_callback(self, name: str, callback: Callable):
+        """Add a bar closed callback"""
+        self.callbacks[name] = callback
+
+    def remove_callback(self, name: str):
+        """Remove a bar closed callback"""
+        self.callbacks.pop(name, None)
+
+    def get_bars(self, symbol: str, timeframe: str, count: Optional[int] = None) -> HistoryWindow:
+        """Closed bars, oldest first"""
+        return self.history.window(symbol, normalize_timeframe(timeframe), count or self.history.capacity)
+
+    def current_bar(self, symbol: str, timeframe: str) -> Optional[Bar]:
+        """The bar still being built"""
+        timeframe = normalize_timeframe(timeframe)
+        current = self._current.get(symbol)
+        if not current:
+            return None
+        for i, (tf, _) in enumerate(self.timeframes):
+            if tf == timeframe:
+                return current[i]
+        return None
+
+    async def process_tick(self, tick: Dict[str, Any]):
+        """Market data callback: fold one tick into every timeframe"""
+        price = tick.get('ltp')
+        if not price:
+            return
+        symbol = tick.get('symbol')
+        ts = tick.get('timestamp') or time.time()
+        volume = self._volume_delta(symbol, tick)
+
+        current = self._current.get(symbol)
+        if current is None:
+            current = self._current[symbol] = [None] * len(self.timeframes)
+
+        closed = None
+        for i, (tf, seconds) in enumerate(self.timeframes):
+            bar = current[i]
+            if bar is not None and ts < bar.end:
+                if ts < bar.start:
+                    # Late tick for a bar that is already closed
+                    continue
+                if price > bar.high:
+                    bar.high = price
+                elif price < bar.low:
+                    bar.low = price
+                bar.close = price
+                bar.volume += volume
+                bar.ticks += 1
+                continue
+
+            if bar is not None:
+                self._store(bar)
+                if closed is None:
+                    closed = []
+                closed.append(bar)
+            current[i] = Bar(symbol, tf, ts - ts % seconds, seconds, price, volume)
+
+        if closed:
+            for bar in closed:
+                await self._emit(bar)
+
+    async def flush(self, now: Optional[float] = None):
+        """Close bars whose interval has elapsed"""
+        now = now or time.time()
+        for current in self._current.values():
+            for i, bar in enumerate(current):
+                if bar is not None and bar.end <= now:
+                    current[i] = None
+                    self._store(bar)
+                    await self._emit(bar)
+
+    async def add_backfill(self, symbol: str, candles: List[Dict[str, Any]]):
+        """Backfill callback: fold recovered minute candles into history.
+
+        A backfilled minute replaces any partial 1m bar stored for it, and
+        minutes missing from history are inserted in timestamp order even
+        when live bars have closed after them; higher timeframes merge the
+        candles into the bar covering their bucket.
+        Backfilled bars are not published as bar closed events.
+        """
+        for candle in sorted(candles, key=lambda c: c['timestamp']):
+            for i, (tf, seconds) in enumerate(self.timeframes):
+                if seconds < 60:
+                    continue
+                self._merge_candle(symbol, i, tf, seconds, candle)
+
+    def start(self):
+        """Start closing idle bars on a one second timer"""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._run_flush())
+
+    def stop(self):
+        if self._flush_task:
+            self._flush_task.cancel()
+            self._flush_task = None
+
+    async def _run_flush(self):
+        while True:
+            await asyncio.sleep(1)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Error flushing bars: {str(e)}")
+
+    def _merge_candle(self, symbol: str, index: int, tf: str, seconds: int, candle: Dict[str, Any]):
+        start = candle['timestamp'] - candle['timestamp'] % seconds
+        current = self._current.get(symbol)
+        bar = current[index] if current else None
+        if bar is not None and bar.start <= start:
+            # Only closed history is backfilled; the open bar is built from live ticks
+            if bar.start == start:
+                row = self._fold(bar.to_dict(), candle, replace=False)
+                bar.open, bar.high, bar.low, bar.volume = row['open'], row['high'], row['low'], row['volume']
+            return
+
+        series = self.history.series(symbol, tf, create=True)
+        last = series.get_row(series.count - 1) if series.count else None
+        if last is None or last['timestamp'] < start:
+            row = self._fold({'timestamp': start}, candle, replace=True)
+            series.append(tuple(row[c] for c in COLUMNS))
+            return
+
+        bar_index = series.find(start)
+        if bar_index is None:
+            # Missing from the middle, e.g. live bars closed before the backfill landed
+            row = self._fold({'timestamp': start}, candle, replace=True)
+            series.insert(tuple(row[c] for c in COLUMNS))
+            return
+        row = self._fold(series.get_row(bar_index), candle, replace=seconds == 60)
+        series.set_row(bar_index, tuple(row[c] for c in COLUMNS))
+
+    @staticmethod
+    def _fold(row: Dict[str, Any], candle: Dict[str, Any], replace: bool) -> Dict[str, Any]:
+        if replace:
+            row.update(
+                open=candle['open'], high=candle['high'], low=candle['low'],
+                close=candle['close'], volume=candle.get('volume', 0)
+            )
+            return row
+        if candle['timestamp'] <= row['timestamp']:
+            row['open'] = candle['open']
+        row['high'] = max(row['high'], candle['high'])
+        row['low'] = min(row['low'], candle['low'])
+        row['volume'] += candle.get('volume', 0)
+        return row
+
+    def _volume_delta(self, symbol: str, tick: Dict[str, Any]) -> float:
+        """Traded volume since the previous tick of the symbol"""
+        cumulative = tick.get('volume')
+        if cumulative is None:
+            # LTP mode packets carry no volume
+            return tick.get('last_traded_quantity', 0)
+        previous = self._last_volume.get(symbol)
+        self._last_volume[symbol] = cumulative
+        if previous is None or cumulative < previous:
+            return 0
+        return cumulative - previous
+
+    def _store(self, bar: Bar):
+        self.history.append_bar(bar)
+
+    async def _emit(self, bar: Bar):
+        for name, callback in list(self.callbacks.items()):
+            try:
+                await callback(bar)
+            except Exception as e:
+                logger.error(f"Error in bar callback {name}: {str(e)}")
@@ -0,0 +1,151 @@
+# app/core/broker_scheduler.py
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Deque, Dict, Optional, Tuple
+import structlog
+from app.config import settings
+from app.utils.metrics import broker_queue_wait, broker_queue_depth
+
+logger = structlog.get_logger()
+
+class Priority(IntEnum):
+    SESSION = 0
+    CANCEL = 1
+    ORDER = 2
+    MARKET_DATA = 3
+    HISTORICAL = 4
+    POLLING = 5
+
+# Endpoint -> (priority, requests per second as published by SmartAPI)
+ENDPOINT_LIMITS: Dict[str, Tuple[Priority, float]] = {
+    'login': (Priority.SESSION, 1),
+    'cancel_order': (Priority.CANCEL, 20),
+    'place_order': (Priority.ORDER, 20),
+    'ltp': (Priority.MARKET_DATA, 10),
+    'quote': (Priority.MARKET_DATA, 10),
+    'candles': (Priority.HISTORICAL, 3),
+    'positions': (Priority.POLLING, 1),
+    'orders': (Priority.POLLING, 1)
+}
+DEFAULT_LIMIT = (Priority.POLLING, 1)
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def delay(self, now: float) -> float:
+        """Seconds until a token is available (0 if one is)"""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+class BrokerScheduler:
+    """Admission control in front of every SmartAPI call.
+
+    Each endpoint has a token bucket refilled at ``broker_rate_headroom``
+    times its published per-second limit, and at most
+    ``broker_max_concurrency`` calls run at once. Waiting calls are queued
+    per endpoint and admitted strictly by endpoint priority: session, then
+    cancels, new orders, LTP and quotes, candles, and finally order book
+    and position polling. A call whose endpoint is out of tokens does not
+    hold up other endpoints. Time spent waiting is exported per endpoint.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[Priority, float]]] = None,
+                 max_concurrency: int = None, headroom: float = None):
+        self.limits = limits or ENDPOINT_LIMITS
+        self.max_concurrency = max_concurrency or settings.broker_max_concurrency
+        self.headroom = headroom if headroom is not None else settings.broker_rate_headroom
+        self.active = 0
+        self.buckets: Dict[str, TokenBucket] = {}
+        self._queues: Dict[str, Deque[asyncio.Future]] = {}
+        self._order: list = []  # endpoints with waiters, highest priority first
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_due = float('inf')
+        self._timer_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def priority(self, endpoint: str) -> Priority:
+        return self.limits.get(endpoint, DEFAULT_LIMIT)[0]
+
+    @asynccontextmanager
+    async def slot(self, endpoint: str):
+        """Hold one admitted call to ``endpoint`` for the duration of the block"""
+        await self.acquire(endpoint)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, endpoint: str):
+        if endpoint not in self.buckets:
+            rate = self.limits.get(endpoint, DEFAULT_LIMIT)[1] * self.headroom
+            self.buckets[endpoint] = TokenBucket(rate, max(1.0, rate))
+            self._queues[endpoint] = deque()
+            self._order = sorted(self._queues, key=self.priority)
+
+        future = asyncio.get_running_loop().create_future()
+        queue = self._queues[endpoint]
+        queue.append(future)
+        broker_queue_depth.labels(endpoint=endpoint).inc()
+        start = time.perf_counter()
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Admitted just as the caller was cancelled: give the slot back
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+        finally:
+            if not future.done() or future.cancelled():
+                broker_queue_depth.labels(endpoint=endpoint).dec()
+        broker_queue_wait.labels(endpoint=endpoint).observe(time.perf_counter() - start)
+
+    def release(self):
+        self.active -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        """Admit waiting calls in priority order while slots and tokens allow"""
+        now = time.monotonic()
+        wait = float('inf')
+        for endpoint in self._order:
+            if self.active >= self.max_concurrency:
+                break
+            queue = self._queues[endpoint]
+            bucket = self.buckets[endpoint]
+            while queue and self.active < self.max_concurrency:
+                if queue[0].done():
+                    queue.popleft()  # caller gave up
+                    continue
+                delay = bucket.delay(now)
+                if delay > 0:
+                    wait = min(wait, delay)
+                    break
+                bucket.take()
+                self.active += 1
+                broker_queue_depth.labels(endpoint=endpoint).dec()
+                queue.popleft().set_result(None)
+
+        loop = asyncio.get_running_loop()
+        if wait < float('inf') and (now + wait < self._timer_due or self._timer_loop is not loop):
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer_due = now + wait
+            self._timer = loop.call_later(wait, self._on_timer)
+            self._timer_loop = loop
+
+    def _on_timer(self):
+        self._timer, self._timer_due = None, float('inf')
+        self._dispatch()
+
+broker_scheduler = BrokerScheduler()
@@ -0,0 +1,82 @@
+# app/core/broker_session.py
+import asyncio
+import time
+from typing import Any, Optional
+import structlog
+from app.config import settings
+
+logger = structlog.get_logger()
+
+class BrokerSession:
+    """The one broker login shared by the whole process.
+
+    ``ensure`` returns at once while the session is fresh. Otherwise it
+    takes a lock, so concurrent callers wait on a single renewal instead of
+    each logging in: tokens cached in Redis are reused first (e.g. after a
+    restart), then the refresh token is exchanged for new ones, and only
+    then is a full TOTP login made. ``start`` renews the session
+    ``broker_session_refresh_margin`` seconds before it expires, so requests
+    never pay for the renewal themselves.
+    """
+
+    def __init__(self, angel_client: Any, refresh_margin: float = None):
+        self.angel_client = angel_client
+        self.refresh_margin = refresh_margin if refresh_margin is not None else settings.broker_session_refresh_margin
+        self.logins = 0
+        self.refreshes = 0
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @property
+    def fresh(self) -> bool:
+        client = self.angel_client
+        return (client.smart_api is not None and client.auth_token is not None
+                and time.time() < client.token_expiry - self.refresh_margin)
+
+    async def ensure(self) -> bool:
+        """Make sure there is a usable session, renewing it at most once across callers"""
+        if self.fresh:
+            return True
+        async with self._lock:
+            if self.fresh:
+                return True
+            if self.angel_client.smart_api is None and await self.angel_client.get_cached_tokens() and self.fresh:
+                logger.info("Reusing cached Angel One session")
+                return True
+            return await self._renew()
+
+    async def renew(self) -> bool:
+        """Replace the session even if it looks fresh, e.g. after the broker rejected it"""
+        async with self._lock:
+            return await self._renew()
+
+    async def _renew(self) -> bool:
+        client = self.angel_client
+        if client.smart_api is not None and client.refresh_token and time.time() < client.token_expiry:
+            if await client.refresh_session():
+                self.refreshes += 1
+                return True
+            logger.warning("Angel One token refresh failed, logging in again")
+        self.logins += 1
+        return await client.authenticate()
+
+    def start(self):
+        """Renew the session ahead of its expiry in the background"""
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh())
+
+    def stop(self):
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+
+    async def _refresh(self):
+        while True:
+            due = self.angel_client.token_expiry - self.refresh_margin
+            await asyncio.sleep(max(due - time.time(), settings.broker_session_retry_delay))
+            if not self.fresh:
+                try:
+                    if not await self.renew():
+                        logger.error("Scheduled Angel One session renewal failed")
+                except Exception as e:
+                    logger.error(f"Error renewing Angel One session: {str(e)}")
@@ -0,0 +1,310 @@
+# app/core/feed_manager.py
+import asyncio
+import json
+import random
+import threading
+import time
+from typing import Dict, Any, Callable, Optional, List
+from uuid import uuid4
+import structlog
+from SmartApi.smartWebSocketV2 import SmartWebSocketV2
+from app.core.angel_client import AngelOneClient
+from app.config import settings
+
+logger = structlog.get_logger()
+
+class RawSmartWebSocketV2(SmartWebSocketV2):
+    """SmartWebSocketV2 that hands raw binary frames to on_data.
+
+    The stock client parses every frame with per-field slicing before calling
+    on_data; decoding is left to TickDecoder instead. It also keeps its
+    subscription book per instance (the base class shares one dict across
+    every connection).
+    """
+
+    def __init__(self, *args, **kwargs):
+        # Reconnects are driven by FeedManager, not by sleeping on the socket thread
+        kwargs.setdefault('max_retry_attempt', 0)
+        super().__init__(*args, **kwargs)
+        self.input_request_dict = {}
+        if settings.smartapi_ws_url:
+            self.ROOT_URI = settings.smartapi_ws_url
+
+    def _on_data(self, wsapp, data, data_type, continue_flag):
+        if data_type == 2:
+            self.on_data(wsapp, data)
+
+    def unsubscribe(self, correlation_id, mode, token_list):
+        """Unsubscribe tokens and drop them from the resubscription book"""
+        book = self.input_request_dict.get(mode, {})
+        for entry in token_list:
+            remaining = [t for t in book.get(entry['exchangeType'], []) if t not in entry['tokens']]
+            if remaining:
+                book[entry['exchangeType']] = remaining
+            else:
+                book.pop(entry['exchangeType'], None)
+        self.wsapp.send(json.dumps({
+            "correlationID": correlation_id,
+            "action": self.UNSUBSCRIBE_ACTION,
+            "params": {"mode": mode, "tokenList": token_list}
+        }))
+
+class FeedConnection:
+    """One SmartWebSocketV2 connection carrying a shard of the subscribed tokens"""
+
+    def __init__(self, index: int, manager: 'FeedManager'):
+        self.index = index
+        self.manager = manager
+        self.websocket: Optional[RawSmartWebSocketV2] = None
+        self.thread: Optional[threading.Thread] = None
+        self.tokens: Dict[str, int] = {}  # token -> exchange type
+        self.is_connected = False
+        self._opened: Optional[asyncio.Event] = None
+
+    @property
+    def spare_capacity(self) -> int:
+        return self.manager.max_tokens_per_connection - len(self.tokens)
+
+    async def start(self):
+        """Open the socket on its own thread and wait until it is ready"""
+        client = self.manager.angel_client
+        self.websocket = RawSmartWebSocketV2(
+            client.auth_token,
+            client.api_key,
+            client.username,
+            client.feed_token
+        )
+        self.websocket.on_open = self._on_open
+        self.websocket.on_data = self.manager.on_data
+        self.websocket.on_error = self._on_error
+        self.websocket.on_close = self._on_close
+
+        # SmartWebSocketV2.connect runs the socket until it closes
+        self._opened = asyncio.Event()
+        self.thread = threading.Thread(target=self._run, name=f"smartapi-feed-{self.index}", daemon=True)
+        self.thread.start()
+        await asyncio.wait_for(self._opened.wait(), timeout=settings.feed_connect_timeout)
+        self.is_connected = True
+        logger.info(f"Feed connection {self.index} opened")
+
+    def stop(self):
+        # Cleared first, so the close callback does not report a lost connection
+        self.is_connected = False
+        if self.websocket:
+            self.websocket.close_connection()
+
+    def subscribe(self, tokens: Dict[str, int]):
+        """Subscribe tokens on this connection, one request per exchange type"""
+        if not tokens:
+            return
+        self.websocket.subscribe(uuid4().hex[:10], self.manager.mode, _token_list(tokens))
+        self.tokens.update(tokens)
+
+    def unsubscribe(self, tokens: Dict[str, int]):
+        if not tokens:
+            return
+        self.websocket.unsubscribe(uuid4().hex[:10], self.manager.mode, _token_list(tokens))
+        for token in tokens:
+            self.tokens.pop(token, None)
+
+    def _run(self):
+        try:
+            self.websocket.connect()
+        except Exception as e:
+            logger.error(f"Feed connection {self.index} thread error: {str(e)}")
+        self._lost()
+
+    def _on_open(self, ws):
+        self.manager.call_soon(self._opened.set)
+
+    def _on_error(self, ws, error):
+        logger.error(f"Feed connection {self.index} error: {str(error)}")
+        self._lost()
+
+    def _on_close(self, ws):
+        logger.info(f"Feed connection {self.index} closed")
+        self._lost()
+
+    def _lost(self):
+        if self.is_connected:
+            self.is_connected = False
+            self.manager.call_soon(self.manager.connection_lost, self)
+
+class FeedManager:
+    """Spreads token subscriptions across several feed connections.
+
+    Tokens are placed on the least loaded live connection that still has
+    room under the broker's per-connection limit; a new connection is opened
+    only when all live ones are full. When a connection drops, its tokens
+    are moved to the surviving connections, and whatever does not fit is
+    parked in ``pending_tokens`` until capacity comes back. Every connection
+    feeds the same ``on_data`` callback, so consumers see one merged stream.
+
+    While tokens are pending, a supervisor task retries with jittered
+    exponential backoff and replays them in bulk. ``on_resubscribed`` is then
+    called with the restored tokens and the time each one was lost, so the
+    caller can backfill the gap.
+    """
+
+    def __init__(self, angel_client: AngelOneClient, on_data: Callable,
+                 max_connections: int = None, max_tokens_per_connection: int = None, mode: int = None,
+                 on_resubscribed: Optional[Callable] = None):
+        self.angel_client = angel_client
+        self.on_data = on_data
+        self.on_resubscribed = on_resubscribed
+        self.max_connections = max_connections or settings.feed_max_connections
+        self.max_tokens_per_connection = max_tokens_per_connection or settings.feed_max_tokens_per_connection
+        self.mode = mode or settings.feed_subscription_mode
+        self.connections: List[FeedConnection] = []
+        self.pending_tokens: Dict[str, int] = {}
+        self.lost_at: Dict[str, float] = {}
+        self.reconnect_attempts = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = asyncio.Lock()
+        self._supervisor: Optional[asyncio.Task] = None
+        self._running = False
+
+    @property
+    def is_connected(self) -> bool:
+        return any(conn.is_connected for conn in self.connections)
+
+    @property
+    def subscribed_tokens(self) -> Dict[str, int]:
+        tokens = dict(self.pending_tokens)
+        for conn in self.connections:
+            tokens.update(conn.tokens)
+        return tokens
+
+    def call_soon(self, callback: Callable, *args):
+        """Schedule a callback on the event loop from a feed thread"""
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(callback, *args)
+
+    async def start(self):
+        """Open the first connection"""
+        self._loop = asyncio.get_running_loop()
+        self._running = True
+        if not self.is_connected:
+            await self._open_connection()
+
+    async def stop(self):
+        self._running = False
+        if self._supervisor:
+            self._supervisor.cancel()
+            self._supervisor = None
+        for conn in self.connections:
+            conn.stop()
+        self.connections.clear()
+        self.pending_tokens.clear()
+        self.lost_at.clear()
+
+    async def subscribe(self, tokens: Dict[str, int]):
+        """Subscribe tokens (token -> exchange type), sharding them across connections"""
+        async with self._lock:
+            current = self.subscribed_tokens
+            new_tokens = {t: ex for t, ex in tokens.items() if t not in current}
+            await self._place(new_tokens)
+
+    async def unsubscribe(self, tokens: List[str]):
+        async with self._lock:
+            for token in tokens:
+                self.pending_tokens.pop(token, None)
+                self.lost_at.pop(token, None)
+            for conn in self.connections:
+                owned = {t: conn.tokens[t] for t in tokens if t in conn.tokens}
+                if owned and conn.is_connected:
+                    conn.unsubscribe(owned)
+
+    def connection_lost(self, conn: FeedConnection):
+        """Loop-side reaction to a dropped connection"""
+        if not self._running:
+            return
+        logger.warning(f"Feed connection {conn.index} lost with {len(conn.tokens)} tokens")
+        now = time.time()
+        for token in conn.tokens:
+            self.lost_at.setdefault(token, now)
+        self.pending_tokens.update(conn.tokens)
+        conn.tokens.clear()
+        if conn in self.connections:
+            self.connections.remove(conn)
+        if self.pending_tokens and (self._supervisor is None or self._supervisor.done()):
+            self._supervisor = asyncio.ensure_future(self._supervise())
+
+    async def rebalance(self) -> Dict[str, int]:
+        """Place pending tokens on live connections, opening new ones if allowed.
+
+        Returns the tokens that were placed.
+        """
+        async with self._lock:
+            pending, self.pending_tokens = self.pending_tokens, {}
+            await self._place(pending)
+            return {t: ex for t, ex in pending.items() if t not in self.pending_tokens}
+
+    async def _supervise(self):
+        """Restore pending tokens with jittered exponential backoff"""
+        failures = 0
+        while self.pending_tokens:
+            delay = min(settings.feed_reconnect_max_delay, settings.feed_reconnect_base_delay * 2 ** failures)
+            # Full jitter keeps several bots from reconnecting in lockstep
+            await asyncio.sleep(random.uniform(0, delay))
+            self.reconnect_attempts += 1
+
+            if failures and failures % settings.feed_reauth_after_failures == 0:
+                logger.info("Re-authenticating before next feed reconnect")
+                await self.angel_client.session.renew()
+
+            placed = await self.rebalance()
+            if not placed:
+                failures += 1
+                logger.warning(f"Feed reconnect attempt failed, {len(self.pending_tokens)} tokens pending")
+                continue
+
+            failures = 0
+            lost_at = {token: self.lost_at.pop(token, time.time()) for token in placed}
+            logger.info(f"Resubscribed {len(placed)} tokens after reconnect")
+            if self.on_resubscribed:
+                try:
+                    await self.on_resubscribed(placed, lost_at)
+                except Exception as e:
+                    logger.error(f"Error in resubscription callback: {str(e)}")
+
+    async def _place(self, tokens: Dict[str, int]):
+        remaining = dict(tokens)
+        while remaining:
+            live = [c for c in self.connections if c.is_connected and c.spare_capacity > 0]
+            if not live:
+                if len(self.connections) >= self.max_connections:
+                    break
+                try:
+                    live = [await self._open_connection()]
+                except Exception as e:
+                    logger.error(f"Unable to open feed connection: {str(e)}")
+                    break
+
+            # Least loaded first so shards stay even
+            conn = min(live, key=lambda c: len(c.tokens))
+            batch = dict(list(remaining.items())[:conn.spare_capacity])
+            try:
+                conn.subscribe(batch)
+            except Exception as e:
+                logger.error(f"Subscription error on feed connection {conn.index}: {str(e)}")
+                break
+            for token in batch:
+                del remaining[token]
+
+        if remaining:
+            logger.warning(f"{len(remaining)} tokens waiting for feed capacity")
+            self.pending_tokens.update(remaining)
+
+    async def _open_connection(self) -> FeedConnection:
+        index = max((c.index for c in self.connections), default=-1) + 1
+        conn = FeedConnection(index, self)
+        await conn.start()
+        self.connections.append(conn)
+        return conn
+
+def _token_list(tokens: Dict[str, int]) -> List[Dict[str, Any]]:
+    by_exchange: Dict[int, List[str]] = {}
+    for token, exchange_type in tokens.items():
+        by_exchange.setdefault(exchange_type, []).append(token)
+    return [{"exchangeType": ex, "tokens": toks} for ex, toks in by_exchange.items()]
@@ -0,0 +1,103 @@
+# app/core/indicator_cache.py
+import sys
+from collections import OrderedDict
+from typing import Dict, Any, Callable, List, Optional, Tuple
+import numpy as np
+import structlog
+from app.config import settings
+from app.utils.metrics import indicator_cache_hits, indicator_cache_misses, indicator_cache_bytes
+
+logger = structlog.get_logger()
+
+CacheKey = Tuple[str, str, str, Tuple, int]  # symbol, timeframe, indicator, params, bar index
+
+# Rough per-entry overhead of the key tuple and the dict slots
+_ENTRY_OVERHEAD = 400
+
+def _sizeof(value: Any) -> int:
+    if isinstance(value, np.ndarray):
+        return value.nbytes + 112
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_sizeof(v) for v in value.values())
+    return sys.getsizeof(value)
+
+class IndicatorCache:
+    """Memoises indicator values per symbol, timeframe, indicator, params and bar.
+
+    Bar history only changes when a bar closes, so a value computed for bar
+    ``bar_index`` stays valid for every strategy until the next close. Entries
+    are evicted least recently used once their estimated size exceeds
+    ``max_bytes``. Closing a bar drops the entries of older bars of that series;
+    the latest bar's values are kept because they become the "previous" values
+    of the next bar.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        self.max_bytes = max_bytes or settings.indicator_cache_max_bytes
+        self.nbytes = 0
+        self._entries: OrderedDict = OrderedDict()  # key -> (value, size)
+        self._series: Dict[Tuple[str, str], Dict[CacheKey, None]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_compute(self, symbol: str, timeframe: str, indicator: str, params: Tuple,
+                       bar_index: int, compute: Callable[[], Any]) -> Any:
+        """Cached value of an indicator at a bar, calling ``compute`` on a miss"""
+        key = (symbol, timeframe, indicator, params, bar_index)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            indicator_cache_hits.labels(indicator=indicator).inc()
+            return entry[0]
+
+        indicator_cache_misses.labels(indicator=indicator).inc()
+        value = compute()
+        self._put(key, value)
+        return value
+
+    def invalidate(self, symbol: str, timeframe: Optional[str] = None, before: Optional[int] = None):
+        """Drop entries of a series (every timeframe if none given), optionally only bars older than ``before``"""
+        series = [s for s in self._series if s[0] == symbol and (timeframe is None or s[1] == timeframe)]
+        for name in series:
+            stale = [key for key in self._series[name] if before is None or key[4] < before]
+            for key in stale:
+                self._remove(key)
+
+    async def on_bar_closed(self, bar):
+        """Bar closed callback: drop values of bars before the latest one"""
+        keys = self._series.get((bar.symbol, bar.timeframe))
+        if keys:
+            self.invalidate(bar.symbol, bar.timeframe, before=max(key[4] for key in keys))
+
+    async def on_backfill(self, symbol: str, candles: List[Dict[str, Any]]):
+        """Backfill callback: backfilled rows rewrite history in place, so drop the symbol"""
+        self.invalidate(symbol)
+
+    def clear(self):
+        self._entries.clear()
+        self._series.clear()
+        self.nbytes = 0
+        indicator_cache_bytes.set(0)
+
+    def _put(self, key: CacheKey, value: Any):
+        size = _sizeof(value) + _ENTRY_OVERHEAD
+        self._entries[key] = (value, size)
+        self._series.setdefault(key[:2], {})[key] = None
+        self.nbytes += size
+        while self.nbytes > self.max_bytes and len(self._entries) > 1:
+            self._remove(next(iter(self._entries)))
+        indicator_cache_bytes.set(self.nbytes)
+
+    def _remove(self, key: CacheKey):
+        _, size = self._entries.pop(key)
+        self.nbytes -= size
+        keys = self._series.get(key[:2])
+        if keys is not None:
+            keys.pop(key, None)
+            if not keys:
+                del self._series[key[:2]]
+        indicator_cache_bytes.set(self.nbytes)
+
+# Process-wide cache shared by every strategy reading the shared price history
+indicator_cache = IndicatorCache()
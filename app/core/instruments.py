@@ -0,0 +1,161 @@
+# app/core/instruments.py
+import asyncio
+import json
+import os
+import pickle
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Any, Iterable, Optional, Tuple
+import requests
+import structlog
+from app.config import settings
+
+logger = structlog.get_logger()
+
+IST = timezone(timedelta(hours=5, minutes=30))
+SNAPSHOT_VERSION = 1
+
+DerivativeKey = Tuple[str, date, float, str]  # (underlying, expiry, strike, CE / PE / FUT)
+
+class InstrumentMaster:
+    """Symbol and token indexes built from the broker's scrip master.
+
+    The master file is downloaded once per trading day. Its rows are reduced
+    to three per-exchange dicts: symbol -> token, token -> symbol, and
+    (underlying, expiry, strike, option type) -> token for derivatives,
+    where futures use type ``FUT`` and strike 0. Lookups are single dict
+    probes on strings the caller already holds.
+
+    The indexes are pickled to ``instrument_snapshot_path`` after each
+    download, so a restart on the same day loads them in milliseconds
+    instead of re-parsing the master.
+    """
+
+    def __init__(self, snapshot_path: str = None, url: str = None):
+        self.snapshot_path = Path(snapshot_path or settings.instrument_snapshot_path)
+        self.url = url or settings.instrument_master_url
+        self.trading_day: Optional[date] = None
+        self.tokens: Dict[str, Dict[str, str]] = {}  # exchange -> symbol -> token
+        self.symbols: Dict[str, Dict[str, str]] = {}  # exchange -> token -> symbol
+        self.derivatives: Dict[str, Dict[DerivativeKey, str]] = {}  # exchange -> key -> token
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return sum(len(tokens) for tokens in self.tokens.values())
+
+    def token(self, symbol: str, exchange: str = "NSE") -> Optional[str]:
+        tokens = self.tokens.get(exchange)
+        return tokens.get(symbol) if tokens is not None else None
+
+    def symbol(self, token: str, exchange: str = "NSE") -> Optional[str]:
+        symbols = self.symbols.get(exchange)
+        return symbols.get(token) if symbols is not None else None
+
+    def derivative_token(self, underlying: str, expiry: date, strike: float, option_type: str,
+                         exchange: str = "NFO") -> Optional[str]:
+        """Token of a future (option_type FUT, strike 0) or option (CE / PE, strike in rupees)"""
+        derivatives = self.derivatives.get(exchange)
+        return derivatives.get((underlying, expiry, strike, option_type)) if derivatives is not None else None
+
+    async def load(self, force: bool = False) -> bool:
+        """Make today's indexes available, from the snapshot when it is current"""
+        today = datetime.now(IST).date()
+        if not force and self.trading_day == today:
+            return True
+        if not force and await asyncio.to_thread(self.load_snapshot) and self.trading_day == today:
+            return True
+        try:
+            rows = await asyncio.to_thread(self._download)
+            self.build(rows, today)
+            await asyncio.to_thread(self.save_snapshot)
+            return True
+        except Exception as e:
+            logger.error(f"Error loading instrument master: {str(e)}")
+            # A stale snapshot beats no lookups at all
+            return bool(self.tokens)
+
+    def build(self, rows: Iterable[Dict[str, Any]], trading_day: date):
+        """Index scrip master rows"""
+        start = time.perf_counter()
+        tokens: Dict[str, Dict[str, str]] = {}
+        symbols: Dict[str, Dict[str, str]] = {}
+        derivatives: Dict[str, Dict[DerivativeKey, str]] = {}
+        expiries: Dict[str, date] = {}
+
+        for row in rows:
+            exchange = sys.intern(row['exch_seg'])
+            token, symbol = row['token'], row['symbol']
+            tokens.setdefault(exchange, {})[symbol] = token
+            symbols.setdefault(exchange, {})[token] = symbol
+
+            instrument_type = row.get('instrumenttype') or ''
+            if not row.get('expiry') or not instrument_type:
+                continue
+            expiry = expiries.get(row['expiry'])
+            if expiry is None:
+                expiry = expiries[row['expiry']] = datetime.strptime(row['expiry'], '%d%b%Y').date()
+            if instrument_type.startswith('FUT'):
+                option_type, strike = 'FUT', 0.0
+            else:
+                # Options end in CE or PE; strikes are listed in paise
+                option_type, strike = symbol[-2:], float(row['strike']) / 100
+            key = (sys.intern(row['name']), expiry, strike, sys.intern(option_type))
+            derivatives.setdefault(exchange, {})[key] = token
+
+        self.tokens, self.symbols, self.derivatives = tokens, symbols, derivatives
+        self.trading_day = trading_day
+        logger.info(f"Indexed {len(self)} instruments in {time.perf_counter() - start:.2f}s")
+
+    def save_snapshot(self):
+        self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        partial = self.snapshot_path.with_suffix('.tmp')
+        with open(partial, 'wb') as f:
+            pickle.dump((SNAPSHOT_VERSION, self.trading_day, self.tokens, self.symbols, self.derivatives),
+                        f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(partial, self.snapshot_path)
+
+    def load_snapshot(self) -> bool:
+        """Load the last saved indexes, whatever day they are from"""
+        try:
+            with open(self.snapshot_path, 'rb') as f:
+                version, trading_day, tokens, symbols, derivatives = pickle.load(f)
+            if version != SNAPSHOT_VERSION:
+                return False
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.error(f"Error reading instrument snapshot: {str(e)}")
+            return False
+        self.tokens, self.symbols, self.derivatives = tokens, symbols, derivatives
+        self.trading_day = trading_day
+        return True
+
+    def start(self):
+        """Reload the master every day at ``instrument_refresh_time`` IST"""
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh())
+
+    def stop(self):
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+
+    async def _refresh(self):
+        hour, minute = (int(part) for part in settings.instrument_refresh_time.split(':'))
+        while True:
+            now = datetime.now(IST)
+            due = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+            if due <= now:
+                due += timedelta(days=1)
+            await asyncio.sleep((due - now).total_seconds())
+            await self.load(force=True)
+
+    def _download(self):
+        logger.info(f"Downloading instrument master from {self.url}")
+        response = requests.get(self.url, timeout=120)
+        response.raise_for_status()
+        return json.loads(response.content)
+
+instrument_master = InstrumentMaster()
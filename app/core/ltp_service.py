@@ -0,0 +1,122 @@
+# app/core/ltp_service.py
+import asyncio
+import time
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+import structlog
+from app.core.angel_client import AngelOneClient
+from app.config import settings
+from app.utils.metrics import ltp_lookups, ltp_batch_size
+
+logger = structlog.get_logger()
+
+class LTPService:
+    """Last traded prices for the order path.
+
+    A lookup is answered from the live tick stream when the symbol's latest
+    tick is at most ``ltp_max_age`` seconds old. Misses are coalesced: a
+    symbol already being fetched shares the in-flight request, and new
+    misses are collected for ``ltp_batch_window`` seconds (or until
+    ``ltp_batch_size`` are waiting) and fetched with one bulk ``LTP`` quote
+    request, so a burst of signals on many symbols costs one round trip.
+    Register ``on_tick`` as a market data callback.
+    """
+
+    def __init__(self, angel_client: AngelOneClient, max_age: float = None,
+                 batch_size: int = None, batch_window: float = None):
+        self.angel_client = angel_client
+        self.max_age = max_age if max_age is not None else settings.ltp_max_age
+        self.batch_size = batch_size or settings.ltp_batch_size
+        self.batch_window = batch_window if batch_window is not None else settings.ltp_batch_window
+        self.prices: Dict[str, Tuple[float, float]] = {}  # symbol -> (ltp, monotonic time)
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}  # (exchange, symbol) -> pending price
+        self._queued: List[Tuple[str, str]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def on_tick(self, data: Dict[str, Any]):
+        """Market data callback: remember each symbol's latest price"""
+        symbol = data.get('symbol')
+        if symbol:
+            self.prices[symbol] = (data['ltp'], time.monotonic())
+
+    def cached(self, symbol: str) -> Optional[float]:
+        """Price from the tick stream if it is fresh enough"""
+        entry = self.prices.get(symbol)
+        if entry is not None and time.monotonic() - entry[1] <= self.max_age:
+            return entry[0]
+        return None
+
+    async def get_ltp(self, symbol: str, exchange: str = 'NSE') -> Optional[float]:
+        """Get Last Traded Price"""
+        ltp = self.cached(symbol)
+        if ltp is not None:
+            ltp_lookups.labels(source='tick').inc()
+            return ltp
+
+        key = (exchange, symbol)
+        future = self._inflight.get(key)
+        if future is None:
+            ltp_lookups.labels(source='request').inc()
+            future = self._inflight[key] = asyncio.get_running_loop().create_future()
+            self._queued.append(key)
+            if len(self._queued) >= self.batch_size:
+                self._flush()
+            elif self._flush_handle is None:
+                self._flush_handle = asyncio.get_running_loop().call_later(self.batch_window, self._flush)
+        else:
+            ltp_lookups.labels(source='shared').inc()
+        # A cancelled caller must not cancel the lookup other callers share
+        return await asyncio.shield(future)
+
+    async def get_ltps(self, symbols: Iterable[Tuple[str, str]]) -> Dict[str, Optional[float]]:
+        """Prices for several (symbol, exchange) pairs, fetched together"""
+        pairs = list(symbols)
+        prices = await asyncio.gather(*(self.get_ltp(symbol, exchange) for symbol, exchange in pairs))
+        return {symbol: price for (symbol, _), price in zip(pairs, prices)}
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        while self._queued:
+            batch, self._queued = self._queued[:self.batch_size], self._queued[self.batch_size:]
+            task = asyncio.ensure_future(self._fetch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _fetch(self, batch: List[Tuple[str, str]]):
+        """One bulk quote request for a batch of symbols"""
+        prices: Dict[Tuple[str, str], float] = {}
+        try:
+            tokens = {}
+            for exchange, symbol in batch:
+                token = await self.angel_client._get_symbol_token(symbol, exchange)
+                if token is not None:
+                    tokens[(exchange, symbol)] = str(token)
+            if not tokens:
+                return
+            exchange_tokens: Dict[str, List[str]] = {}
+            for (exchange, _), token in tokens.items():
+                requested = exchange_tokens.setdefault(exchange, [])
+                if token not in requested:
+                    requested.append(token)
+
+            ltp_batch_size.observe(len(batch))
+            rows = await self.angel_client.get_market_data("LTP", exchange_tokens)
+            quotes = {(row['exchange'], str(row['symbolToken'])): float(row['ltp']) for row in rows}
+
+            now = time.monotonic()
+            for key, token in tokens.items():
+                ltp = quotes.get((key[0], token))
+                if ltp is not None:
+                    prices[key] = ltp
+                    if self.cached(key[1]) is None:
+                        self.prices[key[1]] = (ltp, now)
+
+        except Exception as e:
+            logger.error(f"Error fetching LTP batch: {str(e)}")
+        finally:
+            for key in batch:
+                future = self._inflight.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_result(prices.get(key))
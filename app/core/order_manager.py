@@ -4,6 +4,7 @@ from typing import Dict, Any, List, Optional
 from uuid import uuid4
 import structlog
 from app.core.angel_client import AngelOneClient
+from app.core.ltp_service import LTPService
 from app.core.risk_manager import RiskManager
 from app.models.schemas import OrderCreate, OrderResponse, OrderStatusEnum
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -11,9 +12,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 logger = structlog.get_logger()
 
 class OrderManager:
-    def __init__(self, angel_client: AngelOneClient, risk_manager: RiskManager):
+    def __init__(self, angel_client: AngelOneClient, risk_manager: RiskManager,
+                 ltp_service: Optional[LTPService] = None):
         self.angel_client = angel_client
         self.risk_manager = risk_manager
+        self.ltp_service = ltp_service or LTPService(angel_client)
         self.pending_orders: Dict[str, Dict[str, Any]] = {}
         self.order_callbacks = {}
         
@@ -21,7 +24,7 @@ class OrderManager:
         """Place order with risk validation"""
         try:
             # Get current market price
-            current_price = await self.angel_client.get_ltp(order.symbol, order.exchange)
+            current_price = await self.ltp_service.get_ltp(order.symbol, order.exchange)
             if not current_price:
                 return {
                     'success': False,
@@ -63,11 +66,7 @@ class OrderManager:
                 db_order.status = OrderStatusEnum.OPEN
                 
                 # Track pending order
-                self.pending_orders[order_id] = {
-                    'db_id': str(db_order.id),
-                    'order': order,
-                    'timestamp': asyncio.get_event_loop().time()
-                }
+                self.track_order(order_id, order, str(db_order.id))
                 
                 # Update risk manager
                 self.risk_manager.increment_order_count()
@@ -146,20 +145,30 @@ class OrderManager:
         await db.flush()
         return db_order
     
+    def track_order(self, order_id: str, order: OrderCreate, db_id: Optional[str] = None):
+        """Follow an order placed elsewhere (e.g. by the strategy engine) until it is done"""
+        self.pending_orders[order_id] = {
+            'db_id': db_id,
+            'order': order,
+            'timestamp': asyncio.get_event_loop().time()
+        }
+    
     async def update_order_status(self, order_id: str, status: str, filled_qty: int = 0, avg_price: float = 0.0):
-        """Update order status from WebSocket feed"""
+        """Update order status from the broker's order updates"""
         try:
             if order_id in self.pending_orders:
                 pending_order = self.pending_orders[order_id]
+                status = status.upper()
                 
-                # Update position in risk manager if filled
-                if status == "COMPLETE":
+                # Update position in risk manager once the order is done, including partly filled cancels
+                if status in ("COMPLETE", "CANCELLED", "REJECTED"):
                     order = pending_order['order']
-                    await self.risk_manager.update_position(
-                        order.symbol,
-                        filled_qty,
-                        order.transaction_type.value
-                    )
+                    if filled_qty:
+                        await self.risk_manager.update_position(
+                            order.symbol,
+                            filled_qty,
+                            order.transaction_type.value
+                        )
                     
                     # Remove from pending orders
                     del self.pending_orders[order_id]
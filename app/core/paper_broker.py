@@ -0,0 +1,216 @@
+# app/core/paper_broker.py
+import asyncio
+import math
+import time
+from typing import Dict, Any, Callable, List, Optional, Set
+from uuid import uuid4
+import structlog
+from app.core.angel_client import AngelOneClient
+from app.config import settings
+
+logger = structlog.get_logger()
+
+class PaperBroker:
+    """Simulated order execution against the live tick stream.
+
+    Implements the trading surface of AngelOneClient (``place_order``,
+    ``cancel_order``, ``get_positions``, ``get_orders``, ``get_ltp``) and
+    forwards everything else, including authentication and market data, to
+    the wrapped live client. Register ``on_tick`` as a market data callback.
+
+    Orders rest for ``paper_latency_ms`` before they can trade. Market orders
+    then fill at the best opposite quote when the tick carries depth, else at
+    the LTP moved ``paper_slippage_bps`` against the order. Limit orders fill
+    at their limit once the LTP trades through it. Each tick fills at most
+    ``paper_fill_ratio`` of the order quantity, so orders below 1.0 fill in
+    parts over several ticks. Order and position rows use the field names of
+    the SmartAPI order book and position book.
+    """
+
+    def __init__(self, angel_client: AngelOneClient, slippage_bps: float = None,
+                 latency_ms: float = None, fill_ratio: float = None):
+        self.angel_client = angel_client
+        self.slippage = (slippage_bps if slippage_bps is not None else settings.paper_slippage_bps) / 10000
+        self.latency = (latency_ms if latency_ms is not None else settings.paper_latency_ms) / 1000
+        self.fill_ratio = fill_ratio if fill_ratio is not None else settings.paper_fill_ratio
+        self.orders: Dict[str, Dict[str, Any]] = {}
+        self.positions: Dict[str, Dict[str, Any]] = {}
+        self.last_ticks: Dict[str, Dict[str, Any]] = {}
+        self.order_listeners: Dict[str, Callable] = {}
+        self._working: Dict[str, Dict[str, Dict[str, Any]]] = {}  # symbol -> order id -> order
+        self._tasks: Set[asyncio.Task] = set()
+
+    def __getattr__(self, name: str):
+        # Authentication, tokens and market data come from the live client
+        if name == 'angel_client':
+            raise AttributeError(name)
+        return getattr(self.angel_client, name)
+
+    def add_order_listener(self, name: str, callback: Callable):
+        """Add a callback receiving (order_id, status, filled_qty, avg_price) on every fill or cancel"""
+        self.order_listeners[name] = callback
+
+    async def place_order(self, order_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Accept an order; it starts trading after the simulated latency"""
+        try:
+            quantity = int(order_data['quantity'])
+            if quantity <= 0:
+                return {'status': False, 'message': 'Invalid quantity'}
+            order_type = _value(order_data.get('order_type', 'MARKET'))
+            price = float(order_data.get('price') or 0)
+            if order_type != 'MARKET' and price <= 0:
+                return {'status': False, 'message': f'{order_type} order needs a price'}
+
+            order_id = f"PAPER{uuid4().hex[:10].upper()}"
+            self.orders[order_id] = {
+                'orderid': order_id,
+                'tradingsymbol': order_data['symbol'],
+                'exchange': order_data.get('exchange', 'NSE'),
+                'transactiontype': _value(order_data['transaction_type']),
+                'ordertype': order_type,
+                'quantity': quantity,
+                'price': price,
+                'filledshares': 0,
+                'unfilledshares': quantity,
+                'averageprice': 0.0,
+                'status': 'open pending',
+                'text': '',
+                'updatetime': time.time()
+            }
+            asyncio.get_running_loop().call_later(self.latency, self._activate, order_id)
+            return {'status': True, 'message': 'SUCCESS', 'data': {'orderid': order_id}}
+
+        except Exception as e:
+            logger.error(f"Paper order placement error: {str(e)}")
+            return {'status': False, 'message': str(e)}
+
+    async def cancel_order(self, order_id: str, variety: str = "NORMAL") -> Dict[str, Any]:
+        """Cancel the unfilled part of an order"""
+        order = self.orders.get(order_id)
+        if order is None:
+            return {'status': False, 'message': f'Unknown order {order_id}'}
+        if order['status'] not in ('open', 'open pending'):
+            return {'status': False, 'message': f"Order is {order['status']}"}
+
+        order['status'] = 'cancelled'
+        order['updatetime'] = time.time()
+        self._working.get(order['tradingsymbol'], {}).pop(order_id, None)
+        await self._notify(order)
+        return {'status': True, 'message': 'SUCCESS', 'data': {'orderid': order_id}}
+
+    async def get_positions(self) -> List[Dict[str, Any]]:
+        positions = []
+        for symbol, position in self.positions.items():
+            ltp = self._ltp(symbol) or position['netprice']
+            unrealised = (ltp - position['netprice']) * position['netqty']
+            positions.append({
+                **position,
+                'ltp': ltp,
+                'unrealised': unrealised,
+                'pnl': position['realised'] + unrealised
+            })
+        return positions
+
+    async def get_orders(self) -> List[Dict[str, Any]]:
+        return [dict(order) for order in self.orders.values()]
+
+    async def get_ltp(self, symbol: str, exchange: str) -> Optional[float]:
+        """Last traded price from the tick stream, else from the live client"""
+        ltp = self._ltp(symbol)
+        if ltp is None:
+            return await self.angel_client.get_ltp(symbol, exchange)
+        return ltp
+
+    async def on_tick(self, data: Dict[str, Any]):
+        """Market data callback: trade working orders of the tick's symbol"""
+        symbol = data.get('symbol')
+        self.last_ticks[symbol] = data
+        working = self._working.get(symbol)
+        if working:
+            for order in list(working.values()):
+                await self._match(order, data)
+
+    def _activate(self, order_id: str):
+        order = self.orders.get(order_id)
+        if order is None or order['status'] != 'open pending':
+            return
+        order['status'] = 'open'
+        self._working.setdefault(order['tradingsymbol'], {})[order_id] = order
+        tick = self.last_ticks.get(order['tradingsymbol'])
+        if tick is not None and order['ordertype'] == 'MARKET':
+            # A market order trades against the current market, not the next tick
+            task = asyncio.ensure_future(self._match(order, tick))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _match(self, order: Dict[str, Any], tick: Dict[str, Any]):
+        if order['status'] != 'open':
+            return
+        buy = order['transactiontype'] == 'BUY'
+        ltp = tick['ltp']
+
+        if order['ordertype'] == 'MARKET':
+            quotes = tick.get('best_5_sell' if buy else 'best_5_buy')
+            quote = quotes[0]['price'] if quotes and quotes[0].get('price') else None
+            price = quote or ltp * (1 + self.slippage if buy else 1 - self.slippage)
+        elif (buy and ltp <= order['price']) or (not buy and ltp >= order['price']):
+            price = order['price']
+        else:
+            return
+
+        quantity = order['unfilledshares']
+        if self.fill_ratio < 1:
+            quantity = min(quantity, max(1, math.floor(order['quantity'] * self.fill_ratio)))
+        filled = order['filledshares']
+        order['averageprice'] = (order['averageprice'] * filled + price * quantity) / (filled + quantity)
+        order['filledshares'] = filled + quantity
+        order['unfilledshares'] -= quantity
+        order['updatetime'] = time.time()
+        if order['unfilledshares'] == 0:
+            order['status'] = 'complete'
+            self._working[order['tradingsymbol']].pop(order['orderid'], None)
+
+        self._book_fill(order, quantity if buy else -quantity, price)
+        await self._notify(order)
+
+    def _book_fill(self, order: Dict[str, Any], quantity: int, price: float):
+        symbol = order['tradingsymbol']
+        position = self.positions.get(symbol)
+        if position is None:
+            position = self.positions[symbol] = {
+                'tradingsymbol': symbol, 'exchange': order['exchange'], 'netqty': 0, 'netprice': 0.0,
+                'buyqty': 0, 'sellqty': 0, 'buyavgprice': 0.0, 'sellavgprice': 0.0, 'realised': 0.0
+            }
+        side = 'buy' if quantity > 0 else 'sell'
+        traded = position[f'{side}qty']
+        position[f'{side}avgprice'] = (position[f'{side}avgprice'] * traded + price * abs(quantity)) / (traded + abs(quantity))
+        position[f'{side}qty'] = traded + abs(quantity)
+
+        net = position['netqty']
+        if net == 0 or (net > 0) == (quantity > 0):
+            # Opening or adding: average the entry price
+            position['netprice'] = (position['netprice'] * abs(net) + price * abs(quantity)) / (abs(net) + abs(quantity))
+        else:
+            closed = min(abs(net), abs(quantity))
+            position['realised'] += closed * (price - position['netprice']) * (1 if net > 0 else -1)
+            if abs(quantity) > abs(net):
+                # Reversed through flat: the remainder opens at this price
+                position['netprice'] = price
+        position['netqty'] = net + quantity
+        if position['netqty'] == 0:
+            position['netprice'] = 0.0
+
+    async def _notify(self, order: Dict[str, Any]):
+        status = order['status'].upper()
+        for name, callback in list(self.order_listeners.items()):
+            try:
+                await callback(order['orderid'], status, order['filledshares'], order['averageprice'])
+            except Exception as e:
+                logger.error(f"Error in paper order listener {name}: {str(e)}")
+
+    def _ltp(self, symbol: str) -> Optional[float]:
+        tick = self.last_ticks.get(symbol)
+        return tick['ltp'] if tick else None
+
+def _value(field: Any) -> str:
+    return str(getattr(field, 'value', field))
@@ -0,0 +1,147 @@
+# app/core/price_history.py
+from typing import Dict, Optional, Tuple
+import numpy as np
+from app.config import settings
+
+COLUMNS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+_TIMESTAMP, _OPEN, _HIGH, _LOW, _CLOSE, _VOLUME = range(len(COLUMNS))
+
+class HistoryWindow:
+    """Zero-copy view of the last ``len(window)`` bars of one series.
+
+    Each column is a contiguous read-only NumPy view into the ring buffer,
+    oldest bar first. ``bar_index`` is the total number of bars ever written
+    to the series, so it identifies the newest bar in the window.
+    """
+
+    __slots__ = ('timestamp', 'open', 'high', 'low', 'close', 'volume', 'bar_index')
+
+    def __init__(self, block: np.ndarray, bar_index: int):
+        self.timestamp, self.open, self.high, self.low, self.close, self.volume = block
+        self.bar_index = bar_index
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return getattr(self, column)
+
+class SeriesBuffer:
+    """Preallocated columnar ring buffer for one symbol and timeframe.
+
+    Every row is written twice, at ``i`` and ``i + capacity``, so the most
+    recent ``n <= capacity`` rows are always one contiguous slice and windows
+    never need to be stitched together or copied.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.count = 0
+        self._data = np.zeros((len(COLUMNS), 2 * capacity), dtype=np.float64)
+        self._view = self._data.view()
+        self._view.flags.writeable = False
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def append(self, row: Tuple[float, ...]):
+        pos = self.count % self.capacity
+        self._data[:, pos] = row
+        self._data[:, pos + self.capacity] = row
+        self.count += 1
+
+    def insert(self, row: Tuple[float, ...]) -> bool:
+        """Insert a row in timestamp order, moving newer rows up one bar index.
+
+        When the buffer is full the oldest row drops out; a row older than
+        all of them is not kept and ``False`` is returned.
+        """
+        held = len(self)
+        end = (self.count - 1) % self.capacity + self.capacity + 1 if self.count else self.capacity
+        rows = self._data[:, end - held:end]
+        at = int(np.searchsorted(rows[_TIMESTAMP], row[_TIMESTAMP]))
+        if held == self.capacity and at == 0:
+            return False
+        rows = np.insert(rows, at, row, axis=1)[:, -self.capacity:]
+        self.count += 1
+        positions = np.arange(self.count - rows.shape[1], self.count) % self.capacity
+        self._data[:, positions] = rows
+        self._data[:, positions + self.capacity] = rows
+        return True
+
+    def window(self, n: int) -> HistoryWindow:
+        n = min(n, len(self))
+        end = (self.count - 1) % self.capacity + self.capacity + 1 if self.count else self.capacity
+        return HistoryWindow(self._view[:, end - n:end], self.count)
+
+    def get_row(self, bar_index: int) -> Dict[str, float]:
+        pos = self._position(bar_index)
+        return dict(zip(COLUMNS, self._data[:, pos].tolist()))
+
+    def set_row(self, bar_index: int, row: Tuple[float, ...]):
+        pos = self._position(bar_index)
+        self._data[:, pos] = row
+        self._data[:, pos + self.capacity] = row
+
+    def find(self, timestamp: float) -> Optional[int]:
+        """Bar index of the row starting at ``timestamp``, searching newest first"""
+        for bar_index in range(self.count - 1, self.count - len(self) - 1, -1):
+            ts = self._data[_TIMESTAMP, self._position(bar_index)]
+            if ts == timestamp:
+                return bar_index
+            if ts < timestamp:
+                return None
+        return None
+
+    def _position(self, bar_index: int) -> int:
+        if not self.count - len(self) <= bar_index < self.count:
+            raise IndexError(f"Bar {bar_index} is no longer held (count={self.count})")
+        return bar_index % self.capacity
+
+class PriceHistory:
+    """Shared OHLCV history for every symbol and timeframe.
+
+    Buffers are allocated on the first bar of a series. Strategies read
+    through ``window`` and never build DataFrames on the hot path.
+    """
+
+    def __init__(self, capacity: int = None):
+        self.capacity = capacity or settings.bar_history_size
+        self._series: Dict[Tuple[str, str], SeriesBuffer] = {}
+
+    def series(self, symbol: str, timeframe: str, create: bool = False) -> Optional[SeriesBuffer]:
+        buffer = self._series.get((symbol, timeframe))
+        if buffer is None and create:
+            buffer = self._series[(symbol, timeframe)] = SeriesBuffer(self.capacity)
+        return buffer
+
+    def append(self, symbol: str, timeframe: str, timestamp: float, open_: float,
+               high: float, low: float, close: float, volume: float = 0):
+        self.series(symbol, timeframe, create=True).append((timestamp, open_, high, low, close, volume))
+
+    def append_bar(self, bar):
+        """Store a closed bar from the bar aggregator"""
+        self.series(bar.symbol, bar.timeframe, create=True).append(
+            (bar.start, bar.open, bar.high, bar.low, bar.close, bar.volume)
+        )
+
+    def window(self, symbol: str, timeframe: str, n: int) -> HistoryWindow:
+        """The most recent ``n`` bars (fewer if the series is shorter)"""
+        buffer = self._series.get((symbol, timeframe))
+        if buffer is None:
+            return _EMPTY_WINDOW
+        return buffer.window(n)
+
+    def bar_count(self, symbol: str, timeframe: str) -> int:
+        buffer = self._series.get((symbol, timeframe))
+        return buffer.count if buffer else 0
+
+    def clear(self):
+        self._series.clear()
+
+_EMPTY_BLOCK = np.zeros((len(COLUMNS), 0))
+_EMPTY_BLOCK.flags.writeable = False
+_EMPTY_WINDOW = HistoryWindow(_EMPTY_BLOCK, 0)
+
+# Process-wide store shared by the bar aggregator and the strategies
+price_history = PriceHistory()
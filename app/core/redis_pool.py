@@ -0,0 +1,100 @@
+# app/core/redis_pool.py
+import json
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Any, List, Optional
+import redis.asyncio as redis
+import structlog
+from app.config import settings
+from app.utils.metrics import redis_command_latency, redis_pool_connections
+
+logger = structlog.get_logger()
+
+class RedisPool:
+    """The process-wide asyncio Redis client.
+
+    Every component shares one connection pool of at most
+    ``redis_max_connections`` connections, so cache traffic never blocks the
+    event loop and never opens a connection per call. Values are stored as
+    JSON. ``get_many`` and ``set_many`` read or write many keys in one round
+    trip. Each round trip is timed per command, and pool usage is exported
+    after it.
+    """
+
+    def __init__(self, url: str = None, max_connections: int = None):
+        self.url = url or settings.redis_url
+        self.max_connections = max_connections or settings.redis_max_connections
+        self._client: Optional[redis.Redis] = None
+
+    @property
+    def client(self) -> redis.Redis:
+        if self._client is None:
+            pool = redis.ConnectionPool.from_url(
+                self.url,
+                max_connections=self.max_connections,
+                socket_timeout=settings.redis_socket_timeout,
+                socket_connect_timeout=settings.redis_socket_timeout
+            )
+            self._client = redis.Redis(connection_pool=pool)
+        return self._client
+
+    async def get_json(self, key: str) -> Any:
+        async with self._timed('get'):
+            value = await self.client.get(key)
+        return json.loads(value) if value is not None else None
+
+    async def set_json(self, key: str, value: Any, ttl: Optional[int] = None):
+        async with self._timed('set'):
+            await self.client.set(key, json.dumps(value), ex=ttl)
+
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """Read several JSON values in one round trip; missing keys map to None"""
+        if not keys:
+            return {}
+        async with self._timed('mget'):
+            values = await self.client.mget(keys)
+        return {key: json.loads(value) if value is not None else None for key, value in zip(keys, values)}
+
+    async def set_many(self, values: Dict[str, Any], ttl: Optional[int] = None):
+        """Write several JSON values in one pipelined round trip"""
+        if not values:
+            return
+        async with self._timed('pipeline'):
+            async with self.client.pipeline(transaction=False) as pipe:
+                for key, value in values.items():
+                    pipe.set(key, json.dumps(value), ex=ttl)
+                await pipe.execute()
+
+    async def publish(self, channel: str, message: Any) -> int:
+        async with self._timed('publish'):
+            return await self.client.publish(channel, json.dumps(message))
+
+    def pubsub(self) -> redis.client.PubSub:
+        """A subscriber on the shared pool; it holds one connection until closed"""
+        return self.client.pubsub()
+
+    async def ping(self) -> bool:
+        try:
+            async with self._timed('ping'):
+                return await self.client.ping()
+        except Exception as e:
+            logger.error(f"Redis ping failed: {str(e)}")
+            return False
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @asynccontextmanager
+    async def _timed(self, command: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            redis_command_latency.labels(command=command).observe(time.perf_counter() - start)
+            pool = getattr(self._client, 'connection_pool', None)
+            redis_pool_connections.labels(state='in_use').set(len(getattr(pool, '_in_use_connections', ())))
+            redis_pool_connections.labels(state='idle').set(len(getattr(pool, '_available_connections', ())))
+
+redis_pool = RedisPool()
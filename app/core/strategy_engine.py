@@ -1,241 +1,230 @@
 # app/core/strategy_engine.py
 import asyncio
-from typing import Dict, Any, List, Optional
-from abc import ABC, abstractmethod
-import pandas as pd
-import numpy as np
-from datetime import datetime, timedelta
+import time
+from enum import Enum
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple
 import structlog
 from app.core.angel_client import AngelOneClient
 from app.models.schemas import OrderCreate, TransactionTypeEnum, OrderTypeEnum
+from app.strategies.base_strategy import BaseStrategy, Cadence
+from app.strategies.sma_crossover import SMAStrategy
+from app.strategies.rsi_strategy import RSIStrategy
+from app.strategies.scalping_strategy import ScalpingStrategy
+from app.core.strategy_workers import StrategyWorkerPool
+from app.utils.metrics import strategy_latency, strategy_timeouts
+from app.config import settings
 
-logger = structlog.get_logger()
+if TYPE_CHECKING:
+    from app.core.order_manager import OrderManager
 
-class BaseStrategy(ABC):
-    def __init__(self, name: str, parameters: Dict[str, Any]):
-        self.name = name
-        self.parameters = parameters
-        self.is_active = False
-        self.positions = {}
-        self.orders = []
-        
-    @abstractmethod
-    async def generate_signal(self, market_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Generate trading signal based on market data"""
-        pass
-    
-    @abstractmethod
-    async def calculate_indicators(self, data: pd.DataFrame) -> Dict[str, float]:
-        """Calculate technical indicators"""
-        pass
-    
-    def activate(self):
-        """Activate strategy"""
-        self.is_active = True
-        logger.info(f"Strategy {self.name} activated")
-    
-    def deactivate(self):
-        """Deactivate strategy"""
-        self.is_active = False
-        logger.info(f"Strategy {self.name} deactivated")
+logger = structlog.get_logger()
 
-class SMAStrategy(BaseStrategy):
-    def __init__(self, parameters: Dict[str, Any]):
-        super().__init__("SMA_CROSSOVER", parameters)
-        self.short_period = parameters.get('short_period', 20)
-        self.long_period = parameters.get('long_period', 50)
-        self.symbol = parameters.get('symbol', 'SBIN-EQ')
-    
-    async def generate_signal(self, market_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Generate signal based on SMA crossover"""
-        try:
-            if not self.is_active:
-                return None
-            
-            # Get historical data for calculation
-            historical_data = await self._get_historical_data()
-            if len(historical_data) < self.long_period:
-                return None
-            
-            indicators = await self.calculate_indicators(historical_data)
-            
-            current_price = market_data.get('ltp', 0)
-            sma_short = indicators.get('sma_short', 0)
-            sma_long = indicators.get('sma_long', 0)
-            prev_sma_short = indicators.get('prev_sma_short', 0)
-            prev_sma_long = indicators.get('prev_sma_long', 0)
-            
-            # Check for crossover
-            if sma_short > sma_long and prev_sma_short <= prev_sma_long:
-                # Bullish crossover - Buy signal
-                return {
-                    'action': 'BUY',
-                    'symbol': self.symbol,
-                    'price': current_price,
-                    'quantity': self.parameters.get('quantity', 1),
-                    'reason': f'SMA bullish crossover: {sma_short:.2f} > {sma_long:.2f}'
-                }
-            
-            elif sma_short < sma_long and prev_sma_short >= prev_sma_long:
-                # Bearish crossover - Sell signal
-                return {
-                    'action': 'SELL',
-                    'symbol': self.symbol,
-                    'price': current_price,
-                    'quantity': self.parameters.get('quantity', 1),
-                    'reason': f'SMA bearish crossover: {sma_short:.2f} < {sma_long:.2f}'
-                }
-            
-            return None
-            
-        except Exception as e:
-            logger.error(f"Error generating SMA signal: {str(e)}")
-            return None
-    
-    async def calculate_indicators(self, data: pd.DataFrame) -> Dict[str, float]:
-        """Calculate SMA indicators"""
-        data['sma_short'] = data['close'].rolling(window=self.short_period).mean()
-        data['sma_long'] = data['close'].rolling(window=self.long_period).mean()
-        
-        return {
-            'sma_short': data['sma_short'].iloc[-1],
-            'sma_long': data['sma_long'].iloc[-1],
-            'prev_sma_short': data['sma_short'].iloc[-2],
-            'prev_sma_long': data['sma_long'].iloc[-2]
-        }
-    
-    async def _get_historical_data(self) -> pd.DataFrame:
-        """Get historical data for calculations"""
-        # This would fetch from database or API
-        # For demo, returning sample data
-        dates = pd.date_range(start='2024-01-01', periods=100, freq='D')
-        prices = np.random.randn(100).cumsum() + 100
-        
-        return pd.DataFrame({
-            'timestamp': dates,
-            'close': prices,
-            'open': prices * 0.99,
-            'high': prices * 1.02,
-            'low': prices * 0.98,
-            'volume': np.random.randint(1000, 10000, 100)
-        })
-
-class RSIStrategy(BaseStrategy):
-    def __init__(self, parameters: Dict[str, Any]):
-        super().__init__("RSI_MEAN_REVERSION", parameters)
-        self.rsi_period = parameters.get('rsi_period', 14)
-        self.oversold_level = parameters.get('oversold_level', 30)
-        self.overbought_level = parameters.get('overbought_level', 70)
-        self.symbol = parameters.get('symbol', 'SBIN-EQ')
-    
-    async def generate_signal(self, market_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Generate signal based on RSI levels"""
-        try:
-            if not self.is_active:
-                return None
-            
-            historical_data = await self._get_historical_data()
-            if len(historical_data) < self.rsi_period + 1:
-                return None
-            
-            indicators = await self.calculate_indicators(historical_data)
-            current_price = market_data.get('ltp', 0)
-            rsi = indicators.get('rsi', 50)
-            
-            # RSI oversold - Buy signal
-            if rsi < self.oversold_level:
-                return {
-                    'action': 'BUY',
-                    'symbol': self.symbol,
-                    'price': current_price,
-                    'quantity': self.parameters.get('quantity', 1),
-                    'reason': f'RSI oversold: {rsi:.2f} < {self.oversold_level}'
-                }
-            
-            # RSI overbought - Sell signal
-            elif rsi > self.overbought_level:
-                return {
-                    'action': 'SELL',
-                    'symbol': self.symbol,
-                    'price': current_price,
-                    'quantity': self.parameters.get('quantity', 1),
-                    'reason': f'RSI overbought: {rsi:.2f} > {self.overbought_level}'
-                }
-            
-            return None
-            
-        except Exception as e:
-            logger.error(f"Error generating RSI signal: {str(e)}")
-            return None
-    
-    async def calculate_indicators(self, data: pd.DataFrame) -> Dict[str, float]:
-        """Calculate RSI indicator"""
-        delta = data['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=self.rsi_period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=self.rsi_period).mean()
-        
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        
-        return {
-            'rsi': rsi.iloc[-1]
-        }
-    
-    async def _get_historical_data(self) -> pd.DataFrame:
-        """Get historical data for calculations"""
-        # Sample data - replace with actual implementation
-        dates = pd.date_range(start='2024-01-01', periods=100, freq='D')
-        prices = np.random.randn(100).cumsum() + 100
-        
-        return pd.DataFrame({
-            'timestamp': dates,
-            'close': prices,
-            'open': prices * 0.99,
-            'high': prices * 1.02,
-            'low': prices * 0.98,
-            'volume': np.random.randint(1000, 10000, 100)
-        })
+class ExecutionMode(str, Enum):
+    INLINE = "inline"    # on the event loop
+    PROCESS = "process"  # in the strategy worker owning the symbol
 
 class StrategyEngine:
-    def __init__(self, angel_client: AngelOneClient):
+    def __init__(self, angel_client: AngelOneClient, order_manager: Optional["OrderManager"] = None):
         self.angel_client = angel_client
+        # Orders placed here are handed to the order manager so their fills reach risk state
+        self.order_manager = order_manager
         self.strategies: Dict[str, BaseStrategy] = {}
+        self.workers: Optional[StrategyWorkerPool] = None
         self.is_running = False
+        self.timeouts: Dict[str, int] = {}
+        self.last_ticks: Dict[str, Dict[str, Any]] = {}
+        # Routing index by cadence: symbol -> tick strategies, (symbol, timeframe)
+        # -> bar strategies, plus one task per timer strategy. Tick strategies
+        # without a symbol receive every tick, bar strategies every symbol's bars.
+        self._tick_routes: Dict[str, Dict[str, BaseStrategy]] = {}
+        self._bar_routes: Dict[Tuple[Optional[str], str], Dict[str, BaseStrategy]] = {}
+        self._wildcard: Dict[str, BaseStrategy] = {}
+        self._timers: Dict[str, asyncio.Task] = {}
+        # Closed bars wait here for the engine's own task, off the tick dispatcher
+        self._bars: asyncio.Queue = asyncio.Queue()
+        self._bar_task: Optional[asyncio.Task] = None
         
-    def add_strategy(self, strategy: BaseStrategy):
-        """Add strategy to engine"""
+    def add_strategy(self, strategy: BaseStrategy, mode: ExecutionMode = ExecutionMode.INLINE):
+        """Add strategy to engine.
+
+        ``process`` mode runs the strategy in a worker process, for CPU-heavy
+        strategies that would otherwise hold the GIL on the event loop; its
+        signals still execute here. Strategies are keyed by name, so a second
+        strategy with the same name on another symbol is rejected; give each
+        one a unique name.
+        """
+        existing = self.strategies.get(strategy.name)
+        if existing is not None and existing is not strategy and \
+                self._strategy_symbol(existing) != self._strategy_symbol(strategy):
+            raise ValueError(f"Strategy {strategy.name} already runs on {self._strategy_symbol(existing)}")
+        self.remove_strategy(strategy.name)
         self.strategies[strategy.name] = strategy
-        logger.info(f"Strategy {strategy.name} added to engine")
+        if ExecutionMode(mode) == ExecutionMode.PROCESS:
+            if self.workers is None:
+                self.workers = StrategyWorkerPool(self._execute_signal)
+            index = self.workers.add_strategy(strategy)
+            logger.info(f"Strategy {strategy.name} added to engine on worker {index}")
+            return
+        symbol = self._strategy_symbol(strategy)
+        if strategy.cadence == Cadence.BAR:
+            self._bar_routes.setdefault((symbol, strategy.timeframe), {})[strategy.name] = strategy
+        elif strategy.cadence == Cadence.TIMER:
+            if self.is_running:
+                self._start_timer(strategy)
+        elif symbol is None:
+            self._wildcard[strategy.name] = strategy
+        else:
+            self._tick_routes.setdefault(symbol, {})[strategy.name] = strategy
+        logger.info(f"Strategy {strategy.name} added to engine ({strategy.cadence.value} cadence)")
     
     def remove_strategy(self, strategy_name: str):
         """Remove strategy from engine"""
         if strategy_name in self.strategies:
             del self.strategies[strategy_name]
+            if self.workers:
+                self.workers.remove_strategy(strategy_name)
+            self._wildcard.pop(strategy_name, None)
+            timer = self._timers.pop(strategy_name, None)
+            if timer:
+                timer.cancel()
+            for routes in (self._tick_routes, self._bar_routes):
+                for key in [k for k, names in routes.items() if strategy_name in names]:
+                    del routes[key][strategy_name]
+                    if not routes[key]:
+                        del routes[key]
             logger.info(f"Strategy {strategy_name} removed from engine")
     
+    def strategies_for_tick(self, symbol: Optional[str]) -> List[BaseStrategy]:
+        """Strategies interested in ticks of a symbol"""
+        routed = self._tick_routes.get(symbol)
+        if not self._wildcard:
+            return list(routed.values()) if routed else []
+        return list(routed.values()) + list(self._wildcard.values()) if routed else list(self._wildcard.values())
+    
+    def strategies_for_bar(self, symbol: str, timeframe: str) -> List[BaseStrategy]:
+        """Strategies reading bars of a symbol and timeframe"""
+        routed = self._bar_routes.get((symbol, timeframe))
+        wildcard = self._bar_routes.get((None, timeframe))
+        if not wildcard:
+            return list(routed.values()) if routed else []
+        return list(routed.values()) + list(wildcard.values()) if routed else list(wildcard.values())
+    
+    def _placed_in_workers(self) -> Dict[str, Any]:
+        return self.workers.placement if self.workers else {}
+    
+    @staticmethod
+    def _strategy_symbol(strategy: BaseStrategy) -> Optional[str]:
+        return getattr(strategy, 'symbol', None) or strategy.parameters.get('symbol')
+    
     def activate_strategy(self, strategy_name: str):
         """Activate a strategy"""
         if strategy_name in self.strategies:
             self.strategies[strategy_name].activate()
+            if self.workers:
+                self.workers.set_active(strategy_name, True)
     
     def deactivate_strategy(self, strategy_name: str):
         """Deactivate a strategy"""
         if strategy_name in self.strategies:
             self.strategies[strategy_name].deactivate()
+            if self.workers:
+                self.workers.set_active(strategy_name, False)
     
     async def process_market_data(self, market_data: Dict[str, Any]):
         """Process market data through all active strategies"""
         if not self.is_running:
             return
         
-        for strategy in self.strategies.values():
+        symbol = market_data.get('symbol')
+        if symbol is not None:
+            self.last_ticks[symbol] = market_data
+        if self.workers:
+            self.workers.submit_tick(market_data)
+        await self._evaluate_all(self.strategies_for_tick(symbol), market_data)
+    
+    async def process_bar(self, bar):
+        """Bar closed callback: queue the bar for the bar cadence strategies of its symbol and timeframe.
+
+        The strategies, and any orders they place, run in the engine's bar
+        task, so they never hold up delivery of the next tick to the other
+        in-order callbacks.
+        """
+        if not self.is_running or not self.strategies_for_bar(bar.symbol, bar.timeframe):
+            return
+        if self._bar_task is None or self._bar_task.done():
+            self._bar_task = asyncio.create_task(self._run_bars())
+        self._bars.put_nowait(bar)
+    
+    async def drain_bars(self):
+        """Wait until every queued bar has been evaluated"""
+        await self._bars.join()
+    
+    async def _run_bars(self):
+        while True:
+            bar = await self._bars.get()
+            try:
+                strategies = self.strategies_for_bar(bar.symbol, bar.timeframe)
+                if strategies:
+                    market_data = bar.to_dict()
+                    market_data['ltp'] = bar.close
+                    await self._evaluate_all(strategies, market_data)
+            except Exception as e:
+                logger.error(f"Error processing bar {bar}: {str(e)}")
+            finally:
+                self._bars.task_done()
+    
+    async def _evaluate_all(self, strategies: List[BaseStrategy], market_data: Dict[str, Any]):
+        active = [s for s in strategies if s.is_active]
+        if len(active) == 1:
+            await self._evaluate(active[0], market_data)
+        elif active:
+            # Strategies that await (I/O) overlap; CPU-bound ones still run one after another
+            await asyncio.gather(*(self._evaluate(strategy, market_data) for strategy in active))
+    
+    def _start_timer(self, strategy: BaseStrategy):
+        task = self._timers.get(strategy.name)
+        if task is None or task.done():
+            self._timers[strategy.name] = asyncio.create_task(self._run_timer(strategy))
+    
+    async def _run_timer(self, strategy: BaseStrategy):
+        """Run a timer cadence strategy every ``interval`` seconds on the latest tick"""
+        symbol = self._strategy_symbol(strategy)
+        while True:
+            await asyncio.sleep(strategy.interval)
             if strategy.is_active:
-                try:
-                    signal = await strategy.generate_signal(market_data)
-                    if signal:
-                        await self._execute_signal(signal, strategy.name)
-                except Exception as e:
-                    logger.error(f"Error processing strategy {strategy.name}: {str(e)}")
+                await self._evaluate(strategy, self.last_ticks.get(symbol) or {'symbol': symbol})
+    
+    async def _evaluate(self, strategy: BaseStrategy, market_data: Dict[str, Any]):
+        """Run one strategy within its deadline and execute its signal.
+
+        The deadline is ``parameters['deadline']`` or ``settings.strategy_deadline``
+        seconds. A strategy that overruns has its signal for this tick skipped:
+        one that awaits is cancelled at the deadline, and CPU-bound code, which
+        cannot be interrupted on the loop, has its signal dropped once it
+        returns late. Use process mode to keep CPU-bound strategies off the
+        loop. Order execution is not subject to the deadline.
+        """
+        deadline = strategy.parameters.get('deadline', settings.strategy_deadline)
+        start = time.perf_counter()
+        try:
+            signal = await asyncio.wait_for(strategy.generate_signal(market_data), timeout=deadline)
+            overran = time.perf_counter() - start > deadline
+        except asyncio.TimeoutError:
+            overran = True
+        except Exception as e:
+            logger.error(f"Error processing strategy {strategy.name}: {str(e)}")
+            return
+        finally:
+            strategy_latency.labels(strategy=strategy.name).observe(time.perf_counter() - start)
+        
+        if overran:
+            self.timeouts[strategy.name] = self.timeouts.get(strategy.name, 0) + 1
+            strategy_timeouts.labels(strategy=strategy.name).inc()
+            logger.warning(f"Strategy {strategy.name} exceeded its {deadline}s deadline, signal skipped")
+            return
+        
+        if signal:
+            await self._execute_signal(signal, strategy.name)
     
     async def _execute_signal(self, signal: Dict[str, Any], strategy_name: str):
         """Execute trading signal"""
@@ -252,6 +241,8 @@ class StrategyEngine:
             
             # This would normally go through the order management system
             result = await self.angel_client.place_order(order_data.dict())
+            if self.order_manager is not None and result and result.get('status'):
+                self.order_manager.track_order(result['data']['orderid'], order_data)
             
             logger.info(f"Signal executed: {signal['reason']}, Result: {result}")
             
@@ -261,6 +252,9 @@ class StrategyEngine:
     def start(self):
         """Start strategy engine"""
         self.is_running = True
+        for strategy in self.strategies.values():
+            if strategy.cadence == Cadence.TIMER and strategy.name not in self._placed_in_workers():
+                self._start_timer(strategy)
         logger.info("Strategy engine started")
     
     def stop(self):
@@ -268,4 +262,13 @@ class StrategyEngine:
         self.is_running = False
         for strategy in self.strategies.values():
             strategy.deactivate()
+        for task in self._timers.values():
+            task.cancel()
+        self._timers.clear()
+        if self._bar_task:
+            self._bar_task.cancel()
+            self._bar_task = None
+            self._bars = asyncio.Queue()
+        if self.workers:
+            self.workers.stop()
         logger.info("Strategy engine stopped")
\ No newline at end of file
@@ -0,0 +1,225 @@
+# app/core/strategy_workers.py
+import asyncio
+import multiprocessing
+import threading
+import zlib
+from typing import Dict, Any, Callable, List, Optional, Set, Tuple
+import structlog
+from app.core.tick_queue import TickQueue, OverflowPolicy
+from app.config import settings
+
+logger = structlog.get_logger()
+
+def shard_for(symbol: str, num_workers: int) -> int:
+    """Worker owning a symbol; stable across restarts"""
+    return zlib.crc32(symbol.encode()) % num_workers
+
+class StrategyWorker:
+    """Main-process handle of one strategy worker process.
+
+    Two one-way pipes connect it to the worker: ticks and control messages
+    go down, signals come back up. The signal pipe is watched with
+    ``loop.add_reader`` so receiving costs no thread on this side.
+    """
+
+    def __init__(self, index: int, context):
+        self.index = index
+        self.symbols: Dict[str, int] = {}  # symbol -> process strategies on it
+        self._commands_recv, self._commands = context.Pipe(duplex=False)
+        self._signals, self._signals_send = context.Pipe(duplex=False)
+        self.process = context.Process(
+            target=_worker_main,
+            args=(index, self._commands_recv, self._signals_send),
+            name=f"strategy-worker-{index}",
+            daemon=True
+        )
+
+    def send(self, message: tuple):
+        self._commands.send(message)
+
+class StrategyWorkerPool:
+    """Runs strategies in worker processes, sharded by symbol.
+
+    Every strategy on a symbol lives in the worker that owns the symbol, so
+    the worker builds that symbol's bars once and its strategies share one
+    history and indicator cache. Workers run their own StrategyEngine, so
+    deadlines and routing apply there as well; signals are sent back and
+    handed to ``on_signal(signal, strategy_name)`` on the main loop for risk
+    checks and order placement.
+
+    Strategies are rebuilt in the worker as ``cls(parameters)`` and given
+    the main-process strategy's name, so the class must be importable and
+    its parameters picklable. Worker history starts empty and is built from
+    the ticks the worker receives.
+    """
+
+    def __init__(self, on_signal: Callable, num_workers: int = None):
+        self.on_signal = on_signal
+        self.num_workers = num_workers or settings.strategy_workers
+        self.workers: List[StrategyWorker] = []
+        self.placement: Dict[str, Tuple[int, str]] = {}  # strategy name -> (worker index, symbol)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    @property
+    def is_running(self) -> bool:
+        return bool(self.workers)
+
+    def start(self):
+        """Spawn the workers; must be called with the event loop running"""
+        if self.workers:
+            return
+        self._loop = asyncio.get_running_loop()
+        # spawn, not fork: the parent runs feed threads that must not be forked
+        context = multiprocessing.get_context('spawn')
+        for index in range(self.num_workers):
+            worker = StrategyWorker(index, context)
+            worker.process.start()
+            self._loop.add_reader(worker._signals.fileno(), self._receive_signals, worker)
+            self.workers.append(worker)
+        logger.info(f"Started {self.num_workers} strategy workers")
+
+    def stop(self):
+        for worker in self.workers:
+            self._loop.remove_reader(worker._signals.fileno())
+            try:
+                worker.send(('stop',))
+            except (BrokenPipeError, OSError):
+                pass
+            worker.process.join(timeout=5)
+            if worker.process.is_alive():
+                worker.process.terminate()
+        self.workers.clear()
+        self.placement.clear()
+        for task in self._tasks:
+            task.cancel()
+        self._tasks.clear()
+
+    def add_strategy(self, strategy) -> int:
+        """Run a strategy in the worker owning its symbol; returns the worker index"""
+        symbol = getattr(strategy, 'symbol', None) or strategy.parameters.get('symbol')
+        if not symbol:
+            raise ValueError(f"Strategy {strategy.name} needs a symbol to run in a worker process")
+        self.start()
+        self.remove_strategy(strategy.name)
+
+        worker = self.workers[shard_for(symbol, self.num_workers)]
+        worker.send(('add', type(strategy), strategy.name, strategy.parameters, strategy.is_active))
+        worker.symbols[symbol] = worker.symbols.get(symbol, 0) + 1
+        self.placement[strategy.name] = (worker.index, symbol)
+        return worker.index
+
+    def remove_strategy(self, strategy_name: str):
+        placed = self.placement.pop(strategy_name, None)
+        if placed is None:
+            return
+        index, symbol = placed
+        worker = self.workers[index]
+        worker.send(('remove', strategy_name))
+        if worker.symbols.get(symbol, 0) <= 1:
+            worker.symbols.pop(symbol, None)
+        else:
+            worker.symbols[symbol] -= 1
+
+    def set_active(self, strategy_name: str, active: bool):
+        placed = self.placement.get(strategy_name)
+        if placed is not None:
+            self.workers[placed[0]].send(('activate', strategy_name, active))
+
+    def submit_tick(self, market_data: Dict[str, Any]):
+        """Forward a tick to the worker owning its symbol, if it runs strategies on it"""
+        symbol = market_data.get('symbol')
+        if not self.workers or symbol is None:
+            return
+        worker = self.workers[shard_for(symbol, self.num_workers)]
+        if symbol in worker.symbols:
+            worker.send(('tick', market_data))
+
+    def _receive_signals(self, worker: StrategyWorker):
+        try:
+            while worker._signals.poll():
+                strategy_name, signal = worker._signals.recv()
+                task = asyncio.ensure_future(self.on_signal(signal, strategy_name))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+        except (EOFError, OSError):
+            logger.error(f"Strategy worker {worker.index} exited")
+            self._loop.remove_reader(worker._signals.fileno())
+
+def _worker_main(index: int, commands, signals):
+    """Worker process entry point"""
+    try:
+        asyncio.run(_run_worker(index, commands, signals))
+    except KeyboardInterrupt:
+        pass
+
+async def _run_worker(index: int, commands, signals):
+    # Imported here: the engine module imports this one
+    from app.core.bar_aggregator import BarAggregator
+    from app.core.indicator_cache import indicator_cache
+    from app.core.strategy_engine import StrategyEngine
+
+    class WorkerEngine(StrategyEngine):
+        async def _execute_signal(self, signal: Dict[str, Any], strategy_name: str):
+            signals.send((strategy_name, signal))
+
+    loop = asyncio.get_running_loop()
+    engine = WorkerEngine(angel_client=None)
+    engine.start()
+    bars = BarAggregator()
+    bars.add_callback("indicator_cache", indicator_cache.on_bar_closed)
+    bars.add_callback("strategies", engine.process_bar)
+    bars.start()
+
+    # A reader thread drains the pipe into a bounded queue, so the main
+    # process never blocks on a full pipe while strategies are busy
+    queue = TickQueue(settings.tick_queue_size, OverflowPolicy.DROP_OLDEST)
+    queue.bind(loop)
+    reader = threading.Thread(
+        target=_read_commands, args=(commands, queue, loop, engine), name=f"strategy-worker-{index}-reader", daemon=True
+    )
+    reader.start()
+
+    while True:
+        ticks = await queue.get_batch(settings.tick_batch_size)
+        if not ticks and queue.closed:
+            break
+        for tick in ticks:
+            await bars.process_tick(tick)
+            await engine.process_market_data(tick)
+    bars.stop()
+
+def _read_commands(commands, queue: TickQueue, loop: asyncio.AbstractEventLoop, engine):
+    while True:
+        try:
+            message = commands.recv()
+        except (EOFError, OSError):
+            break
+        kind = message[0]
+        if kind == 'tick':
+            queue.put_threadsafe(message[1])
+        elif kind == 'stop':
+            break
+        else:
+            loop.call_soon_threadsafe(_apply_command, engine, message)
+    queue.close()
+
+def _apply_command(engine, message: tuple):
+    kind = message[0]
+    try:
+        if kind == 'add':
+            _, cls, name, parameters, active = message
+            strategy = cls(parameters)
+            strategy.name = name
+            engine.add_strategy(strategy)
+            if active:
+                strategy.activate()
+        elif kind == 'remove':
+            engine.remove_strategy(message[1])
+        elif kind == 'activate':
+            if message[2]:
+                engine.activate_strategy(message[1])
+            else:
+                engine.deactivate_strategy(message[1])
+    except Exception as e:
+        logger.error(f"Error applying strategy worker command {kind}: {str(e)}")
@@ -0,0 +1,204 @@
+# app/core/tick_decoder.py
+import struct
+from typing import Dict, Any, List, Iterable, Iterator, Union
+
+# SmartWebSocketV2 subscription modes
+LTP_MODE = 1
+QUOTE_MODE = 2
+SNAP_QUOTE_MODE = 3
+
+# Exchange types as sent in byte 1 of every packet
+EXCHANGE_TYPES = {
+    1: "NSE",
+    2: "NFO",
+    3: "BSE",
+    4: "BFO",
+    5: "MCX",
+    7: "NCDEX",
+    13: "CDS"
+}
+
+# Prices arrive as integers in paise, except currency derivatives
+PRICE_DIVISORS = {13: 10000000.0}
+DEFAULT_PRICE_DIVISOR = 100.0
+
+# Packet layouts (little endian, no padding)
+_HEADER = struct.Struct('<BB25sqqq')          # mode, exchange, token, seq, exchange ts, ltp
+_QUOTE_BODY = struct.Struct('<qqqddqqqq')      # ltq, atp, volume, tbq, tsq, open, high, low, close
+_SNAP_BODY = struct.Struct('<qqq')             # last traded ts, oi, oi change %
+_DEPTH = struct.Struct('<' + 'HqqH' * 10)      # 10 x (flag, quantity, price, orders)
+_SNAP_TAIL = struct.Struct('<qqqq')            # upper circuit, lower circuit, 52w high, 52w low
+
+LTP_PACKET_SIZE = _HEADER.size
+QUOTE_PACKET_SIZE = LTP_PACKET_SIZE + _QUOTE_BODY.size
+SNAP_QUOTE_PACKET_SIZE = QUOTE_PACKET_SIZE + _SNAP_BODY.size + _DEPTH.size + _SNAP_TAIL.size
+
+PACKET_SIZES = {
+    LTP_MODE: LTP_PACKET_SIZE,
+    QUOTE_MODE: QUOTE_PACKET_SIZE,
+    SNAP_QUOTE_MODE: SNAP_QUOTE_PACKET_SIZE
+}
+
+_SNAP_BODY_OFFSET = QUOTE_PACKET_SIZE
+_DEPTH_OFFSET = _SNAP_BODY_OFFSET + _SNAP_BODY.size
+_SNAP_TAIL_OFFSET = _DEPTH_OFFSET + _DEPTH.size
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+class TickDecoder:
+    """Decoder for SmartWebSocketV2 LTP, Quote and SnapQuote packets.
+
+    Fields are unpacked straight out of the receive buffer with precompiled
+    ``struct.Struct`` objects, so frames are never sliced or copied.
+    """
+
+    def __init__(self):
+        # Raw 25 byte token field -> token string; bounded by the subscription universe
+        self._tokens: Dict[bytes, str] = {}
+
+    def decode(self, frame: Buffer, offset: int = 0) -> Dict[str, Any]:
+        """Decode a single packet starting at ``offset``"""
+        mode, exchange_type, raw_token, sequence, exchange_ts, ltp = _HEADER.unpack_from(frame, offset)
+
+        size = PACKET_SIZES.get(mode)
+        if size is None:
+            raise ValueError(f"Unsupported subscription mode: {mode}")
+        if len(frame) - offset < size:
+            raise ValueError(f"Truncated packet: mode {mode} needs {size} bytes, got {len(frame) - offset}")
+
+        token = self._tokens.get(raw_token)
+        if token is None:
+            token = raw_token.split(b'\x00', 1)[0].decode('ascii')
+            self._tokens[raw_token] = token
+
+        divisor = PRICE_DIVISORS.get(exchange_type, DEFAULT_PRICE_DIVISOR)
+        tick = {
+            'token': token,
+            'symbol': token,
+            'exchange_type': exchange_type,
+            'exchange': EXCHANGE_TYPES.get(exchange_type),
+            'subscription_mode': mode,
+            'sequence_number': sequence,
+            'exchange_timestamp': exchange_ts,
+            'timestamp': exchange_ts / 1000.0,
+            'ltp': ltp / divisor
+        }
+
+        if mode >= QUOTE_MODE:
+            (ltq, atp, volume, total_buy, total_sell,
+             open_, high, low, close) = _QUOTE_BODY.unpack_from(frame, offset + LTP_PACKET_SIZE)
+            tick['last_traded_quantity'] = ltq
+            tick['average_price'] = atp / divisor
+            tick['volume'] = volume
+            tick['total_buy_quantity'] = total_buy
+            tick['total_sell_quantity'] = total_sell
+            tick['open'] = open_ / divisor
+            tick['high'] = high / divisor
+            tick['low'] = low / divisor
+            tick['close'] = close / divisor
+
+        if mode == SNAP_QUOTE_MODE:
+            last_traded_ts, oi, oi_change = _SNAP_BODY.unpack_from(frame, offset + _SNAP_BODY_OFFSET)
+            upper, lower, high_52, low_52 = _SNAP_TAIL.unpack_from(frame, offset + _SNAP_TAIL_OFFSET)
+            tick['last_traded_timestamp'] = last_traded_ts
+            tick['open_interest'] = oi
+            tick['open_interest_change_percentage'] = oi_change
+            tick['upper_circuit_limit'] = upper / divisor
+            tick['lower_circuit_limit'] = lower / divisor
+            tick['week_52_high'] = high_52 / divisor
+            tick['week_52_low'] = low_52 / divisor
+            tick['best_5_buy'], tick['best_5_sell'] = self._decode_depth(frame, offset + _DEPTH_OFFSET, divisor)
+
+        return tick
+
+    def decode_many(self, frames: Iterable[Buffer]) -> List[Dict[str, Any]]:
+        """Decode a burst of individually framed packets in one call"""
+        decode = self.decode
+        return [decode(frame) for frame in frames]
+
+    def iter_buffer(self, buffer: Buffer) -> Iterator[Dict[str, Any]]:
+        """Decode back-to-back packets from one contiguous buffer.
+
+        Packet boundaries are derived from the mode byte of each packet.
+        """
+        view = memoryview(buffer)
+        end = len(view)
+        offset = 0
+        decode = self.decode
+        while offset < end:
+            size = PACKET_SIZES.get(view[offset])
+            if size is None:
+                raise ValueError(f"Unsupported subscription mode {view[offset]} at offset {offset}")
+            yield decode(view, offset)
+            offset += size
+
+    def decode_buffer(self, buffer: Buffer) -> List[Dict[str, Any]]:
+        """Decode all packets in a contiguous buffer"""
+        return list(self.iter_buffer(buffer))
+
+    @staticmethod
+    def _decode_depth(frame: Buffer, offset: int, divisor: float):
+        values = _DEPTH.unpack_from(frame, offset)
+        buy, sell = [], []
+        for i in range(0, 40, 4):
+            level = {
+                'quantity': values[i + 1],
+                'price': values[i + 2] / divisor,
+                'orders': values[i + 3]
+            }
+            # Flag 1 marks a buy level, 0 a sell level
+            (buy if values[i] == 1 else sell).append(level)
+        return buy, sell
+
+
+def encode_tick(tick: Dict[str, Any]) -> bytes:
+    """Encode a tick dict back into a SmartWebSocketV2 packet.
+
+    Inverse of ``TickDecoder.decode``; used by tests, benchmarks and the
+    simulated feeds.
+    """
+    mode = tick.get('subscription_mode', LTP_MODE)
+    exchange_type = tick.get('exchange_type', 1)
+    divisor = PRICE_DIVISORS.get(exchange_type, DEFAULT_PRICE_DIVISOR)
+
+    def price(key):
+        return int(round(tick.get(key, 0) * divisor))
+
+    packet = bytearray(PACKET_SIZES[mode])
+    _HEADER.pack_into(
+        packet, 0, mode, exchange_type, str(tick['token']).encode('ascii'),
+        tick.get('sequence_number', 0), tick.get('exchange_timestamp', 0), price('ltp')
+    )
+
+    if mode >= QUOTE_MODE:
+        _QUOTE_BODY.pack_into(
+            packet, LTP_PACKET_SIZE,
+            tick.get('last_traded_quantity', 0), price('average_price'), tick.get('volume', 0),
+            float(tick.get('total_buy_quantity', 0)), float(tick.get('total_sell_quantity', 0)),
+            price('open'), price('high'), price('low'), price('close')
+        )
+
+    if mode == SNAP_QUOTE_MODE:
+        _SNAP_BODY.pack_into(
+            packet, _SNAP_BODY_OFFSET,
+            tick.get('last_traded_timestamp', 0), tick.get('open_interest', 0),
+            tick.get('open_interest_change_percentage', 0)
+        )
+        depth = []
+        levels = [(1, level) for level in tick.get('best_5_buy', [])[:5]]
+        levels += [(0, level) for level in tick.get('best_5_sell', [])[:5]]
+        levels += [(0, {})] * (10 - len(levels))
+        for flag, level in levels:
+            depth.extend((
+                flag, level.get('quantity', 0),
+                int(round(level.get('price', 0) * divisor)), level.get('orders', 0)
+            ))
+        _DEPTH.pack_into(packet, _DEPTH_OFFSET, *depth)
+        _SNAP_TAIL.pack_into(
+            packet, _SNAP_TAIL_OFFSET,
+            price('upper_circuit_limit'), price('lower_circuit_limit'),
+            price('week_52_high'), price('week_52_low')
+        )
+
+    return bytes(packet)
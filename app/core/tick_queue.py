@@ -0,0 +1,182 @@
+# app/core/tick_queue.py
+import asyncio
+import threading
+from collections import deque
+from enum import Enum
+from typing import Dict, Any, List, Optional
+import structlog
+from app.utils.metrics import tick_queue_depth, ticks_dropped
+
+logger = structlog.get_logger()
+
+class OverflowPolicy(str, Enum):
+    BLOCK = "block"
+    DROP_OLDEST = "drop_oldest"
+    CONFLATE = "conflate"
+
+class TickQueue:
+    """Bounded hand-off of ticks from feed threads into the asyncio loop.
+
+    Producers call ``put_threadsafe`` from any thread; the loop is only woken
+    through ``call_soon_threadsafe`` when the queue goes from idle to pending,
+    so a burst costs one wakeup rather than one task per tick.
+
+    Overflow policies:
+      - block: the producer thread waits until the consumer frees space
+      - drop_oldest: the oldest pending tick is discarded
+      - conflate: only the latest pending tick per symbol is kept
+    """
+
+    def __init__(self, maxsize: int = 10000, policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST, key: str = 'token'):
+        self.maxsize = maxsize
+        self.policy = OverflowPolicy(policy)
+        self.key = key
+        self.dropped = 0
+        self.closed = False
+        self._lock = threading.Lock()
+        self._not_full = threading.Condition(self._lock)
+        self._items: deque = deque()
+        # Insertion ordered: the keys are the dirty set, the values the latest tick
+        self._latest: Dict[Any, Dict[str, Any]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._waiter: Optional[asyncio.Future] = None
+        self._wakeup_pending = False
+
+    def bind(self, loop: asyncio.AbstractEventLoop):
+        """Attach the queue to the loop that consumes it (call from the loop thread)"""
+        self._loop = loop
+        self._loop_thread = threading.get_ident()
+        self.closed = False
+
+    def qsize(self) -> int:
+        return len(self._latest) if self.policy == OverflowPolicy.CONFLATE else len(self._items)
+
+    def put_threadsafe(self, tick: Dict[str, Any]) -> bool:
+        """Enqueue a tick from any thread, applying the overflow policy.
+
+        Blocking is never done on the loop thread itself; there the block
+        policy falls back to dropping the oldest tick.
+        """
+        with self._lock:
+            if self.closed:
+                return False
+
+            if self.policy == OverflowPolicy.CONFLATE:
+                symbol = tick.get(self.key)
+                if symbol in self._latest:
+                    self._latest[symbol] = tick
+                    self._record_drop('conflated')
+                else:
+                    if len(self._latest) >= self.maxsize:
+                        del self._latest[next(iter(self._latest))]
+                        self._record_drop('overflow')
+                    self._latest[symbol] = tick
+            else:
+                if len(self._items) >= self.maxsize:
+                    if self.policy == OverflowPolicy.BLOCK and threading.get_ident() != self._loop_thread:
+                        while len(self._items) >= self.maxsize and not self.closed:
+                            self._not_full.wait()
+                        if self.closed:
+                            return False
+                    else:
+                        self._items.popleft()
+                        self._record_drop('overflow')
+                self._items.append(tick)
+
+            wake = not self._wakeup_pending
+            self._wakeup_pending = True
+
+        if wake and self._loop is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._wakeup)
+            except RuntimeError:
+                # Loop already closed during shutdown
+                return False
+        return True
+
+    async def get_batch(self, max_items: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Wait for pending ticks and return up to ``max_items`` of them in arrival order"""
+        while True:
+            with self._lock:
+                batch = self._take(max_items)
+                if batch or self.closed:
+                    self._not_full.notify_all()
+                    tick_queue_depth.set(self.qsize())
+                    return batch
+                self._waiter = self._loop.create_future()
+            await self._waiter
+
+    def close(self):
+        """Stop accepting ticks and release any waiting producer or consumer"""
+        with self._lock:
+            self.closed = True
+            self._not_full.notify_all()
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wakeup)
+
+    def _take(self, max_items: Optional[int]) -> List[Dict[str, Any]]:
+        if self.policy == OverflowPolicy.CONFLATE:
+            if max_items is None or len(self._latest) <= max_items:
+                batch = list(self._latest.values())
+                self._latest = {}
+                return batch
+            batch = []
+            for _ in range(max_items):
+                batch.append(self._latest.pop(next(iter(self._latest))))
+            return batch
+
+        if max_items is None or len(self._items) <= max_items:
+            batch = list(self._items)
+            self._items.clear()
+            return batch
+        popleft = self._items.popleft
+        return [popleft() for _ in range(max_items)]
+
+    def _wakeup(self):
+        with self._lock:
+            self._wakeup_pending = False
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    def _record_drop(self, reason: str):
+        self.dropped += 1
+        ticks_dropped.labels(reason=reason).inc()
+
+class DeliveryMode(str, Enum):
+    ALL = "all"
+    CONFLATE = "conflate"
+
+class ConflatingMailbox:
+    """Latest-tick-per-symbol mailbox for a single slow consumer.
+
+    Lives entirely on the event loop. ``offer`` is O(1) and never waits: a
+    tick for a symbol that is already pending replaces the pending one, so
+    the consumer only ever sees the newest tick per symbol since its last read.
+    """
+
+    def __init__(self, key: str = 'token'):
+        self.key = key
+        self.conflated = 0
+        # Insertion ordered: the keys are the dirty set, the values the latest tick
+        self._latest: Dict[Any, Dict[str, Any]] = {}
+        self._ready = asyncio.Event()
+
+    def offer(self, tick: Dict[str, Any]):
+        symbol = tick.get(self.key)
+        if symbol in self._latest:
+            self.conflated += 1
+            ticks_dropped.labels(reason='consumer_conflated').inc()
+        self._latest[symbol] = tick
+        self._ready.set()
+
+    def pending(self) -> int:
+        return len(self._latest)
+
+    async def take(self) -> List[Dict[str, Any]]:
+        """Wait for dirty symbols and return their latest ticks"""
+        await self._ready.wait()
+        self._ready.clear()
+        batch = list(self._latest.values())
+        self._latest = {}
+        return batch
@@ -1,108 +1,151 @@
 # app/core/websocket_handler.py
 import asyncio
+import time
 import websockets
-import json
-import struct
-from typing import Dict, Any, Callable, Optional
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Any, Callable, Optional, List
 import structlog
-from SmartApi.smartWebSocketV2 import SmartWebSocketV2
 from app.core.angel_client import AngelOneClient
+from app.core.feed_manager import FeedManager
+from app.core.tick_decoder import TickDecoder, EXCHANGE_TYPES
+from app.core.tick_queue import TickQueue, ConflatingMailbox, DeliveryMode
 from app.config import settings
 
 logger = structlog.get_logger()
 
+EXCHANGE_TYPE_CODES = {name: code for code, name in EXCHANGE_TYPES.items()}
+IST = timezone(timedelta(hours=5, minutes=30))
+
 class WebSocketHandler:
     def __init__(self, angel_client: AngelOneClient):
         self.angel_client = angel_client
-        self.websocket = None
+        self.feed = FeedManager(angel_client, self._on_data, on_resubscribed=self._backfill_gap)
         self.callbacks: Dict[str, Callable] = {}
-        self.is_connected = False
+        self.callbacks_conflated: Dict[str, Callable] = {}
+        self.mailboxes: Dict[str, ConflatingMailbox] = {}
+        self._consumer_tasks: Dict[str, asyncio.Task] = {}
         self.subscribed_symbols = set()
-        
-    # In app/core/websocket_handler.py
+        self.token_symbols: Dict[str, str] = {}
+        self.last_tick_time: Dict[str, float] = {}
+        self.backfill_callbacks: Dict[str, Callable] = {}
+        self.decoder = TickDecoder()
+        self.tick_queue = TickQueue(settings.tick_queue_size, settings.tick_overflow_policy)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._dispatch_task: Optional[asyncio.Task] = None
+    
+    @property
+    def is_connected(self) -> bool:
+        return self.feed.is_connected
+    
     async def connect(self):
         try:
             if not self.angel_client.auth_token:
-                await self.angel_client.authenticate()
+                await self.angel_client.session.ensure()
                 logger.info("Authenticated with Angel One, auth_token: %s", self.angel_client.auth_token)
-            self.websocket = SmartWebSocketV2(
-                self.angel_client.auth_token,
-                self.angel_client.api_key,
-                self.angel_client.username,
-                self.angel_client.feed_token
-            )
-            self.websocket.on_open = self._on_open
-            self.websocket.on_data = self._on_data
-            self.websocket.on_error = self._on_error
-            self.websocket.on_close = self._on_close
-            self.websocket.connect()
-            self.is_connected = True
+            self._start_dispatcher()
+            await self.feed.start()
             logger.info("WebSocket connected successfully, subscribing to SBIN-EQ")
             await self.subscribe(["SBIN-EQ"], "NSE")
         except Exception as e:
             logger.error(f"WebSocket connection error: {str(e)}")
-            self.is_connected = False
     
     async def disconnect(self):
         """Disconnect WebSocket"""
-        if self.websocket:
-            self.websocket.close()
-            self.is_connected = False
+        if self.feed.connections:
+            await self.feed.stop()
             logger.info("WebSocket disconnected")
+        self.tick_queue.close()
+        if self._dispatch_task:
+            self._dispatch_task.cancel()
+            self._dispatch_task = None
+        for task in self._consumer_tasks.values():
+            task.cancel()
+        self._consumer_tasks.clear()
+    
+    def _start_dispatcher(self):
+        """Bind the ingestion queue to the running loop and start delivering ticks"""
+        self._loop = asyncio.get_running_loop()
+        self.tick_queue.bind(self._loop)
+        if self._dispatch_task is None or self._dispatch_task.done():
+            self._dispatch_task = asyncio.create_task(self._dispatch_ticks())
+        for name in self.mailboxes:
+            self._start_consumer(name)
+    
+    async def _dispatch_ticks(self):
+        """Deliver queued ticks to callbacks in arrival order"""
+        while True:
+            ticks = await self.tick_queue.get_batch(settings.tick_batch_size)
+            if not ticks and self.tick_queue.closed:
+                return
+            mailboxes = list(self.mailboxes.values())
+            for data in ticks:
+                for mailbox in mailboxes:
+                    mailbox.offer(data)
+                for name, callback in list(self.callbacks.items()):
+                    try:
+                        await callback(data)
+                    except Exception as e:
+                        logger.error(f"Error in market data callback {name}: {str(e)}")
     
-    def _on_open(self, ws):
-        """WebSocket open callback"""
-        logger.info("WebSocket opened")
-        
     def _on_data(self, ws, message):
-        """WebSocket data callback"""
+        """WebSocket data callback (runs on the feed thread)"""
         try:
             # Process binary data from Angel One
-            data = self._parse_binary_data(message)
-            
-            # Trigger callbacks
-            for callback in self.callbacks.values():
-                asyncio.create_task(callback(data))
+            put = self.tick_queue.put_threadsafe
+            symbols = self.token_symbols
+            last_tick_time = self.last_tick_time
+            for data in self._parse_binary_data(message):
+                token = data['token']
+                data['symbol'] = symbols.get(token, token)
+                last_tick_time[token] = data['timestamp']
+                put(data)
                 
         except Exception as e:
             logger.error(f"Error processing WebSocket data: {str(e)}")
     
-    def _on_error(self, ws, error):
-        """WebSocket error callback"""
-        logger.error(f"WebSocket error: {str(error)}")
-        self.is_connected = False
-    
-    def _on_close(self, ws):
-        """WebSocket close callback"""
-        logger.info("WebSocket closed")
-        self.is_connected = False
-    
-    def _parse_binary_data(self, binary_data: bytes) -> Dict[str, Any]:
-        """Parse binary data from Angel One WebSocket"""
+    def _parse_binary_data(self, binary_data: bytes) -> List[Dict[str, Any]]:
+        """Parse binary data from Angel One WebSocket into ticks"""
         try:
-            # Angel One sends data in binary format
-            # This is a simplified parser - actual implementation would be more complex
-            
-            # Header: 2 bytes for data length
-            data_length = struct.unpack('>H', binary_data[:2])[0]
-            
-            # Extract actual data
-            data_bytes = binary_data[2:2+data_length]
-            
-            # Parse based on Angel One's binary protocol
-            # This is a placeholder implementation
-            parsed_data = {
-                'symbol': 'SBIN-EQ',
-                'ltp': 545.50,
-                'volume': 1000,
-                'timestamp': asyncio.get_event_loop().time()
-            }
-            
-            return parsed_data
+            # A frame may carry several back-to-back packets
+            return self.decoder.decode_buffer(binary_data)
             
         except Exception as e:
             logger.error(f"Error parsing binary data: {str(e)}")
-            return {}
+            return []
+    
+    async def _backfill_gap(self, tokens: Dict[str, int], lost_at: Dict[str, float]):
+        """Fetch the minute candles missed while tokens were off the feed"""
+        if not self.backfill_callbacks:
+            return
+        
+        # The current minute is still forming and will be built from live ticks
+        gap_end = int(time.time() // 60) * 60
+        # Requests are queued together; the broker scheduler paces them to the candle rate limit
+        await asyncio.gather(*(
+            self._backfill_token(token, exchange_type, int(self.last_tick_time.get(token, lost_at[token]) // 60) * 60, gap_end)
+            for token, exchange_type in tokens.items()
+        ))
+    
+    async def _backfill_token(self, token: str, exchange_type: int, gap_start: int, gap_end: int):
+        if gap_end <= gap_start:
+            return
+        
+        candles = await self.angel_client.get_candle_data(
+            EXCHANGE_TYPES.get(exchange_type, "NSE"),
+            token,
+            "ONE_MINUTE",
+            datetime.fromtimestamp(gap_start, IST).strftime('%Y-%m-%d %H:%M'),
+            datetime.fromtimestamp(gap_end - 60, IST).strftime('%Y-%m-%d %H:%M')
+        )
+        candles = [c for c in candles if gap_start <= c['timestamp'] < gap_end]
+        symbol = self.token_symbols.get(token, token)
+        logger.info(f"Backfilled {len(candles)} candles for {symbol}")
+        
+        for name, callback in list(self.backfill_callbacks.items()):
+            try:
+                await callback(symbol, candles)
+            except Exception as e:
+                logger.error(f"Error in backfill callback {name}: {str(e)}")
     
     async def subscribe(self, symbols: list, exchange: str = "NSE"):
         """Subscribe to symbols"""
@@ -110,24 +153,19 @@ class WebSocketHandler:
             if not self.is_connected:
                 await self.connect()
             
-            # Format subscription data for Angel One
-            subscription_data = {
-                "action": 1,  # Subscribe
-                "params": {
-                    "mode": 1,  # LTP mode
-                    "tokenList": [
-                        {
-                            "exchangeType": 1 if exchange == "NSE" else 2,
-                            "tokens": symbols
-                        }
-                    ]
-                }
-            }
+            exchange_type = EXCHANGE_TYPE_CODES.get(exchange, 1)
+            tokens = {}
+            for symbol in symbols:
+                token = await self.angel_client._get_symbol_token(symbol, exchange)
+                if token is None:
+                    continue
+                self.token_symbols[token] = symbol
+                tokens[token] = exchange_type
             
-            # Send subscription
-            self.websocket.send(json.dumps(subscription_data))
+            # Sharded across feed connections by the feed manager
+            await self.feed.subscribe(tokens)
             
-            self.subscribed_symbols.update(symbols)
+            self.subscribed_symbols.update(self.token_symbols[token] for token in tokens)
             logger.info(f"Subscribed to symbols: {symbols}")
             
         except Exception as e:
@@ -136,20 +174,8 @@ class WebSocketHandler:
     async def unsubscribe(self, symbols: list, exchange: str = "NSE"):
         """Unsubscribe from symbols"""
         try:
-            subscription_data = {
-                "action": 0,  # Unsubscribe
-                "params": {
-                    "mode": 1,
-                    "tokenList": [
-                        {
-                            "exchangeType": 1 if exchange == "NSE" else 2,
-                            "tokens": symbols
-                        }
-                    ]
-                }
-            }
-            
-            self.websocket.send(json.dumps(subscription_data))
+            tokens = [token for token, symbol in self.token_symbols.items() if symbol in symbols]
+            await self.feed.unsubscribe(tokens)
             
             for symbol in symbols:
                 self.subscribed_symbols.discard(symbol)
@@ -159,11 +185,56 @@ class WebSocketHandler:
         except Exception as e:
             logger.error(f"Unsubscription error: {str(e)}")
     
-    def add_callback(self, name: str, callback: Callable):
-        """Add data callback"""
-        self.callbacks[name] = callback
+    def add_callback(self, name: str, callback: Callable, mode: DeliveryMode = DeliveryMode.ALL):
+        """Add data callback.
+
+        In ``all`` mode the callback sees every tick in order. In ``conflate``
+        mode it runs in its own task and, whenever it falls behind, receives
+        only the newest tick per symbol since its previous call.
+        """
+        self.remove_callback(name)
+        if DeliveryMode(mode) == DeliveryMode.CONFLATE:
+            self.mailboxes[name] = ConflatingMailbox()
+            self.callbacks_conflated[name] = callback
+            self._start_consumer(name)
+        else:
+            self.callbacks[name] = callback
     
     def remove_callback(self, name: str):
         """Remove data callback"""
         if name in self.callbacks:
-            del self.callbacks[name]
\ No newline at end of file
+            del self.callbacks[name]
+        self.mailboxes.pop(name, None)
+        self.callbacks_conflated.pop(name, None)
+        task = self._consumer_tasks.pop(name, None)
+        if task:
+            task.cancel()
+    
+    def add_backfill_callback(self, name: str, callback: Callable):
+        """Add a callback receiving (symbol, candles) for gaps recovered after a reconnect"""
+        self.backfill_callbacks[name] = callback
+    
+    def remove_backfill_callback(self, name: str):
+        """Remove backfill callback"""
+        self.backfill_callbacks.pop(name, None)
+    
+    def _start_consumer(self, name: str):
+        """Start the delivery task of a conflating callback once a loop is running"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = self._consumer_tasks.get(name)
+        if task is None or task.done():
+            self._consumer_tasks[name] = asyncio.create_task(self._consume_mailbox(name))
+    
+    async def _consume_mailbox(self, name: str):
+        """Deliver the latest tick per dirty symbol to a conflating callback"""
+        mailbox = self.mailboxes[name]
+        callback = self.callbacks_conflated[name]
+        while True:
+            for data in await mailbox.take():
+                try:
+                    await callback(data)
+                except Exception as e:
+                    logger.error(f"Error in market data callback {name}: {str(e)}")
@@ -4,7 +4,6 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from jose import JWTError, jwt
 from app.config import settings
 from app.models.database import Base
-from app.core.angel_client import AngelOneClient
 import structlog
 
 logger = structlog.get_logger()
@@ -41,12 +40,17 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         )
 
 async def get_angel_client():
-    """Dependency to get Angel One client"""
-    client = AngelOneClient()
-    if not client.auth_token:
-        if not await client.authenticate():
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail="Failed to authenticate with Angel One"
-            )
-    return client
\ No newline at end of file
+    """Dependency to get the application's broker, sharing its one Angel One session"""
+    # In paper mode the broker is the application's one PaperBroker
+    from app.main import angel_client, broker
+    if not await angel_client.session.ensure():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Failed to authenticate with Angel One"
+        )
+    return broker
+
+async def get_order_manager(broker=Depends(get_angel_client)):
+    """Dependency to get the shared order manager, which tracks every order's fills"""
+    from app.main import order_manager
+    return order_manager
@@ -2,7 +2,6 @@
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-import redis
 import asyncio
 import structlog
 from contextlib import asynccontextmanager
@@ -10,7 +9,14 @@ from typing import List
 
 from app.config import settings
 from app.core.angel_client import AngelOneClient
+from app.core.paper_broker import PaperBroker
+from app.core.ltp_service import LTPService
 from app.core.websocket_handler import WebSocketHandler
+from app.core.bar_aggregator import BarAggregator
+from app.core.indicator_cache import indicator_cache
+from app.core.instruments import instrument_master
+from app.core.redis_pool import redis_pool
+from app.core.tick_queue import DeliveryMode
 from app.core.strategy_engine import StrategyEngine, SMAStrategy, RSIStrategy
 from app.core.risk_manager import RiskManager
 from app.core.order_manager import OrderManager
@@ -48,10 +54,14 @@ async_session = async_sessionmaker(engine, expire_on_commit=False)
 
 # Global instances
 angel_client = AngelOneClient()
+# Orders go to the broker; the market data feed always comes from Angel One
+broker = PaperBroker(angel_client) if settings.broker_mode == "paper" else angel_client
+ltp_service = LTPService(broker)
 risk_manager = RiskManager()
-order_manager = OrderManager(angel_client, risk_manager)
+order_manager = OrderManager(broker, risk_manager, ltp_service)
 websocket_handler = WebSocketHandler(angel_client)
-strategy_engine = StrategyEngine(angel_client)
+bar_aggregator = BarAggregator()
+strategy_engine = StrategyEngine(broker, order_manager)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -60,16 +70,32 @@ async def lifespan(app: FastAPI):
         logger.info("Creating database tables...")
         await conn.run_sync(Base.metadata.create_all)
         logger.info("Database tables created")
+    logger.info("Loading instrument master...")
+    if not await instrument_master.load():
+        raise RuntimeError("Failed to load the instrument master")
+    instrument_master.start()
     logger.info("Attempting Angel One authentication...")
-    if await angel_client.authenticate():
+    if await angel_client.session.ensure():
         logger.info("Angel One authentication successful")
     else:
         logger.error("Angel One authentication failed")
         raise RuntimeError("Failed to authenticate with Angel One")
+    angel_client.session.start()
     logger.info("Connecting WebSocket...")
     await websocket_handler.connect()
     logger.info("WebSocket connected")
-    websocket_handler.add_callback("market_data", strategy_engine.process_market_data)
+    if isinstance(broker, PaperBroker):
+        logger.info("Paper trading: orders are simulated against the live feed")
+        websocket_handler.add_callback("paper_broker", broker.on_tick)
+        broker.add_order_listener("order_manager", order_manager.update_order_status)
+    websocket_handler.add_callback("ltp", ltp_service.on_tick)
+    websocket_handler.add_callback("bars", bar_aggregator.process_tick)
+    websocket_handler.add_backfill_callback("bars", bar_aggregator.add_backfill)
+    websocket_handler.add_backfill_callback("indicator_cache", indicator_cache.on_backfill)
+    bar_aggregator.add_callback("indicator_cache", indicator_cache.on_bar_closed)
+    bar_aggregator.add_callback("strategies", strategy_engine.process_bar)
+    websocket_handler.add_callback("market_data", strategy_engine.process_market_data, mode=DeliveryMode.CONFLATE)
+    bar_aggregator.start()
     sma_strategy = SMAStrategy({
         'short_period': 20,
         'long_period': 50,
@@ -90,7 +116,11 @@ async def lifespan(app: FastAPI):
     yield
     logger.info("Shutting down trading bot...")
     strategy_engine.stop()
+    bar_aggregator.stop()
+    instrument_master.stop()
+    angel_client.session.stop()
     await websocket_handler.disconnect()
+    await redis_pool.close()
     await engine.dispose()
     logger.info("Trading bot shutdown complete")
 
@@ -138,6 +168,7 @@ async def health_check():
     return {
         "status": "healthy",
         "angel_one_connected": angel_client.auth_token is not None,
+        "redis_connected": await redis_pool.ping(),
         "websocket_connected": websocket_handler.is_connected,
         "database_connected": True,  # Add actual database health check
         "strategy_engine_running": strategy_engine.is_running
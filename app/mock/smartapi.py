@@ -0,0 +1,404 @@
+# app/mock/smartapi.py
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from itertools import count
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from uuid import uuid4
+import structlog
+import uvicorn
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse
+from app.core.tick_decoder import encode_tick, LTP_MODE, QUOTE_MODE, SNAP_QUOTE_MODE
+
+logger = structlog.get_logger()
+
+IST = timezone(timedelta(hours=5, minutes=30))
+TICK_SIZE = 0.05
+EQUITIES = {'SBIN': '3045', 'RELIANCE': '2885', 'INFY': '1594', 'TCS': '11536', 'HDFCBANK': '1333'}
+
+def _ok(data: Any) -> Dict[str, Any]:
+    return {'status': True, 'message': 'SUCCESS', 'errorcode': '', 'data': data}
+
+def _error(message: str, code: str) -> Dict[str, Any]:
+    return {'status': False, 'message': message, 'errorcode': code, 'data': None}
+
+class MockSmartAPI:
+    """Local stand-in for the Angel One SmartAPI REST and SmartWebSocketV2 services.
+
+    Serves the routes AngelOneClient uses (login, profile, token refresh,
+    placeOrder, cancelOrder, getLtpData, market quote, getPosition,
+    getOrderBook and getCandleData) and a small scrip master under the same
+    paths, and a binary tick feed at ``/smart-stream`` that honours
+    subscribe/unsubscribe requests and the "ping" heartbeat. Point the app
+    at it with ``SMARTAPI_ROOT_URL``, ``SMARTAPI_WS_URL`` and
+    ``INSTRUMENT_MASTER_URL``.
+
+    Every instrument follows its own random walk, so feed ticks, LTP
+    lookups and order fills agree with each other. Secure REST calls are
+    delayed by ``latency_ms`` plus up to ``jitter_ms`` and fail with the
+    broker's generic error at ``error_rate``. Each feed connection sends
+    ``tick_rate`` ticks a second round-robin over its tokens and is dropped
+    with probability ``disconnect_rate`` per second.
+    """
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, error_rate: float = 0.0,
+                 tick_rate: float = 100.0, disconnect_rate: float = 0.0, volatility: float = 0.0005,
+                 seed: Optional[int] = None):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.error_rate = error_rate
+        self.tick_rate = tick_rate
+        self.disconnect_rate = disconnect_rate
+        self.volatility = volatility
+        self.random = random.Random(seed)
+        self.instruments: Dict[str, Dict[str, Any]] = {}
+        self.orders: Dict[str, Dict[str, Any]] = {}
+        self.sessions: Dict[str, str] = {}  # jwt token -> client code
+        self.feed_tokens: Dict[str, str] = {}  # feed token -> client code
+        self.stats = {'requests': 0, 'errors_injected': 0, 'ticks_sent': 0, 'feed_connections': 0, 'disconnects_injected': 0}
+        self._order_ids = count(int(datetime.now(IST).strftime('%y%m%d')) * 10 ** 9 + 1)
+        self._sequence = count(1)
+        self.app = self._build_app()
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI(title="Mock SmartAPI")
+        app.middleware("http")(self._inject_faults)
+
+        auth = "/rest/auth/angelbroking"
+        secure = "/rest/secure/angelbroking"
+        app.post(f"{auth}/user/v1/loginByPassword")(self.login)
+        app.post(f"{auth}/jwt/v1/generateTokens")(self.generate_tokens)
+        app.get(f"{secure}/user/v1/getProfile")(self.profile)
+        app.post(f"{secure}/user/v1/logout")(self.logout)
+        app.post(f"{secure}/order/v1/placeOrder")(self.place_order)
+        app.post(f"{secure}/order/v1/cancelOrder")(self.cancel_order)
+        app.get(f"{secure}/order/v1/getOrderBook")(self.order_book)
+        app.post(f"{secure}/order/v1/getLtpData")(self.ltp_data)
+        app.get(f"{secure}/order/v1/getPosition")(self.positions)
+        app.post(f"{secure}/market/v1/quote")(self.quote)
+        app.post(f"{secure}/historical/v1/getCandleData")(self.candle_data)
+        app.get("/OpenAPI_File/files/OpenAPIScripMaster.json")(self.scrip_master)
+        app.websocket("/smart-stream")(self.feed)
+        return app
+
+    async def _inject_faults(self, request: Request, call_next):
+        if not request.url.path.startswith("/rest/secure"):
+            return await call_next(request)
+        self.stats['requests'] += 1
+        if self.latency or self.jitter:
+            await asyncio.sleep(self.latency + self.random.random() * self.jitter)
+        if request.headers.get("authorization", "").removeprefix("Bearer ") not in self.sessions:
+            return JSONResponse(_error("Invalid Token", "AG8001"))
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.stats['errors_injected'] += 1
+            return JSONResponse(_error("Something Went Wrong, Please Try After Sometime", "AB1004"))
+        return await call_next(request)
+
+    # Market simulation
+
+    def instrument(self, token: str, exchange_type: int = 1) -> Dict[str, Any]:
+        """State of one instrument, created at a token-derived price on first use"""
+        state = self.instruments.get(token)
+        if state is None:
+            price = round(100 + (int.from_bytes(token.encode(), 'little') % 9000) / 10, 1)
+            state = self.instruments[token] = {
+                'token': token, 'exchange_type': exchange_type, 'ltp': price, 'open': price,
+                'high': price, 'low': price, 'close': price, 'volume': 0, 'last_traded_quantity': 0
+            }
+        return state
+
+    def step(self, token: str, exchange_type: int = 1) -> Dict[str, Any]:
+        """Advance an instrument by one trade"""
+        state = self.instrument(token, exchange_type)
+        move = state['ltp'] * self.random.gauss(0, self.volatility)
+        ltp = max(TICK_SIZE, round((state['ltp'] + move) / TICK_SIZE) * TICK_SIZE)
+        quantity = self.random.randint(1, 500)
+        state['ltp'] = round(ltp, 2)
+        state['high'] = max(state['high'], state['ltp'])
+        state['low'] = min(state['low'], state['ltp'])
+        state['volume'] += quantity
+        state['last_traded_quantity'] = quantity
+        return state
+
+    def tick(self, token: str, exchange_type: int, mode: int) -> bytes:
+        state = self.step(token, exchange_type)
+        now = int(time.time() * 1000)
+        tick = {
+            'subscription_mode': mode, 'exchange_type': exchange_type, 'token': token,
+            'sequence_number': next(self._sequence), 'exchange_timestamp': now, 'ltp': state['ltp']
+        }
+        if mode >= QUOTE_MODE:
+            tick.update(
+                last_traded_quantity=state['last_traded_quantity'], average_price=state['ltp'],
+                volume=state['volume'], total_buy_quantity=state['volume'] // 2,
+                total_sell_quantity=state['volume'] // 2, open=state['open'], high=state['high'],
+                low=state['low'], close=state['close']
+            )
+        if mode == SNAP_QUOTE_MODE:
+            ltp = state['ltp']
+            tick.update(
+                last_traded_timestamp=now // 1000,
+                best_5_buy=[{'price': ltp - TICK_SIZE * (i + 1), 'quantity': 100 * (i + 1), 'orders': i + 1} for i in range(5)],
+                best_5_sell=[{'price': ltp + TICK_SIZE * (i + 1), 'quantity': 100 * (i + 1), 'orders': i + 1} for i in range(5)],
+                upper_circuit_limit=state['close'] * 1.2, lower_circuit_limit=state['close'] * 0.8,
+                week_52_high=state['close'] * 1.5, week_52_low=state['close'] * 0.5
+            )
+        return encode_tick(tick)
+
+    # REST routes
+
+    async def login(self, request: Request):
+        body = await request.json()
+        jwt, feed = uuid4().hex, uuid4().hex
+        self.sessions[jwt] = body.get('clientcode', 'MOCK')
+        self.feed_tokens[feed] = body.get('clientcode', 'MOCK')
+        return _ok({'jwtToken': jwt, 'refreshToken': uuid4().hex, 'feedToken': feed})
+
+    async def generate_tokens(self, request: Request):
+        client_code = next(iter(self.sessions.values()), 'MOCK')
+        jwt, feed = uuid4().hex, uuid4().hex
+        self.sessions[jwt] = client_code
+        self.feed_tokens[feed] = client_code
+        return _ok({'jwtToken': jwt, 'refreshToken': uuid4().hex, 'feedToken': feed})
+
+    async def profile(self, request: Request):
+        client_code = self.sessions[request.headers["authorization"].removeprefix("Bearer ")]
+        return _ok({'clientcode': client_code, 'name': 'MOCK USER', 'exchanges': ['NSE', 'BSE', 'NFO'],
+                    'products': ['MARGIN', 'MIS', 'NRML', 'CNC']})
+
+    async def logout(self, request: Request):
+        self.sessions.pop(request.headers["authorization"].removeprefix("Bearer "), None)
+        return _ok("")
+
+    async def place_order(self, request: Request):
+        body = await request.json()
+        missing = [f for f in ('tradingsymbol', 'symboltoken', 'transactiontype', 'exchange', 'ordertype', 'quantity')
+                   if not body.get(f)]
+        if missing:
+            return _error(f"Invalid {missing[0]}", "AB1018")
+
+        order_id = str(next(self._order_ids))
+        quantity = int(body['quantity'])
+        price = float(body.get('price') or 0)
+        order = self.orders[order_id] = {
+            'variety': body.get('variety', 'NORMAL'), 'ordertype': body['ordertype'],
+            'producttype': body.get('producttype', 'INTRADAY'), 'duration': body.get('duration', 'DAY'),
+            'price': price, 'quantity': str(quantity), 'tradingsymbol': body['tradingsymbol'],
+            'symboltoken': str(body['symboltoken']), 'transactiontype': body['transactiontype'],
+            'exchange': body['exchange'], 'orderid': order_id, 'uniqueorderid': str(uuid4()),
+            'status': 'open', 'orderstatus': 'open', 'text': '', 'filledshares': '0',
+            'unfilledshares': str(quantity), 'averageprice': 0.0,
+            'updatetime': datetime.now(IST).strftime('%d-%b-%Y %H:%M:%S')
+        }
+        ltp = self.instrument(order['symboltoken'])['ltp']
+        buy = order['transactiontype'] == 'BUY'
+        if order['ordertype'] == 'MARKET' or (buy and price >= ltp) or (not buy and 0 < price <= ltp):
+            order.update(status='complete', orderstatus='complete', filledshares=str(quantity),
+                         unfilledshares='0', averageprice=ltp)
+        return _ok({'script': order['tradingsymbol'], 'orderid': order_id, 'uniqueorderid': order['uniqueorderid']})
+
+    async def cancel_order(self, request: Request):
+        body = await request.json()
+        order = self.orders.get(str(body.get('orderid')))
+        if order is None:
+            return _error("Invalid Order ID", "AB2001")
+        if order['status'] != 'open':
+            return _error(f"Order is {order['status']}", "AB4008")
+        order.update(status='cancelled', orderstatus='cancelled')
+        return _ok({'orderid': order['orderid'], 'uniqueorderid': order['uniqueorderid']})
+
+    async def order_book(self, request: Request):
+        return _ok(list(self.orders.values()) or None)
+
+    async def ltp_data(self, request: Request):
+        body = await request.json()
+        state = self.step(str(body['symboltoken']))
+        return _ok({
+            'exchange': body['exchange'], 'tradingsymbol': body['tradingsymbol'], 'symboltoken': str(body['symboltoken']),
+            'open': state['open'], 'high': state['high'], 'low': state['low'], 'close': state['close'], 'ltp': state['ltp']
+        })
+
+    async def quote(self, request: Request):
+        body = await request.json()
+        exchange_tokens = body.get('exchangeTokens') or {}
+        if sum(len(tokens) for tokens in exchange_tokens.values()) > 50:
+            return _error("At most 50 tokens per quote request", "AB1004")
+        fetched = []
+        for exchange, tokens in exchange_tokens.items():
+            for token in tokens:
+                state = self.step(str(token))
+                row = {'exchange': exchange, 'tradingSymbol': str(token), 'symbolToken': str(token), 'ltp': state['ltp']}
+                if body.get('mode') in ('OHLC', 'FULL'):
+                    row.update(open=state['open'], high=state['high'], low=state['low'], close=state['close'])
+                if body.get('mode') == 'FULL':
+                    row.update(tradeVolume=state['volume'], lastTradeQty=state['last_traded_quantity'])
+                fetched.append(row)
+        return _ok({'fetched': fetched, 'unfetched': []})
+
+    async def positions(self, request: Request):
+        books: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for order in self.orders.values():
+            filled = int(order['filledshares'])
+            if not filled:
+                continue
+            book = books.setdefault((order['symboltoken'], order['exchange']), {
+                'tradingsymbol': order['tradingsymbol'], 'symboltoken': order['symboltoken'],
+                'exchange': order['exchange'], 'producttype': order['producttype'],
+                'buyqty': 0, 'sellqty': 0, 'buyamount': 0.0, 'sellamount': 0.0
+            })
+            side = 'buy' if order['transactiontype'] == 'BUY' else 'sell'
+            book[f'{side}qty'] += filled
+            book[f'{side}amount'] += filled * order['averageprice']
+
+        positions = []
+        for book in books.values():
+            ltp = self.instrument(book['symboltoken'])['ltp']
+            net = book['buyqty'] - book['sellqty']
+            pnl = book['sellamount'] - book['buyamount'] + net * ltp
+            positions.append({
+                **{k: v for k, v in book.items() if not k.endswith('amount')},
+                'buyqty': str(book['buyqty']), 'sellqty': str(book['sellqty']), 'netqty': str(net),
+                'buyavgprice': f"{book['buyamount'] / book['buyqty'] if book['buyqty'] else 0:.2f}",
+                'sellavgprice': f"{book['sellamount'] / book['sellqty'] if book['sellqty'] else 0:.2f}",
+                'ltp': f"{ltp:.2f}", 'pnl': f"{pnl:.2f}"
+            })
+        return _ok(positions or None)
+
+    async def candle_data(self, request: Request):
+        body = await request.json()
+        start = datetime.strptime(body['fromdate'], '%Y-%m-%d %H:%M').replace(tzinfo=IST)
+        end = datetime.strptime(body['todate'], '%Y-%m-%d %H:%M').replace(tzinfo=IST)
+        step = {'ONE_MINUTE': 1, 'FIVE_MINUTE': 5, 'FIFTEEN_MINUTE': 15, 'ONE_HOUR': 60}.get(body.get('interval'), 1)
+        token = str(body['symboltoken'])
+        rows, when = [], start
+        while when <= end:
+            state = self.instrument(token)
+            open_ = state['ltp']
+            prices = [self.step(token)['ltp'] for _ in range(4)]
+            rows.append([when.isoformat(), open_, max(open_, *prices), min(open_, *prices), prices[-1],
+                         self.random.randint(1000, 50000)])
+            when += timedelta(minutes=step)
+        return _ok(rows)
+
+    async def scrip_master(self):
+        """A small instrument master: a few NSE equities and the next NIFTY future and options"""
+        rows = [
+            {'token': token, 'symbol': f"{name}-EQ", 'name': name, 'expiry': '', 'strike': '-1.000000',
+             'lotsize': '1', 'instrumenttype': '', 'exch_seg': 'NSE', 'tick_size': '5.000000'}
+            for name, token in EQUITIES.items()
+        ]
+        today = datetime.now(IST).date()
+        expiry = today + timedelta(days=(3 - today.weekday()) % 7)
+        label = expiry.strftime('%d%b%Y').upper()
+        token = count(50000)
+        rows.append({'token': str(next(token)), 'symbol': f"NIFTY{expiry:%d%b%y}FUT".upper(), 'name': 'NIFTY',
+                     'expiry': label, 'strike': '-1.000000', 'lotsize': '75', 'instrumenttype': 'FUTIDX',
+                     'exch_seg': 'NFO', 'tick_size': '10.000000'})
+        for strike in range(23000, 25050, 50):
+            for option_type in ('CE', 'PE'):
+                rows.append({'token': str(next(token)), 'symbol': f"NIFTY{expiry:%d%b%y}{strike}{option_type}".upper(),
+                             'name': 'NIFTY', 'expiry': label, 'strike': f"{strike * 100:.6f}", 'lotsize': '75',
+                             'instrumenttype': 'OPTIDX', 'exch_seg': 'NFO', 'tick_size': '5.000000'})
+        return rows
+
+    # Binary feed
+
+    async def feed(self, websocket: WebSocket):
+        if websocket.headers.get("x-feed-token") not in self.feed_tokens:
+            await websocket.close(code=4001)
+            return
+        await websocket.accept()
+        self.stats['feed_connections'] += 1
+        subscriptions: Dict[str, Tuple[int, int]] = {}  # token -> (exchange type, mode)
+        streamer = asyncio.create_task(self._stream(websocket, subscriptions))
+        try:
+            while True:
+                message = await websocket.receive_text()
+                if message == "ping":
+                    await websocket.send_text("pong")
+                    continue
+                request = json.loads(message)
+                params = request.get('params', {})
+                for entry in params.get('tokenList', []):
+                    for token in entry['tokens']:
+                        if request.get('action') == 1:
+                            subscriptions[str(token)] = (entry['exchangeType'], params.get('mode', LTP_MODE))
+                        else:
+                            subscriptions.pop(str(token), None)
+        except (WebSocketDisconnect, RuntimeError):
+            pass
+        finally:
+            streamer.cancel()
+
+    async def _stream(self, websocket: WebSocket, subscriptions: Dict[str, Tuple[int, int]]):
+        """Send ``tick_rate`` ticks a second, round-robin over the subscribed tokens"""
+        due, cursor = 0.0, 0
+        last = time.perf_counter()
+        try:
+            while True:
+                await asyncio.sleep(0.01)
+                now = time.perf_counter()
+                elapsed, last = now - last, now
+                if self.disconnect_rate and self.random.random() < self.disconnect_rate * elapsed:
+                    self.stats['disconnects_injected'] += 1
+                    await websocket.close(code=1011)
+                    return
+                tokens = list(subscriptions.items())
+                if not tokens:
+                    continue
+                due += self.tick_rate * elapsed
+                for _ in range(int(due)):
+                    token, (exchange_type, mode) = tokens[cursor % len(tokens)]
+                    cursor += 1
+                    await websocket.send_bytes(self.tick(token, exchange_type, mode))
+                self.stats['ticks_sent'] += int(due)
+                due -= int(due)
+        except (WebSocketDisconnect, RuntimeError):
+            # The client went away while a frame was being sent
+            pass
+        except Exception as e:
+            logger.error(f"Mock feed stream error: {type(e).__name__} {str(e)}")
+
+    @contextmanager
+    def running(self, host: str = "127.0.0.1", port: int = 0) -> Iterator[str]:
+        """Serve on a background thread; yields the base URL (port 0 picks a free port)"""
+        server = uvicorn.Server(uvicorn.Config(self.app, host=host, port=port, log_level="warning", ws="websockets"))
+        thread = threading.Thread(target=server.run, name="mock-smartapi", daemon=True)
+        thread.start()
+        while not server.started:
+            if not thread.is_alive():
+                raise RuntimeError("Mock SmartAPI server failed to start")
+            time.sleep(0.01)
+        bound = server.servers[0].sockets[0].getsockname()[1]
+        try:
+            yield f"http://{host}:{bound}"
+        finally:
+            server.should_exit = True
+            thread.join()
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Mock Angel One SmartAPI server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of secure REST calls that fail")
+    parser.add_argument("--tick-rate", type=float, default=100.0, help="ticks per second per feed connection")
+    parser.add_argument("--disconnect-rate", type=float, default=0.0, help="feed drops per connection per second")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    mock = MockSmartAPI(args.latency_ms, args.jitter_ms, args.error_rate, args.tick_rate,
+                        args.disconnect_rate, seed=args.seed)
+    print(f"SMARTAPI_ROOT_URL=http://{args.host}:{args.port}")
+    print(f"SMARTAPI_WS_URL=ws://{args.host}:{args.port}/smart-stream")
+    uvicorn.run(mock.app, host=args.host, port=args.port, log_level="warning", ws="websockets")
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,32 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
-import pandas as pd
+from enum import Enum
+from typing import Dict, Any, Callable, Optional, Tuple
+import numpy as np
 import structlog
+from app.core.price_history import PriceHistory, HistoryWindow, price_history
+from app.core.indicator_cache import IndicatorCache, indicator_cache
 
 logger = structlog.get_logger()
 
+class Cadence(str, Enum):
+    TICK = "tick"    # every tick of the symbol
+    BAR = "bar"      # on close of each bar of the strategy's timeframe
+    TIMER = "timer"  # every ``interval`` seconds
+
 class BaseStrategy(ABC):
-    def __init__(self, name: str, parameters: Dict[str, Any]):
+    default_cadence = Cadence.TICK
+    
+    def __init__(self, name: str, parameters: Dict[str, Any], history: Optional[PriceHistory] = None,
+                 cache: Optional[IndicatorCache] = None):
         self.name = name
         self.parameters = parameters
+        self.history = history if history is not None else price_history
+        # Cache keys name a series, so a private history needs a private cache
+        if cache is None:
+            cache = indicator_cache if self.history is price_history else IndicatorCache()
+        self.indicator_cache = cache
+        self.cadence = Cadence(parameters.get('cadence', self.default_cadence))
+        self.interval = parameters.get('interval', 60)
         self.is_active = False
         self.positions = {}
         self.orders = []
@@ -19,10 +37,23 @@ class BaseStrategy(ABC):
         pass
     
     @abstractmethod
-    async def calculate_indicators(self, data: pd.DataFrame) -> Dict[str, float]:
+    async def calculate_indicators(self, data: HistoryWindow) -> Dict[str, float]:
         """Calculate technical indicators"""
         pass
     
+    def vectorized_signals(self, data: HistoryWindow) -> Optional[np.ndarray]:
+        """Signal at every bar of ``data`` at once: 1 BUY, -1 SELL, 0 none.
+
+        Bar ``i`` must get the signal ``generate_signal`` would give with
+        history ending at bar ``i``. Used by the backtester; strategies that
+        cannot be backtested return None.
+        """
+        return None
+    
+    def cached(self, indicator: str, params: Tuple, bar_index: int, compute: Callable[[], Any]) -> Any:
+        """Indicator value for a bar of this strategy's series, shared with other strategies"""
+        return self.indicator_cache.get_or_compute(self.symbol, self.timeframe, indicator, params, bar_index, compute)
+    
     def activate(self):
         """Activate strategy"""
         self.is_active = True
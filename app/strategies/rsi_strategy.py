@@ -1,19 +1,26 @@
 from typing import Dict, Any, Optional
-import pandas as pd
 import numpy as np
-from app.strategies.base_strategy import BaseStrategy
+from app.strategies.base_strategy import BaseStrategy, Cadence
+from app.core.bar_aggregator import normalize_timeframe
+from app.core.price_history import PriceHistory, HistoryWindow
+from app.core.indicator_cache import IndicatorCache
+from app.utils.indicators import batch_rsi
 from app.models.schemas import OrderCreate, TransactionTypeEnum, OrderTypeEnum
 import structlog
 
 logger = structlog.get_logger()
 
 class RSIStrategy(BaseStrategy):
-    def __init__(self, parameters: Dict[str, Any]):
-        super().__init__("RSI_MEAN_REVERSION", parameters)
+    default_cadence = Cadence.BAR
+    
+    def __init__(self, parameters: Dict[str, Any], history: Optional[PriceHistory] = None,
+                 cache: Optional[IndicatorCache] = None):
+        super().__init__("RSI_MEAN_REVERSION", parameters, history, cache)
         self.rsi_period = parameters.get('rsi_period', 14)
         self.oversold_level = parameters.get('oversold_level', 30)
         self.overbought_level = parameters.get('overbought_level', 70)
         self.symbol = parameters.get('symbol', 'SBIN-EQ')
+        self.timeframe = normalize_timeframe(parameters.get('timeframe', '1m'))
     
     async def generate_signal(self, market_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Generate signal based on RSI levels"""
@@ -21,7 +28,7 @@ class RSIStrategy(BaseStrategy):
             if not self.is_active:
                 return None
             
-            historical_data = await self._get_historical_data()
+            historical_data = self.history.window(self.symbol, self.timeframe, self.rsi_period + 1)
             if len(historical_data) < self.rsi_period + 1:
                 return None
             
@@ -52,29 +59,28 @@ class RSIStrategy(BaseStrategy):
             logger.error(f"Error generating RSI signal: {str(e)}")
             return None
     
-    async def calculate_indicators(self, data: pd.DataFrame) -> Dict[str, float]:
+    async def calculate_indicators(self, data: HistoryWindow) -> Dict[str, float]:
         """Calculate RSI indicator"""
-        delta = data['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=self.rsi_period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=self.rsi_period).mean()
-        
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        
         return {
-            'rsi': rsi.iloc[-1]
+            'rsi': self.cached('rsi', (self.rsi_period,), data.bar_index, lambda: self._rsi(data.close))
         }
     
-    async def _get_historical_data(self) -> pd.DataFrame:
-        """Get historical data for calculations"""
-        dates = pd.date_range(start='2024-01-01', periods=100, freq='D')
-        prices = np.random.randn(100).cumsum() + 100
+    def _rsi(self, close) -> float:
+        delta = np.diff(close[-self.rsi_period - 1:])
+        gain = delta[delta > 0].sum() / self.rsi_period
+        loss = -delta[delta < 0].sum() / self.rsi_period
         
-        return pd.DataFrame({
-            'timestamp': dates,
-            'close': prices,
-            'open': prices * 0.99,
-            'high': prices * 1.02,
-            'low': prices * 0.98,
-            'volume': np.random.randint(1000, 10000, 100)
-        })
\ No newline at end of file
+        if loss == 0:
+            return 100.0 if gain > 0 else 50.0
+        return 100 - (100 / (1 + gain / loss))
+    
+    def vectorized_signals(self, data: HistoryWindow) -> np.ndarray:
+        """RSI threshold signals over the whole history"""
+        rsi = batch_rsi(data.close, self.rsi_period)[0]
+        # A window with no moves at all reads as neutral, as in _rsi
+        rsi[np.isnan(rsi)] = 50.0
+        rsi[:self.rsi_period] = np.nan
+        signals = np.zeros(len(data), dtype=np.int8)
+        signals[rsi < self.oversold_level] = 1
+        signals[rsi > self.overbought_level] = -1
+        return signals
@@ -1,16 +1,20 @@
 from typing import Dict, Any, Optional
-import pandas as pd
 import numpy as np
 from app.strategies.base_strategy import BaseStrategy
+from app.core.bar_aggregator import normalize_timeframe
+from app.core.price_history import PriceHistory, HistoryWindow
+from app.core.indicator_cache import IndicatorCache
+from app.utils.indicators import batch_sma
 from app.models.schemas import OrderCreate, TransactionTypeEnum, OrderTypeEnum
 import structlog
 
 logger = structlog.get_logger()
 
 class ScalpingStrategy(BaseStrategy):
-    def __init__(self, parameters: Dict[str, Any]):
-        super().__init__("SCALPING", parameters)
-        self.timeframe = parameters.get('timeframe', '1min')
+    def __init__(self, parameters: Dict[str, Any], history: Optional[PriceHistory] = None,
+                 cache: Optional[IndicatorCache] = None):
+        super().__init__("SCALPING", parameters, history, cache)
+        self.timeframe = normalize_timeframe(parameters.get('timeframe', '1min'))
         self.profit_target = parameters.get('profit_target', 0.005)  # 0.5%
         self.stop_loss = parameters.get('stop_loss', 0.002)  # 0.2%
         self.symbol = parameters.get('symbol', 'SBIN-EQ')
@@ -21,7 +25,7 @@ class ScalpingStrategy(BaseStrategy):
             if not self.is_active:
                 return None
             
-            historical_data = await self._get_historical_data()
+            historical_data = self.history.window(self.symbol, self.timeframe, 20)
             if len(historical_data) < 20:  # Need enough data for analysis
                 return None
             
@@ -56,27 +60,30 @@ class ScalpingStrategy(BaseStrategy):
             logger.error(f"Error generating scalping signal: {str(e)}")
             return None
     
-    async def calculate_indicators(self, data: pd.DataFrame) -> Dict[str, float]:
+    async def calculate_indicators(self, data: HistoryWindow) -> Dict[str, float]:
         """Calculate scalping indicators"""
-        data['returns'] = data['close'].pct_change()
-        momentum = data['returns'].rolling(window=5).mean().iloc[-1]
-        price_change = data['close'].iloc[-1] - data['close'].iloc[-2]
+        close = data.close
+        momentum = self.cached('momentum', (5,), data.bar_index, lambda: (close[-5:] / close[-6:-1] - 1).mean())
+        price_change = close[-1] - close[-2]
         
         return {
             'momentum': momentum * 100,
             'price_change': price_change
         }
     
-    async def _get_historical_data(self) -> pd.DataFrame:
-        """Get historical data for calculations"""
-        dates = pd.date_range(start='2024-01-01', periods=100, freq='min')
-        prices = np.random.randn(100).cumsum() + 100
-        
-        return pd.DataFrame({
-            'timestamp': dates,
-            'close': prices,
-            'open': prices * 0.99,
-            'high': prices * 1.02,
-            'low': prices * 0.98,
-            'volume': np.random.randint(1000, 10000, 100)
-        })
\ No newline at end of file
+    def vectorized_signals(self, data: HistoryWindow) -> np.ndarray:
+        """Momentum signals over the whole history"""
+        close = data.close
+        signals = np.zeros(len(data), dtype=np.int8)
+        if len(close) < 20:
+            return signals
+        returns = np.zeros(len(close))
+        returns[1:] = close[1:] / close[:-1] - 1
+        momentum = batch_sma(returns, 5)[0]
+        price_change = np.full(len(close), np.nan)
+        price_change[1:] = np.diff(close)
+        # Live evaluation waits for 20 bars of history
+        momentum[:19] = np.nan
+        signals[(momentum > 0) & (price_change > 0)] = 1
+        signals[(momentum < 0) & (price_change < 0)] = -1
+        return signals
@@ -1,18 +1,27 @@
 from typing import Dict, Any, Optional
-import pandas as pd
 import numpy as np
-from app.strategies.base_strategy import BaseStrategy
+from app.strategies.base_strategy import BaseStrategy, Cadence
+from app.core.bar_aggregator import normalize_timeframe
+from app.core.price_history import PriceHistory, HistoryWindow
+from app.core.indicator_cache import IndicatorCache
+from app.utils.indicators import batch_sma
 from app.models.schemas import OrderCreate, TransactionTypeEnum, OrderTypeEnum
 import structlog
 
 logger = structlog.get_logger()
 
 class SMAStrategy(BaseStrategy):
-    def __init__(self, parameters: Dict[str, Any]):
-        super().__init__("SMA_CROSSOVER", parameters)
+    """Moving average crossover on closed bars of ``timeframe`` (default 1m, up to 15m)"""
+
+    default_cadence = Cadence.BAR
+    
+    def __init__(self, parameters: Dict[str, Any], history: Optional[PriceHistory] = None,
+                 cache: Optional[IndicatorCache] = None):
+        super().__init__("SMA_CROSSOVER", parameters, history, cache)
         self.short_period = parameters.get('short_period', 20)
         self.long_period = parameters.get('long_period', 50)
         self.symbol = parameters.get('symbol', 'SBIN-EQ')
+        self.timeframe = normalize_timeframe(parameters.get('timeframe', '1m'))
     
     async def generate_signal(self, market_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Generate signal based on SMA crossover"""
@@ -20,8 +29,9 @@ class SMAStrategy(BaseStrategy):
             if not self.is_active:
                 return None
             
-            historical_data = await self._get_historical_data()
-            if len(historical_data) < self.long_period:
+            # Current and previous long SMA need one bar more than the period
+            historical_data = self.history.window(self.symbol, self.timeframe, self.long_period + 1)
+            if len(historical_data) <= self.long_period:
                 return None
             
             indicators = await self.calculate_indicators(historical_data)
@@ -55,28 +65,28 @@ class SMAStrategy(BaseStrategy):
             logger.error(f"Error generating SMA signal: {str(e)}")
             return None
     
-    async def calculate_indicators(self, data: pd.DataFrame) -> Dict[str, float]:
+    async def calculate_indicators(self, data: HistoryWindow) -> Dict[str, float]:
         """Calculate SMA indicators"""
-        data['sma_short'] = data['close'].rolling(window=self.short_period).mean()
-        data['sma_long'] = data['close'].rolling(window=self.long_period).mean()
+        close = data.close
+        bar = data.bar_index
+        short, long = (self.short_period,), (self.long_period,)
         
+        # This bar's SMAs are the next bar's previous SMAs, so both hit the cache then
         return {
-            'sma_short': data['sma_short'].iloc[-1],
-            'sma_long': data['sma_long'].iloc[-1],
-            'prev_sma_short': data['sma_short'].iloc[-2],
-            'prev_sma_long': data['sma_long'].iloc[-2]
+            'sma_short': self.cached('sma', short, bar, lambda: close[-self.short_period:].mean()),
+            'sma_long': self.cached('sma', long, bar, lambda: close[-self.long_period:].mean()),
+            'prev_sma_short': self.cached('sma', short, bar - 1, lambda: close[-self.short_period - 1:-1].mean()),
+            'prev_sma_long': self.cached('sma', long, bar - 1, lambda: close[-self.long_period - 1:-1].mean())
         }
     
-    async def _get_historical_data(self) -> pd.DataFrame:
-        """Get historical data for calculations"""
-        dates = pd.date_range(start='2024-01-01', periods=100, freq='D')
-        prices = np.random.randn(100).cumsum() + 100
-        
-        return pd.DataFrame({
-            'timestamp': dates,
-            'close': prices,
-            'open': prices * 0.99,
-            'high': prices * 1.02,
-            'low': prices * 0.98,
-            'volume': np.random.randint(1000, 10000, 100)
-        })
\ No newline at end of file
+    def vectorized_signals(self, data: HistoryWindow) -> np.ndarray:
+        """SMA crossovers over the whole history"""
+        sma_short = batch_sma(data.close, self.short_period)[0]
+        sma_long = batch_sma(data.close, self.long_period)[0]
+        above = sma_short > sma_long
+        below = sma_short < sma_long
+        signals = np.zeros(len(data), dtype=np.int8)
+        # NaN warm-up compares False, so nothing fires before both SMAs exist
+        signals[1:][above[1:] & (sma_short[:-1] <= sma_long[:-1])] = 1
+        signals[1:][below[1:] & (sma_short[:-1] >= sma_long[:-1])] = -1
+        return signals
@@ -0,0 +1,110 @@
+import asyncio
+import time
+import pytest
+from app.config import settings
+from app.core.angel_client import AngelOneClient
+from app.core.instruments import instrument_master
+from app.core.redis_pool import redis_pool
+from app.mock.smartapi import MockSmartAPI
+
+@pytest.fixture
+def mock_broker(monkeypatch):
+    def connect(mock):
+        async def no_cache():
+            pass
+
+        server = mock.running()
+        url = server.__enter__()
+        monkeypatch.setattr(settings, "smartapi_root_url", url)
+        monkeypatch.setattr(instrument_master, "tokens", {'NSE': {'SBIN-EQ': '3045'}})
+        client = AngelOneClient()
+        client._cache_tokens = no_cache
+        servers.append(server)
+        return client
+
+    servers = []
+    yield connect
+    for server in servers:
+        server.__exit__(None, None, None)
+
+@pytest.mark.asyncio
+async def test_orders_use_the_full_response_and_cancel_by_variety(mock_broker):
+    client = mock_broker(MockSmartAPI(seed=1))
+    assert await client.authenticate()
+
+    ltp = await client.get_ltp('SBIN-EQ', 'NSE')
+    result = await client.place_order({'symbol': 'SBIN-EQ', 'exchange': 'NSE', 'transaction_type': 'BUY',
+                                       'order_type': 'LIMIT', 'price': round(ltp * 0.5, 2), 'quantity': 1})
+    assert result['status'] and result['data']['orderid']
+
+    assert (await client.cancel_order(result['data']['orderid']))['status']
+    assert (await client.get_orders())[0]['status'] == 'cancelled'
+    unknown = await client.place_order({'symbol': 'NOPE-EQ', 'exchange': 'NSE', 'transaction_type': 'BUY',
+                                        'order_type': 'MARKET', 'quantity': 1})
+    assert unknown['status'] is False
+
+@pytest.mark.asyncio
+async def test_slow_broker_calls_do_not_block_the_loop(mock_broker):
+    client = mock_broker(MockSmartAPI(latency_ms=300, seed=1))
+    assert await client.authenticate()
+
+    lags = []
+
+    async def heartbeat():
+        for _ in range(30):
+            start = time.perf_counter()
+            await asyncio.sleep(0.01)
+            lags.append(time.perf_counter() - start - 0.01)
+
+    start = time.perf_counter()
+    prices = await asyncio.gather(*(client.get_ltp('SBIN-EQ', 'NSE') for _ in range(4)), heartbeat())
+    assert all(prices[:4])
+    # Four 300 ms calls overlap instead of queueing on the loop
+    assert time.perf_counter() - start < 0.9
+    assert max(lags) < 0.1
+
+@pytest.mark.asyncio
+async def test_calls_reuse_one_keep_alive_connection(mock_broker):
+    client = mock_broker(MockSmartAPI(seed=1))
+    assert await client.authenticate()
+    for _ in range(10):
+        assert await client.get_ltp('SBIN-EQ', 'NSE')
+
+    pools = client.smart_api.session.get_adapter(settings.smartapi_root_url).poolmanager.pools
+    assert sum(pools[key].num_connections for key in pools.keys()) == 1
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_login(mock_broker):
+    mock = MockSmartAPI(seed=1)
+    client = mock_broker(mock)
+
+    assert all(await asyncio.gather(*(client.session.ensure() for _ in range(5))))
+    assert client.session.logins == 1 and len(mock.sessions) == 1
+
+    # Inside the refresh margin the refresh token is used instead of a new login
+    client.token_expiry = time.time() + 10
+    assert await client.session.ensure()
+    assert client.session.logins == 1 and client.session.refreshes == 1
+    assert client.token_expiry > time.time() + client.session.refresh_margin
+    assert await client.get_ltp('SBIN-EQ', 'NSE')
+
+@pytest.mark.asyncio
+async def test_session_resumes_from_cached_tokens(mock_broker, monkeypatch):
+    class FakeRedis(dict):
+        async def get(self, key):
+            return dict.get(self, key)
+
+        async def set(self, key, value, ex=None):
+            self[key] = value
+
+    monkeypatch.setattr(redis_pool, "_client", FakeRedis())
+    mock = MockSmartAPI(seed=1)
+    first = mock_broker(mock)
+    del first._cache_tokens
+    assert await first.session.ensure()
+
+    second = mock_broker(mock)
+    assert await second.session.ensure()
+    assert second.session.logins == 0
+    assert second.auth_token == first.auth_token
+    assert await second.get_ltp('SBIN-EQ', 'NSE')
@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+import pytest
+from app.backtest.data import history_from_arrays, load_file
+from app.backtest.engine import Backtester
+from app.core.price_history import PriceHistory
+from app.strategies.base_strategy import BaseStrategy
+from app.strategies.sma_crossover import SMAStrategy
+from app.strategies.rsi_strategy import RSIStrategy
+from app.strategies.scalping_strategy import ScalpingStrategy
+
+STRATEGIES = [
+    (SMAStrategy, {'short_period': 5, 'long_period': 20}),
+    (RSIStrategy, {'rsi_period': 14, 'oversold_level': 40, 'overbought_level': 60}),
+    (ScalpingStrategy, {'timeframe': '1m'})
+]
+
+def _bars(count=300, seed=2):
+    close = np.random.default_rng(seed).normal(0, 1, count).cumsum() + 500
+    close[100:120] = close[99]  # flat run: no gains or losses
+    timestamp = 1722151800 + 60 * np.arange(count)
+    return history_from_arrays(timestamp, close, close + 1, close - 1, close, np.full(count, 10))
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("cls,parameters", STRATEGIES)
+async def test_vectorized_signals_match_live_evaluation(cls, parameters):
+    data = _bars()
+    vectorized = cls({**parameters, 'symbol': 'TEST-EQ'}).vectorized_signals(data)
+
+    history = PriceHistory(500)
+    live = cls({**parameters, 'symbol': 'TEST-EQ'}, history)
+    live.activate()
+    expected = []
+    for i in range(len(data)):
+        history.append('TEST-EQ', '1m', data.timestamp[i], data.open[i], data.high[i], data.low[i], data.close[i])
+        signal = await live.generate_signal({'ltp': data.close[i]})
+        expected.append({'BUY': 1, 'SELL': -1}[signal['action']] if signal else 0)
+
+    assert vectorized.tolist() == expected
+    assert np.count_nonzero(vectorized)
+
+def test_fills_at_next_open_and_marks_equity():
+    close = np.array([10.0, 10, 11, 12, 12, 11, 10])
+    open_ = np.array([10.0, 10, 10.5, 11.5, 12, 11.5, 10.5])
+    data = history_from_arrays(np.arange(7) * 60, open_, close, close, close)
+    signals = np.array([0, 1, 0, 0, -1, 0, 0], dtype=np.int8)
+    strategy = SMAStrategy({'quantity': 2})
+
+    result = Backtester(initial_capital=1000, commission=0, allow_short=False).run(strategy, data, signals)
+
+    assert result.position.tolist() == [0, 0, 2, 2, 2, 0, 0]
+    assert result.fills['bar'].tolist() == [2, 5]
+    assert result.fills['price'].tolist() == [10.5, 11.5]
+    assert result.equity.tolist() == [1000, 1000, 1001, 1003, 1003, 1002, 1002]
+    assert result.stats['trades'] == 1 and result.stats['win_rate'] == 1.0
+    assert result.stats['total_return'] == pytest.approx(0.002)
+
+def test_reversals_and_costs():
+    close = np.array([10.0, 10, 12, 12, 9, 9])
+    data = history_from_arrays(np.arange(6) * 60, close, close, close, close)
+    signals = np.array([1, 0, -1, 0, 1, 0], dtype=np.int8)
+
+    result = Backtester(initial_capital=1000, commission=0.01).run(SMAStrategy({}), data, signals)
+
+    assert result.position.tolist() == [0, 1, 1, -1, -1, 1]
+    assert result.fills['quantity'].tolist() == [1, -2, 2]
+    assert result.stats['trades'] == 2
+    assert result.stats['commission'] == pytest.approx(0.10 + 0.24 + 0.18)
+    assert result.equity[-1] == pytest.approx(1000 + 2 + 3 - 0.52)
+
+def test_load_file_parses_datetime_strings(tmp_path):
+    path = tmp_path / "bars.csv"
+    pd.DataFrame({
+        'Timestamp': ['2024-07-28 09:16:00', '2024-07-28 09:15:00'],
+        'Open': [2, 1], 'High': [2, 1], 'Low': [2, 1], 'Close': [2, 1], 'Volume': [5, 6]
+    }).to_csv(path, index=False)
+
+    data = load_file(path)
+    assert data.timestamp.tolist() == [1722158100, 1722158160]
+    assert data.close.tolist() == [1, 2]
+
+def test_scalping_brackets_close_positions_when_enabled():
+    close = np.array([100.0, 100, 100, 100.3, 100.6, 100.7, 100.8])
+    data = history_from_arrays(np.arange(7) * 60, close, close, close, close)
+    signals = np.array([1, 0, 1, 0, 0, 0, 0], dtype=np.int8)
+    strategy = ScalpingStrategy({'profit_target': 0.005, 'stop_loss': 0.002})
+
+    result = Backtester(commission=0, brackets=True).run(strategy, data, signals)
+
+    # Entered at 100, target hit on the 100.6 close, flat from the next open
+    assert result.position.tolist() == [0, 1, 1, 1, 1, 0, 0]
+    assert result.fills['price'].tolist() == [100.0, 100.7]
+
+    # Off by default, matching live trading, which does not execute brackets
+    assert Backtester(commission=0).run(strategy, data, signals).position.tolist() == [0, 1, 1, 1, 1, 1, 1]
+
+def test_strategy_without_vectorized_signals_is_rejected():
+    class TickOnly(BaseStrategy):
+        async def generate_signal(self, market_data):
+            return None
+
+        async def calculate_indicators(self, data):
+            return {}
+
+    close = np.array([100.0, 101, 102])
+    data = history_from_arrays(np.arange(3) * 60, close, close, close, close)
+    with pytest.raises(ValueError, match="no vectorized signals"):
+        Backtester().run(TickOnly('TICK_ONLY', {}), data)
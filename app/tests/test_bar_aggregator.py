@@ -0,0 +1,115 @@
+import pytest
+from app.core.bar_aggregator import BarAggregator
+from app.core.price_history import PriceHistory
+
+T0 = 1722151800  # a minute boundary
+
+def _tick(ts, ltp, volume=None):
+    tick = {'symbol': 'SBIN-EQ', 'timestamp': ts, 'ltp': ltp}
+    if volume is not None:
+        tick['volume'] = volume
+    return tick
+
+@pytest.mark.asyncio
+async def test_minute_bar_closes_on_next_bucket():
+    aggregator = BarAggregator(['1m', '5m'], PriceHistory(100))
+    closed = []
+
+    async def on_bar(bar):
+        closed.append(bar)
+
+    aggregator.add_callback("test", on_bar)
+    for ts, price, volume in [(T0, 100, 1000), (T0 + 10, 103, 1010), (T0 + 30, 99, 1030), (T0 + 59, 101, 1050)]:
+        await aggregator.process_tick(_tick(ts, price, volume))
+    assert closed == []
+
+    await aggregator.process_tick(_tick(T0 + 61, 102, 1060))
+    assert len(closed) == 1
+    bar = closed[0]
+    assert (bar.timeframe, bar.start) == ('1m', T0)
+    assert (bar.open, bar.high, bar.low, bar.close, bar.volume) == (100, 103, 99, 101, 50)
+    assert aggregator.current_bar('SBIN-EQ', '5m').high == 103
+
+@pytest.mark.asyncio
+async def test_flush_closes_idle_bars():
+    aggregator = BarAggregator(['1s', '1m'], PriceHistory(100))
+    await aggregator.process_tick(_tick(T0 + 0.2, 100))
+    await aggregator.flush(now=T0 + 5)
+
+    assert len(aggregator.get_bars('SBIN-EQ', '1s')) == 1
+    assert len(aggregator.get_bars('SBIN-EQ', '1m')) == 0
+
+@pytest.mark.asyncio
+async def test_ring_buffer_is_bounded():
+    aggregator = BarAggregator(['1s'], PriceHistory(10))
+    for i in range(25):
+        await aggregator.process_tick(_tick(T0 + i, 100 + i))
+
+    bars = aggregator.get_bars('SBIN-EQ', '1s')
+    assert len(bars) == 10
+    assert bars.close[-1] == 123
+    assert bars.bar_index == 24
+
+@pytest.mark.asyncio
+async def test_backfill_replaces_partial_minute():
+    aggregator = BarAggregator(['1m', '5m'], PriceHistory(100))
+    await aggregator.process_tick(_tick(T0 + 5, 100))
+    # Feed dropped; the next tick arrives three minutes later
+    await aggregator.process_tick(_tick(T0 + 185, 104))
+
+    candles = [
+        {'timestamp': T0 + 60 * i, 'open': 100 + i, 'high': 106 + i, 'low': 98 + i, 'close': 101 + i, 'volume': 10}
+        for i in range(3)
+    ]
+    await aggregator.add_backfill('SBIN-EQ', candles)
+
+    minute_bars = aggregator.get_bars('SBIN-EQ', '1m')
+    assert minute_bars.timestamp.tolist() == [T0, T0 + 60, T0 + 120]
+    assert minute_bars.high[0] == 106
+    assert aggregator.current_bar('SBIN-EQ', '5m').high == 108
+
+@pytest.mark.asyncio
+async def test_backfill_lands_after_live_bars_have_closed():
+    aggregator = BarAggregator(['1m', '5m'], PriceHistory(100))
+    await aggregator.process_tick(_tick(T0 + 5, 100))
+    # Reconnected at minute 4; live bars close for minutes 4 and 5 before the backfill arrives
+    await aggregator.process_tick(_tick(T0 + 245, 104))
+    await aggregator.process_tick(_tick(T0 + 305, 105))
+    await aggregator.process_tick(_tick(T0 + 365, 106))
+
+    candles = [
+        {'timestamp': T0 + 60 * i, 'open': 100 + i, 'high': 106 + i, 'low': 98 + i, 'close': 101 + i, 'volume': 10}
+        for i in range(4)
+    ]
+    await aggregator.add_backfill('SBIN-EQ', candles)
+
+    minute_bars = aggregator.get_bars('SBIN-EQ', '1m')
+    assert minute_bars.timestamp.tolist() == [T0 + 60 * i for i in range(6)]
+    assert minute_bars.close.tolist() == [101, 102, 103, 104, 104, 105]
+    five_minute_bars = aggregator.get_bars('SBIN-EQ', '5m')
+    assert five_minute_bars.timestamp.tolist() == [T0]
+    assert five_minute_bars.high[0] == 109
+
+def test_insert_keeps_timestamp_order_when_full():
+    history = PriceHistory(4)
+    for i in (0, 1, 3, 4):
+        history.append('SBIN-EQ', '1m', T0 + 60 * i, i, i, i, i, 1)
+    series = history.series('SBIN-EQ', '1m')
+
+    assert series.insert((T0 + 120, 2, 2, 2, 2, 1))
+    assert history.window('SBIN-EQ', '1m', 4).close.tolist() == [1, 2, 3, 4]
+    assert series.count == 5
+    assert not series.insert((T0 - 60, 9, 9, 9, 9, 1))
+    assert history.window('SBIN-EQ', '1m', 4).close.tolist() == [1, 2, 3, 4]
+
+def test_history_window_is_a_view_across_wraparound():
+    history = PriceHistory(4)
+    for i in range(10):
+        history.append('SBIN-EQ', '1m', T0 + 60 * i, i, i, i, i, 1)
+
+    window = history.window('SBIN-EQ', '1m', 3)
+    assert window.close.tolist() == [7, 8, 9]
+    assert window.close.base is not None
+    assert not window.close.flags.writeable
+    assert len(history.window('SBIN-EQ', '1m', 50)) == 4
+    assert len(history.window('OTHER', '1m', 5)) == 0
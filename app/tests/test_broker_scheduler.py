@@ -0,0 +1,77 @@
+# app/tests/test_broker_scheduler.py
+import asyncio
+import time
+import pytest
+from app.core.broker_scheduler import BrokerScheduler
+
+@pytest.mark.asyncio
+async def test_higher_priority_endpoints_are_admitted_first():
+    scheduler = BrokerScheduler(max_concurrency=1, headroom=1.0)
+    admitted = []
+
+    async def call(endpoint):
+        async with scheduler.slot(endpoint):
+            admitted.append(endpoint)
+            await asyncio.sleep(0.01)
+
+    # The first call holds the only slot while the rest queue up
+    tasks = [asyncio.create_task(call('ltp'))]
+    await asyncio.sleep(0)
+    for endpoint in ('positions', 'orders', 'ltp', 'place_order', 'cancel_order'):
+        tasks.append(asyncio.create_task(call(endpoint)))
+    await asyncio.gather(*tasks)
+
+    assert admitted == ['ltp', 'cancel_order', 'place_order', 'ltp', 'positions', 'orders']
+
+@pytest.mark.asyncio
+async def test_endpoint_is_paced_by_its_bucket():
+    scheduler = BrokerScheduler(limits={'candles': (3, 10)}, max_concurrency=8, headroom=1.0)
+
+    async def call():
+        async with scheduler.slot('candles'):
+            return time.monotonic()
+
+    start = time.monotonic()
+    # A burst of 10 drains the bucket, then calls are spaced 0.1s apart
+    times = await asyncio.gather(*(call() for _ in range(14)))
+    assert max(times) - start >= 0.35
+    assert scheduler.active == 0
+
+@pytest.mark.asyncio
+async def test_throttled_endpoint_does_not_block_others():
+    scheduler = BrokerScheduler(max_concurrency=4, headroom=1.0)
+
+    async def call(endpoint):
+        async with scheduler.slot(endpoint):
+            return time.monotonic()
+
+    await call('positions')  # uses the only polling token for a second
+    start = time.monotonic()
+    polling = asyncio.create_task(call('positions'))
+    await asyncio.sleep(0)
+    assert await call('place_order') - start < 0.1
+    assert not polling.done()
+    polling.cancel()
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_releases_nothing():
+    scheduler = BrokerScheduler(max_concurrency=1, headroom=1.0)
+    release = asyncio.Event()
+
+    async def hold():
+        async with scheduler.slot('ltp'):
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(scheduler.acquire('place_order'))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    release.set()
+    await holder
+    assert scheduler.active == 0
+    async with scheduler.slot('cancel_order'):
+        assert scheduler.active == 1
@@ -0,0 +1,121 @@
+import asyncio
+import time
+import pytest
+from app.config import settings
+from app.core.angel_client import AngelOneClient
+from app.core.feed_manager import FeedManager, FeedConnection
+
+@pytest.fixture
+def offline_connections(monkeypatch):
+    async def start(self):
+        self.is_connected = True
+
+    monkeypatch.setattr(FeedConnection, "start", start)
+    monkeypatch.setattr(FeedConnection, "subscribe", lambda self, tokens: self.tokens.update(tokens))
+    monkeypatch.setattr(FeedConnection, "stop", lambda self: None)
+
+@pytest.mark.asyncio
+async def test_tokens_are_sharded_under_connection_limit(offline_connections):
+    feed = FeedManager(AngelOneClient(), lambda ws, msg: None, max_connections=3, max_tokens_per_connection=1000)
+    await feed.start()
+    await feed.subscribe({str(t): 1 for t in range(2500)})
+
+    assert sorted(len(c.tokens) for c in feed.connections) == [500, 1000, 1000]
+    assert len(feed.subscribed_tokens) == 2500
+    assert not feed.pending_tokens
+
+@pytest.mark.asyncio
+async def test_dropped_connection_tokens_are_rebalanced(offline_connections):
+    feed = FeedManager(AngelOneClient(), lambda ws, msg: None, max_connections=3, max_tokens_per_connection=1000)
+    await feed.start()
+    await feed.subscribe({str(t): 1 for t in range(2500)})
+
+    lost = next(c for c in feed.connections if len(c.tokens) == 1000)
+    lost.is_connected = False
+    feed.connection_lost(lost)
+    await feed.rebalance()
+
+    assert lost not in feed.connections
+    assert sorted(len(c.tokens) for c in feed.connections) == [500, 1000, 1000]
+    assert len(feed.subscribed_tokens) == 2500
+    await feed.stop()
+
+@pytest.mark.asyncio
+async def test_supervisor_resubscribes_after_failed_attempts(offline_connections, monkeypatch):
+    monkeypatch.setattr(settings, "feed_reconnect_base_delay", 0.001)
+    restored = {}
+
+    async def on_resubscribed(tokens, lost_at):
+        restored.update(lost_at)
+
+    feed = FeedManager(AngelOneClient(), lambda ws, msg: None, max_connections=1,
+                       max_tokens_per_connection=100, on_resubscribed=on_resubscribed)
+    await feed.start()
+    await feed.subscribe({'3045': 1, '2885': 1})
+
+    attempts = []
+    async def flaky_start(self):
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ConnectionError("refused")
+        self.is_connected = True
+    monkeypatch.setattr(FeedConnection, "start", flaky_start)
+
+    before = time.time()
+    conn = feed.connections[0]
+    conn.is_connected = False
+    feed.connection_lost(conn)
+    await feed._supervisor
+
+    assert len(attempts) == 3
+    assert feed.reconnect_attempts == 3
+    assert set(feed.connections[0].tokens) == {'3045', '2885'}
+    assert set(restored) == {'3045', '2885'}
+    assert all(ts >= before for ts in restored.values())
+
+@pytest.mark.asyncio
+async def test_tokens_wait_when_capacity_is_exhausted(offline_connections):
+    feed = FeedManager(AngelOneClient(), lambda ws, msg: None, max_connections=2, max_tokens_per_connection=10)
+    await feed.start()
+    await feed.subscribe({str(t): 2 for t in range(25)})
+
+    assert len(feed.connections) == 2
+    assert len(feed.pending_tokens) == 5
+
+def test_stopping_a_connection_does_not_report_it_lost():
+    class Manager:
+        def __init__(self):
+            self.scheduled = []
+
+        def call_soon(self, callback, *args):
+            self.scheduled.append(callback)
+
+    class Socket:
+        def close_connection(self):
+            conn._on_close(self)
+
+    manager = Manager()
+    conn = FeedConnection(0, manager)
+    conn.websocket = Socket()
+    conn.is_connected = True
+    conn.stop()
+
+    assert not conn.is_connected
+    assert manager.scheduled == []
+
+@pytest.mark.asyncio
+async def test_close_after_stop_starts_no_supervisor(offline_connections):
+    feed = FeedManager(AngelOneClient(), lambda ws, msg: None, max_connections=1, max_tokens_per_connection=10)
+    await feed.start()
+    await feed.subscribe({str(t): 1 for t in range(15)})
+    conn = feed.connections[0]
+    assert feed.pending_tokens
+
+    await feed.stop()
+    assert not feed.pending_tokens and not feed.lost_at
+    # The socket thread reports the close after the manager has stopped
+    conn._on_close(None)
+    await asyncio.sleep(0)
+
+    assert feed._supervisor is None
+    assert not feed.pending_tokens
@@ -0,0 +1,58 @@
+import pytest
+from app.core.bar_aggregator import Bar
+from app.core.indicator_cache import IndicatorCache
+from app.core.price_history import PriceHistory
+from app.strategies.sma_crossover import SMAStrategy
+
+def _counting(value):
+    calls = []
+    def compute():
+        calls.append(1)
+        return value
+    return compute, calls
+
+@pytest.mark.asyncio
+async def test_strategies_share_indicator_values():
+    history = PriceHistory(100)
+    for i in range(30):
+        history.append('TEST-EQ', '1m', 60 * i, 100, 100, 100, 100 + i % 3, 10)
+    cache = IndicatorCache()
+    first = SMAStrategy({'short_period': 5, 'long_period': 20, 'symbol': 'TEST-EQ'}, history, cache)
+    second = SMAStrategy({'short_period': 5, 'long_period': 10, 'symbol': 'TEST-EQ'}, history, cache)
+    window = history.window('TEST-EQ', '1m', 21)
+
+    a = await first.calculate_indicators(window)
+    misses = len(cache)
+    b = await second.calculate_indicators(window)
+
+    assert a['sma_short'] == b['sma_short']
+    # SMA(5) now and one bar back were reused, only SMA(10) was new
+    assert len(cache) == misses + 2
+
+def test_lru_eviction_respects_memory_bound():
+    cache = IndicatorCache(max_bytes=2000)
+    for bar in range(20):
+        cache.get_or_compute('TEST-EQ', '1m', 'sma', (20,), bar, lambda: 1.0)
+    assert cache.nbytes <= 2000
+    assert 0 < len(cache) < 20
+
+    compute, calls = _counting(1.0)
+    cache.get_or_compute('TEST-EQ', '1m', 'sma', (20,), 19, compute)
+    cache.get_or_compute('TEST-EQ', '1m', 'sma', (20,), 0, compute)
+    assert len(calls) == 1  # newest kept, oldest evicted
+
+@pytest.mark.asyncio
+async def test_bar_close_and_backfill_invalidate():
+    cache = IndicatorCache()
+    for bar in (8, 9, 10):
+        cache.get_or_compute('TEST-EQ', '1m', 'rsi', (14,), bar, lambda: 50.0)
+    cache.get_or_compute('TEST-EQ', '5m', 'rsi', (14,), 3, lambda: 50.0)
+
+    await cache.on_bar_closed(Bar('TEST-EQ', '1m', 600, 60, 100.0))
+    compute, calls = _counting(50.0)
+    cache.get_or_compute('TEST-EQ', '1m', 'rsi', (14,), 10, compute)
+    cache.get_or_compute('TEST-EQ', '1m', 'rsi', (14,), 9, compute)
+    assert len(calls) == 1  # the latest bar survives the close, older ones do not
+
+    await cache.on_backfill('TEST-EQ', [])
+    assert len(cache) == 0 and cache.nbytes == 0
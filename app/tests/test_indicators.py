@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+from app.utils.indicators import (
+    calculate_sma, calculate_ema, calculate_rsi, calculate_wilder_rsi, calculate_bollinger_bands, calculate_macd,
+    batch_sma, batch_ema, batch_rsi, batch_bollinger_bands, batch_macd,
+    SMA, EMA, RSI, BollingerBands, MACD
+)
+
+@pytest.fixture
+def prices():
+    return pd.Series(np.random.default_rng(3).normal(0, 1, 500).cumsum() + 1000)
+
+def _stream(indicator, prices):
+    return [indicator.update(x) for x in prices]
+
+def test_streaming_sma_and_ema_match_vectorised(prices):
+    sma = _stream(SMA(20), prices)
+    assert sma[18] is None
+    np.testing.assert_allclose(sma[19:], calculate_sma(prices, 20).values[19:], rtol=1e-9)
+    np.testing.assert_allclose(_stream(EMA(20), prices), calculate_ema(prices, 20).values, rtol=1e-9)
+
+def test_streaming_wilder_rsi_matches_vectorised(prices):
+    rsi = _stream(RSI(14), prices)
+    expected = calculate_wilder_rsi(prices, 14).values
+    assert rsi[13] is None
+    np.testing.assert_allclose(rsi[14:], expected[14:], rtol=1e-9)
+
+def test_streaming_bollinger_matches_vectorised(prices):
+    bands = _stream(BollingerBands(20, 2.0), prices)
+    expected = calculate_bollinger_bands(prices, 20, 2.0)
+    for key in ('upper', 'middle', 'lower'):
+        np.testing.assert_allclose([b[key] for b in bands[19:]], expected[key].values[19:], rtol=1e-9)
+
+def test_streaming_macd_matches_vectorised(prices):
+    values = _stream(MACD(), prices)
+    expected = calculate_macd(prices)
+    for key in ('macd', 'signal', 'histogram'):
+        np.testing.assert_allclose([v[key] for v in values], expected[key].values, rtol=1e-9, atol=1e-9)
+
+def test_batch_kernels_match_per_series_functions():
+    matrix = np.random.default_rng(5).normal(0, 1, (6, 120)).cumsum(axis=1) + 500
+    matrix[2, 40:60] = matrix[2, 39]  # flat stretch: RSI with no losses
+    expected_rows = [pd.Series(row) for row in matrix]
+
+    np.testing.assert_allclose(batch_sma(matrix, 20), [calculate_sma(s, 20) for s in expected_rows], rtol=1e-9)
+    np.testing.assert_allclose(batch_ema(matrix, 20), [calculate_ema(s, 20) for s in expected_rows], rtol=1e-9)
+    np.testing.assert_allclose(batch_rsi(matrix, 14), [calculate_rsi(s, 14) for s in expected_rows], rtol=1e-7)
+    np.testing.assert_allclose(
+        batch_rsi(matrix, 14, wilder=True), [calculate_wilder_rsi(s, 14) for s in expected_rows], rtol=1e-9
+    )
+
+    bands = batch_bollinger_bands(matrix, 20, 2.0)
+    macd = batch_macd(matrix)
+    for i, series in enumerate(expected_rows):
+        expected_bands = calculate_bollinger_bands(series, 20, 2.0)
+        expected_macd = calculate_macd(series)
+        for key in ('upper', 'middle', 'lower'):
+            np.testing.assert_allclose(bands[key][i], expected_bands[key], rtol=1e-9)
+        for key in ('macd', 'signal', 'histogram'):
+            np.testing.assert_allclose(macd[key][i], expected_macd[key], rtol=1e-9, atol=1e-9)
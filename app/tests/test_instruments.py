@@ -0,0 +1,74 @@
+import time
+from datetime import date, datetime
+import pytest
+from app.core.instruments import InstrumentMaster, IST
+from app.mock.smartapi import MockSmartAPI
+
+ROWS = [
+    {'token': '3045', 'symbol': 'SBIN-EQ', 'name': 'SBIN', 'expiry': '', 'strike': '-1.000000',
+     'instrumenttype': '', 'exch_seg': 'NSE'},
+    {'token': '500112', 'symbol': 'SBIN', 'name': 'SBIN', 'expiry': '', 'strike': '-1.000000',
+     'instrumenttype': '', 'exch_seg': 'BSE'},
+    {'token': '35001', 'symbol': 'NIFTY30JAN25FUT', 'name': 'NIFTY', 'expiry': '30JAN2025', 'strike': '-1.000000',
+     'instrumenttype': 'FUTIDX', 'exch_seg': 'NFO'},
+    {'token': '43210', 'symbol': 'NIFTY30JAN2524000CE', 'name': 'NIFTY', 'expiry': '30JAN2025',
+     'strike': '2400000.000000', 'instrumenttype': 'OPTIDX', 'exch_seg': 'NFO'},
+    {'token': '43211', 'symbol': 'NIFTY30JAN2524000PE', 'name': 'NIFTY', 'expiry': '30JAN2025',
+     'strike': '2400000.000000', 'instrumenttype': 'OPTIDX', 'exch_seg': 'NFO'},
+]
+
+def test_indexes_resolve_symbols_tokens_and_contracts(tmp_path):
+    master = InstrumentMaster(snapshot_path=tmp_path / "instruments.pkl")
+    master.build(ROWS, date(2025, 1, 20))
+
+    assert master.token('SBIN-EQ') == '3045' and master.token('SBIN', 'BSE') == '500112'
+    assert master.symbol('43210', 'NFO') == 'NIFTY30JAN2524000CE'
+    assert master.derivative_token('NIFTY', date(2025, 1, 30), 24000.0, 'PE') == '43211'
+    assert master.derivative_token('NIFTY', date(2025, 1, 30), 0.0, 'FUT') == '35001'
+    assert master.token('UNKNOWN-EQ') is None and master.token('SBIN-EQ', 'MCX') is None
+
+@pytest.mark.asyncio
+async def test_current_snapshot_skips_the_download(tmp_path, monkeypatch):
+    path = tmp_path / "instruments.pkl"
+    master = InstrumentMaster(snapshot_path=path)
+    monkeypatch.setattr(master, "_download", lambda: ROWS)
+    assert await master.load()
+    assert path.exists()
+
+    restarted = InstrumentMaster(snapshot_path=path)
+    def no_download():
+        raise AssertionError("snapshot is current")
+    monkeypatch.setattr(restarted, "_download", no_download)
+    start = time.perf_counter()
+    assert await restarted.load()
+    assert time.perf_counter() - start < 0.5
+    assert restarted.derivative_token('NIFTY', date(2025, 1, 30), 24000.0, 'CE') == '43210'
+
+@pytest.mark.asyncio
+async def test_stale_snapshot_is_replaced_and_kept_if_download_fails(tmp_path, monkeypatch):
+    path = tmp_path / "instruments.pkl"
+    stale = InstrumentMaster(snapshot_path=path)
+    stale.build(ROWS[:1], date(2025, 1, 1))
+    stale.save_snapshot()
+
+    master = InstrumentMaster(snapshot_path=path)
+    def offline():
+        raise ConnectionError("offline")
+    monkeypatch.setattr(master, "_download", offline)
+    assert await master.load()
+    assert master.token('SBIN-EQ') == '3045' and master.trading_day == date(2025, 1, 1)
+
+    monkeypatch.setattr(master, "_download", lambda: ROWS)
+    assert await master.load()
+    assert master.trading_day == datetime.now(IST).date() and master.token('SBIN', 'BSE') == '500112'
+
+@pytest.mark.asyncio
+async def test_loads_the_mock_scrip_master(tmp_path):
+    with MockSmartAPI().running() as url:
+        master = InstrumentMaster(snapshot_path=tmp_path / "instruments.pkl",
+                                  url=f"{url}/OpenAPI_File/files/OpenAPIScripMaster.json")
+        assert await master.load()
+
+    assert master.token('RELIANCE-EQ') == '2885'
+    expiry = next(iter(master.derivatives['NFO']))[1]
+    assert master.derivative_token('NIFTY', expiry, 24000.0, 'CE') is not None
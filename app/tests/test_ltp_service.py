@@ -0,0 +1,70 @@
+import asyncio
+import pytest
+from app.core.ltp_service import LTPService
+
+class QuoteClient:
+    def __init__(self, delay=0.01):
+        self.delay = delay
+        self.requests = []
+
+    async def _get_symbol_token(self, symbol, exchange):
+        return symbol.split('-')[0][3:] if symbol.startswith('SYM') else None
+
+    async def get_market_data(self, mode, exchange_tokens):
+        self.requests.append(exchange_tokens)
+        await asyncio.sleep(self.delay)
+        return [
+            {'exchange': exchange, 'tradingSymbol': token, 'symbolToken': token, 'ltp': 100.0 + int(token)}
+            for exchange, tokens in exchange_tokens.items() for token in tokens if token != '99'
+        ]
+
+@pytest.mark.asyncio
+async def test_burst_of_misses_is_one_bulk_request():
+    client = QuoteClient()
+    service = LTPService(client, batch_window=0.005)
+
+    prices = await service.get_ltps([(f"SYM{i}-EQ", 'NSE') for i in range(30)])
+
+    assert len(client.requests) == 1 and len(client.requests[0]['NSE']) == 30
+    assert prices['SYM7-EQ'] == 107.0
+
+@pytest.mark.asyncio
+async def test_batches_are_capped_and_concurrent_lookups_share_a_request():
+    client = QuoteClient()
+    service = LTPService(client, batch_size=50, batch_window=0.005)
+
+    symbols = [(f"SYM{i}-EQ", 'NSE') for i in range(120)]
+    prices, again = await asyncio.gather(service.get_ltps(symbols), service.get_ltps(symbols[:10]))
+
+    assert sorted(len(r['NSE']) for r in client.requests) == [20, 50, 50]
+    assert again == {s: prices[s] for s, _ in symbols[:10]}
+
+@pytest.mark.asyncio
+async def test_fresh_ticks_and_fetched_prices_skip_the_request():
+    client = QuoteClient()
+    service = LTPService(client, max_age=1.0, batch_window=0.001)
+
+    await service.on_tick({'symbol': 'SYM1-EQ', 'ltp': 555.0})
+    assert await service.get_ltp('SYM1-EQ') == 555.0
+    assert await service.get_ltp('SYM2-EQ') == 102.0
+    assert await service.get_ltp('SYM2-EQ') == 102.0
+    assert len(client.requests) == 1
+
+    service.max_age = 0.0
+    await asyncio.sleep(0.001)
+    assert await service.get_ltp('SYM1-EQ') == 101.0
+    assert len(client.requests) == 2
+
+@pytest.mark.asyncio
+async def test_unfetched_symbol_and_cancelled_caller():
+    client = QuoteClient(delay=0.02)
+    service = LTPService(client, batch_window=0.001)
+
+    first = asyncio.create_task(service.get_ltp('SYM5-EQ'))
+    second = asyncio.create_task(service.get_ltp('SYM5-EQ'))
+    await asyncio.sleep(0.005)
+    first.cancel()
+
+    assert await second == 105.0
+    assert await service.get_ltp('SYM99-EQ') is None
+    assert await service.get_ltp('UNKNOWN-EQ') is None
@@ -0,0 +1,66 @@
+import asyncio
+import json
+import pytest
+import websockets
+from SmartApi import SmartConnect
+from app.core.tick_decoder import TickDecoder
+from app.mock.smartapi import MockSmartAPI
+
+def _login(url):
+    api = SmartConnect(api_key="key", root=url)
+    session = api.generateSession("MOCK1", "pin", "123456")
+    return api, session
+
+def test_order_path_round_trip():
+    mock = MockSmartAPI(seed=1)
+    with mock.running() as url:
+        api, session = _login(url)
+        assert session['status'] and session['data']['clientcode'] == "MOCK1"
+
+        ltp = api.ltpData("NSE", "SBIN-EQ", "3045")['data']['ltp']
+        quotes = api.getMarketData("LTP", {"NSE": ["3045", "2885"]})['data']['fetched']
+        assert [q['symbolToken'] for q in quotes] == ["3045", "2885"]
+        order = {'variety': 'NORMAL', 'tradingsymbol': 'SBIN-EQ', 'symboltoken': '3045', 'transactiontype': 'BUY',
+                 'exchange': 'NSE', 'ordertype': 'MARKET', 'producttype': 'INTRADAY', 'duration': 'DAY',
+                 'price': '0', 'quantity': '5'}
+        filled = api.placeOrder(order)
+        resting = api.placeOrder({**order, 'ordertype': 'LIMIT', 'price': str(round(ltp * 0.5, 2))})
+
+        assert api.cancelOrder(resting, "NORMAL")['status']
+        book = {o['orderid']: o for o in api.orderBook()['data']}
+        assert book[filled]['status'] == 'complete' and book[resting]['status'] == 'cancelled'
+        position = api.position()['data'][0]
+        assert position['netqty'] == '5' and position['symboltoken'] == '3045'
+
+def test_secure_routes_need_a_session_and_inject_errors():
+    mock = MockSmartAPI(error_rate=1.0, seed=1)
+    with mock.running() as url:
+        assert SmartConnect(api_key="key", root=url).ltpData("NSE", "SBIN-EQ", "3045")['errorcode'] == "AG8001"
+        api = SmartConnect(api_key="key", root=url)
+        api.setAccessToken(api._postRequest("api.login", {"clientcode": "MOCK1"})['data']['jwtToken'])
+        assert api.ltpData("NSE", "SBIN-EQ", "3045")['errorcode'] == "AB1004"
+        assert mock.stats['errors_injected'] == 1
+
+@pytest.mark.asyncio
+async def test_feed_streams_subscribed_tokens_as_binary_ticks():
+    mock = MockSmartAPI(tick_rate=500, seed=1)
+    with mock.running() as url:
+        tokens = (await asyncio.to_thread(_login, url))[1]['data']
+        headers = {'Authorization': tokens['jwtToken'], 'x-api-key': 'key', 'x-client-code': 'MOCK1',
+                   'x-feed-token': tokens['feedToken']}
+        frames = []
+        async with websockets.connect(url.replace("http", "ws") + "/smart-stream", additional_headers=headers) as ws:
+            await ws.send(json.dumps({'action': 1, 'params': {'mode': 2, 'tokenList': [
+                {'exchangeType': 1, 'tokens': ['3045', '2885']}]}}))
+            await ws.send("ping")
+            while len(frames) < 50:
+                message = await asyncio.wait_for(ws.recv(), timeout=5)
+                if isinstance(message, bytes):
+                    frames.append(message)
+                else:
+                    assert message == "pong"
+
+    ticks = TickDecoder().decode_many(frames)
+    assert {t['token'] for t in ticks} == {'3045', '2885'}
+    assert all(t['subscription_mode'] == 2 and t['volume'] > 0 for t in ticks)
+    assert [t['sequence_number'] for t in ticks] == sorted(t['sequence_number'] for t in ticks)
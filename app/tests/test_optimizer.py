@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+from app.backtest.data import history_from_arrays
+from app.backtest.engine import Backtester
+from app.backtest.optimizer import Optimizer, grid, random_search
+from app.strategies.sma_crossover import SMAStrategy
+
+def _bars(count=3000):
+    close = np.random.default_rng(4).normal(0, 0.5, count).cumsum() + 500
+    return history_from_arrays(np.arange(count) * 60.0, close, close, close, close)
+
+def test_random_search_respects_bounds():
+    combos = list(random_search({'rsi_period': (5, 30), 'oversold_level': (20.0, 35.0), 'quantity': [1, 2]}, 50, seed=1))
+    assert len(combos) == 50
+    assert all(isinstance(c['rsi_period'], int) and 5 <= c['rsi_period'] <= 30 for c in combos)
+    assert all(20.0 <= c['oversold_level'] <= 35.0 and c['quantity'] in (1, 2) for c in combos)
+
+def test_parallel_sweep_matches_serial_and_is_ranked():
+    data = _bars()
+    space = {'short_period': [5, 10, 20], 'long_period': [10, 30, 60]}
+    optimizer = Optimizer(SMAStrategy, {'quantity': 10}, metric='total_return', workers=2, chunksize=2)
+
+    streamed = list(optimizer.stream(data, grid(space), constraint=lambda p: p['short_period'] < p['long_period']))
+    ranked = optimizer.leaderboard
+
+    assert len(streamed) == len(ranked) == 7
+    scores = [r.score for r in ranked]
+    assert scores == sorted(scores, reverse=True)
+    best = ranked[0]
+    expected = Backtester().run(SMAStrategy({'quantity': 10, **best.params}), data).stats
+    assert best.stats == pytest.approx(expected)
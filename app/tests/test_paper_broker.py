@@ -0,0 +1,123 @@
+import asyncio
+import pytest
+from app.core.paper_broker import PaperBroker
+
+class LiveClient:
+    auth_token = "token"
+
+    async def get_ltp(self, symbol, exchange):
+        return 500.0
+
+def _broker(**kwargs):
+    return PaperBroker(LiveClient(), **{'slippage_bps': 10, 'latency_ms': 0, 'fill_ratio': 1.0, **kwargs})
+
+def _order(side='BUY', quantity=10, order_type='MARKET', price=0.0):
+    return {'symbol': 'SBIN-EQ', 'exchange': 'NSE', 'transaction_type': side, 'order_type': order_type,
+            'quantity': quantity, 'price': price}
+
+@pytest.mark.asyncio
+async def test_market_order_fills_with_slippage_after_latency():
+    broker = _broker(latency_ms=20)
+    await broker.on_tick({'symbol': 'SBIN-EQ', 'ltp': 100.0})
+
+    result = await broker.place_order(_order())
+    order_id = result['data']['orderid']
+    await broker.on_tick({'symbol': 'SBIN-EQ', 'ltp': 100.0})
+    assert broker.orders[order_id]['filledshares'] == 0
+
+    await asyncio.sleep(0.05)
+    order = broker.orders[order_id]
+    assert order['status'] == 'complete'
+    assert order['averageprice'] == pytest.approx(100.1)
+    positions = await broker.get_positions()
+    assert positions[0]['netqty'] == 10 and positions[0]['buyavgprice'] == pytest.approx(100.1)
+
+@pytest.mark.asyncio
+async def test_market_order_takes_the_quote_when_the_tick_has_depth():
+    broker = _broker()
+    result = await broker.place_order(_order(side='SELL'))
+    await asyncio.sleep(0.01)
+    await broker.on_tick({'symbol': 'SBIN-EQ', 'ltp': 100.0, 'best_5_buy': [{'price': 99.95, 'quantity': 100}]})
+
+    assert broker.orders[result['data']['orderid']]['averageprice'] == 99.95
+
+@pytest.mark.asyncio
+async def test_limit_order_waits_for_price_and_fills_partially():
+    broker = _broker(fill_ratio=0.4)
+    updates = []
+
+    async def listener(order_id, status, filled_qty, avg_price):
+        updates.append((status, filled_qty))
+
+    broker.add_order_listener("test", listener)
+    order_id = (await broker.place_order(_order(order_type='LIMIT', price=99.0)))['data']['orderid']
+    await asyncio.sleep(0.01)
+
+    for ltp in (100.0, 98.5, 99.0, 98.0, 97.0):
+        await broker.on_tick({'symbol': 'SBIN-EQ', 'ltp': ltp})
+
+    assert updates == [('OPEN', 4), ('OPEN', 8), ('COMPLETE', 10)]
+    assert broker.orders[order_id]['averageprice'] == 99.0
+    assert (await broker.cancel_order(order_id))['status'] is False
+
+@pytest.mark.asyncio
+async def test_cancel_keeps_the_filled_part():
+    broker = _broker(fill_ratio=0.5)
+    order_id = (await broker.place_order(_order(order_type='LIMIT', price=99.0)))['data']['orderid']
+    await asyncio.sleep(0.01)
+    await broker.on_tick({'symbol': 'SBIN-EQ', 'ltp': 98.0})
+
+    assert (await broker.cancel_order(order_id))['status'] is True
+    await broker.on_tick({'symbol': 'SBIN-EQ', 'ltp': 98.0})
+    order = (await broker.get_orders())[0]
+    assert order['status'] == 'cancelled' and order['filledshares'] == 5
+
+@pytest.mark.asyncio
+async def test_positions_realise_pnl_through_reversal():
+    broker = _broker(slippage_bps=0)
+    await broker.on_tick({'symbol': 'SBIN-EQ', 'ltp': 100.0})
+    await broker.place_order(_order(quantity=10))
+    await asyncio.sleep(0.01)
+    await broker.on_tick({'symbol': 'SBIN-EQ', 'ltp': 110.0})
+    await broker.place_order(_order(side='SELL', quantity=15))
+    await asyncio.sleep(0.01)
+    await broker.on_tick({'symbol': 'SBIN-EQ', 'ltp': 105.0})
+
+    position = (await broker.get_positions())[0]
+    assert position['netqty'] == -5 and position['netprice'] == 110.0
+    assert position['realised'] == pytest.approx(100.0)
+    assert position['unrealised'] == pytest.approx(25.0)
+
+@pytest.mark.asyncio
+async def test_ltp_and_auth_come_from_the_live_client_until_ticks_arrive():
+    broker = _broker()
+    assert broker.auth_token == "token"
+    assert await broker.get_ltp('SBIN-EQ', 'NSE') == 500.0
+    await broker.on_tick({'symbol': 'SBIN-EQ', 'ltp': 101.0})
+    assert await broker.get_ltp('SBIN-EQ', 'NSE') == 101.0
+
+@pytest.mark.asyncio
+async def test_strategy_fills_reach_the_shared_risk_state():
+    from app.core.order_manager import OrderManager
+    from app.core.risk_manager import RiskManager
+    from app.core.strategy_engine import StrategyEngine
+
+    broker = _broker(fill_ratio=0.5)
+    order_manager = OrderManager(broker, RiskManager())
+    broker.add_order_listener("order_manager", order_manager.update_order_status)
+    engine = StrategyEngine(broker, order_manager)
+    await broker.on_tick({'symbol': 'SBIN-EQ', 'ltp': 100.0})
+
+    signal = {'action': 'BUY', 'symbol': 'SBIN-EQ', 'quantity': 10, 'price': 100.0, 'reason': 'test'}
+    await engine._execute_signal(signal, 'test')
+    await asyncio.sleep(0.01)
+    await broker.on_tick({'symbol': 'SBIN-EQ', 'ltp': 100.0})
+    assert order_manager.risk_manager.positions == {'SBIN-EQ': 10}
+    assert not order_manager.pending_orders
+
+    # A partly filled order that is cancelled still books what it filled
+    await engine._execute_signal({**signal, 'action': 'SELL'}, 'test')
+    await asyncio.sleep(0.01)
+    order_id = next(iter(order_manager.pending_orders))
+    await broker.cancel_order(order_id)
+    assert order_manager.risk_manager.positions == {'SBIN-EQ': 5}
@@ -0,0 +1,65 @@
+# app/tests/test_redis_pool.py
+import pytest
+from app.core.redis_pool import RedisPool
+
+class FakeRedis:
+    """In-memory stand-in for redis.asyncio.Redis that counts round trips"""
+
+    def __init__(self):
+        self.data = {}
+        self.round_trips = 0
+
+    async def get(self, key):
+        self.round_trips += 1
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.round_trips += 1
+        self.data[key] = value
+
+    async def mget(self, keys):
+        self.round_trips += 1
+        return [self.data.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    def set(self, key, value, ex=None):
+        self.commands.append((key, value))
+
+    async def execute(self):
+        self.redis.round_trips += 1
+        self.redis.data.update(self.commands)
+
+@pytest.mark.asyncio
+async def test_many_keys_share_one_round_trip():
+    pool = RedisPool()
+    pool._client = fake = FakeRedis()
+
+    await pool.set_many({f'ltp:{i}': {'ltp': 100 + i} for i in range(50)}, ttl=5)
+    values = await pool.get_many([f'ltp:{i}' for i in range(50)] + ['ltp:missing'])
+
+    assert fake.round_trips == 2
+    assert values['ltp:7'] == {'ltp': 107}
+    assert values['ltp:missing'] is None
+
+@pytest.mark.asyncio
+async def test_json_round_trip():
+    pool = RedisPool()
+    pool._client = FakeRedis()
+
+    await pool.set_json('risk:daily_pnl', {'pnl': -125.5, 'orders': 3})
+    assert await pool.get_json('risk:daily_pnl') == {'pnl': -125.5, 'orders': 3}
+    assert await pool.get_json('nothing') is None
+    assert await pool.get_many([]) == {}
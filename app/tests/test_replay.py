@@ -0,0 +1,69 @@
+import pytest
+from app.backtest.replay import ReplaySession, TickRecorder, load_ticks
+from app.strategies.base_strategy import BaseStrategy
+
+class EveryTenthTick(BaseStrategy):
+    def __init__(self):
+        super().__init__("EVERY_TENTH", {'symbol': 'TEST-EQ'})
+        self.seen = 0
+
+    async def generate_signal(self, market_data):
+        self.seen += 1
+        if self.seen % 10 == 0:
+            return {'action': 'BUY', 'symbol': 'TEST-EQ', 'quantity': 1, 'price': market_data['ltp'], 'reason': 'test'}
+        return None
+
+    async def calculate_indicators(self, data):
+        return {}
+
+def _ticks(count, step_ms=1000):
+    return [
+        {'token': '99926000', 'symbol': 'TEST-EQ', 'exchange_timestamp': 1722151800000 + step_ms * i, 'ltp': 100.0 + i % 7}
+        for i in range(count)
+    ]
+
+@pytest.mark.asyncio
+async def test_replay_drives_strategies_to_the_broker():
+    strategy = EveryTenthTick()
+    session = ReplaySession([strategy])
+
+    stats = await session.run(_ticks(1000))
+
+    assert stats['ticks'] == 1000 and strategy.seen == 1000
+    assert stats['orders'] == 100
+    assert session.broker.positions == {'TEST-EQ': 100}
+    # Fills reached the risk manager through the order manager
+    assert session.order_manager.risk_manager.positions == {'TEST-EQ': 100}
+    assert session.order_manager.pending_orders == {}
+    # Filled at the LTP of the tick that produced the signal
+    assert session.broker.orders[0]['averageprice'] == 100.0 + 9 % 7
+    assert stats['latency_ms_p50'] is not None and stats['latency_ms_p50'] < stats['seconds'] * 1000
+    # Bars were built from tick time
+    assert session.bars.history.bar_count('TEST-EQ', '1m') == 17
+
+@pytest.mark.asyncio
+async def test_sessions_do_not_share_history():
+    runs = []
+    for _ in range(2):
+        strategy = EveryTenthTick()
+        session = ReplaySession([strategy])
+        await session.run(_ticks(200))
+        runs.append(session.history.window('TEST-EQ', '1m', 100).timestamp.tolist())
+        assert strategy.history is session.history
+
+    assert runs[0] == runs[1] and len(runs[0]) == 4
+
+@pytest.mark.asyncio
+async def test_replay_paces_by_exchange_time():
+    session = ReplaySession([EveryTenthTick()])
+    stats = await session.run(_ticks(5, step_ms=1000), speed=10)
+    assert stats['seconds'] >= 0.4
+
+@pytest.mark.asyncio
+async def test_recorded_ticks_round_trip(tmp_path):
+    path = tmp_path / "ticks.jsonl"
+    recorder = TickRecorder(path)
+    for tick in _ticks(3):
+        await recorder(tick)
+    recorder.close()
+    assert load_ticks(path) == _ticks(3)
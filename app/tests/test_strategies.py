@@ -4,6 +4,7 @@ import numpy as np
 from app.strategies.sma_crossover import SMAStrategy
 from app.strategies.rsi_strategy import RSIStrategy
 from app.strategies.scalping_strategy import ScalpingStrategy
+from app.core.price_history import PriceHistory
 
 @pytest.mark.asyncio
 async def test_sma_crossover():
@@ -44,4 +45,40 @@ async def test_scalping_strategy():
     
     market_data = {'ltp': 100.0}
     signal = await strategy.generate_signal(market_data)
-    assert signal is None  # Not enough data initially
\ No newline at end of file
+    assert signal is None  # Not enough data initially
+
+
+def _history(closes, timeframe='1m'):
+    history = PriceHistory(200)
+    for i, close in enumerate(closes):
+        history.append('TEST-EQ', timeframe, 1722151800 + 60 * i, close, close, close, close, 100)
+    return history
+
+@pytest.mark.asyncio
+async def test_sma_crossover_buys_on_bar_history():
+    closes = [100.0] * 10 + [101.0]
+    strategy = SMAStrategy({'short_period': 2, 'long_period': 5, 'symbol': 'TEST-EQ', 'quantity': 1}, _history(closes))
+    strategy.activate()
+
+    signal = await strategy.generate_signal({'ltp': 101.0})
+    assert signal['action'] == 'BUY'
+
+@pytest.mark.asyncio
+async def test_indicators_match_pandas_on_history_views():
+    closes = list(np.random.default_rng(1).normal(0, 1, 60).cumsum() + 100)
+    history = _history(closes)
+    window = history.window('TEST-EQ', '1m', 60)
+    series = pd.Series(closes)
+
+    sma = await SMAStrategy({'short_period': 5, 'long_period': 20, 'symbol': 'TEST-EQ'}, history).calculate_indicators(window)
+    assert sma['sma_long'] == pytest.approx(series.rolling(20).mean().iloc[-1])
+    assert sma['prev_sma_short'] == pytest.approx(series.rolling(5).mean().iloc[-2])
+
+    rsi = await RSIStrategy({'rsi_period': 14, 'symbol': 'TEST-EQ'}, history).calculate_indicators(window)
+    delta = series.diff()
+    gain = delta.where(delta > 0, 0).rolling(14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
+    assert rsi['rsi'] == pytest.approx((100 - 100 / (1 + gain / loss)).iloc[-1])
+
+    scalping = await ScalpingStrategy({'symbol': 'TEST-EQ'}, history).calculate_indicators(window)
+    assert scalping['momentum'] == pytest.approx(series.pct_change().rolling(5).mean().iloc[-1] * 100)
@@ -0,0 +1,170 @@
+import asyncio
+import time
+import pytest
+from app.core.angel_client import AngelOneClient
+from app.core.strategy_engine import StrategyEngine
+from app.strategies.base_strategy import BaseStrategy
+
+class SleepyStrategy(BaseStrategy):
+    def __init__(self, name: str, delay: float, deadline: float = 1.0, **parameters):
+        super().__init__(name, {'deadline': deadline, 'symbol': 'TEST-EQ', **parameters})
+        self.delay = delay
+
+    async def generate_signal(self, market_data):
+        await asyncio.sleep(self.delay)
+        return {'action': 'BUY', 'symbol': 'TEST-EQ', 'quantity': 1, 'reason': self.name}
+
+    async def calculate_indicators(self, data):
+        return {}
+
+def _engine(*strategies):
+    engine = StrategyEngine(AngelOneClient())
+    executed = []
+
+    async def execute(signal, strategy_name):
+        executed.append(strategy_name)
+
+    engine._execute_signal = execute
+    for strategy in strategies:
+        engine.add_strategy(strategy)
+        strategy.activate()
+    engine.start()
+    return engine, executed
+
+@pytest.mark.asyncio
+async def test_strategies_run_concurrently():
+    engine, executed = _engine(*(SleepyStrategy(f"S{i}", 0.1) for i in range(5)))
+
+    start = time.perf_counter()
+    await engine.process_market_data({'symbol': 'TEST-EQ', 'ltp': 100.0})
+    assert time.perf_counter() - start < 0.3
+    assert sorted(executed) == [f"S{i}" for i in range(5)]
+
+@pytest.mark.asyncio
+async def test_slow_strategy_is_skipped_after_deadline():
+    engine, executed = _engine(SleepyStrategy("fast", 0), SleepyStrategy("slow", 1.0, deadline=0.05))
+
+    start = time.perf_counter()
+    await engine.process_market_data({'symbol': 'TEST-EQ', 'ltp': 100.0})
+    assert time.perf_counter() - start < 0.5
+    assert executed == ["fast"]
+    assert engine.timeouts == {"slow": 1}
+
+class BlockingStrategy(SleepyStrategy):
+    async def generate_signal(self, market_data):
+        # CPU-bound work that never yields to the loop
+        time.sleep(self.delay)
+        return {'action': 'BUY', 'symbol': 'TEST-EQ', 'quantity': 1, 'reason': self.name}
+
+@pytest.mark.asyncio
+async def test_blocking_strategy_signal_is_dropped_after_deadline():
+    engine, executed = _engine(BlockingStrategy("fast", 0), BlockingStrategy("blocking", 0.1, deadline=0.01))
+
+    await engine.process_market_data({'symbol': 'TEST-EQ', 'ltp': 100.0})
+    assert executed == ["fast"]
+    assert engine.timeouts == {"blocking": 1}
+
+@pytest.mark.asyncio
+async def test_ticks_route_only_to_strategies_on_the_symbol():
+    wildcard = SleepyStrategy("all", 0, symbol=None)
+    engine, executed = _engine(SleepyStrategy("sbin", 0), SleepyStrategy("infy", 0, symbol="INFY-EQ"), wildcard)
+
+    await engine.process_market_data({'symbol': 'INFY-EQ', 'ltp': 100.0})
+    assert sorted(executed) == ["all", "infy"]
+
+    engine.remove_strategy("infy")
+    assert engine.strategies_for_tick("INFY-EQ") == [wildcard]
+
+@pytest.mark.asyncio
+async def test_bar_strategies_run_on_bar_close_only():
+    from app.core.bar_aggregator import Bar
+    from app.strategies.sma_crossover import SMAStrategy
+    from app.strategies.scalping_strategy import ScalpingStrategy
+
+    sma = SMAStrategy({'symbol': 'TEST-EQ', 'timeframe': '5m'})
+    assert sma.cadence == 'bar' and ScalpingStrategy({}).cadence == 'tick'
+    engine, executed = _engine(sma)
+    calls = []
+
+    async def generate_signal(market_data):
+        calls.append(market_data)
+        return None
+
+    sma.generate_signal = generate_signal
+    await engine.process_market_data({'symbol': 'TEST-EQ', 'ltp': 100.0})
+    await engine.process_bar(Bar('TEST-EQ', '1m', 600, 60, 100.0))
+    await engine.drain_bars()
+    assert calls == []
+
+    await engine.process_bar(Bar('TEST-EQ', '5m', 600, 300, 101.0))
+    await engine.drain_bars()
+    assert [c['ltp'] for c in calls] == [101.0]
+
+@pytest.mark.asyncio
+async def test_timer_strategies_run_on_their_interval():
+    strategy = SleepyStrategy("timer", 0, cadence='timer', interval=0.02)
+    engine, executed = _engine(strategy)
+
+    await engine.process_market_data({'symbol': 'TEST-EQ', 'ltp': 100.0})
+    assert executed == []
+    await asyncio.sleep(0.1)
+    engine.stop()
+    assert len(executed) >= 2
+
+@pytest.mark.asyncio
+async def test_slow_orders_from_bar_strategies_do_not_delay_ticks():
+    from app.core.bar_aggregator import BarAggregator
+    from app.core.price_history import PriceHistory
+    from app.core.websocket_handler import WebSocketHandler
+    from app.strategies.base_strategy import Cadence
+
+    class SlowBroker:
+        def __init__(self):
+            self.orders = []
+
+        async def place_order(self, order_data):
+            await asyncio.sleep(0.5)
+            self.orders.append(order_data)
+            return {'status': True, 'data': {'orderid': '1'}}
+
+    class BarStrategy(BaseStrategy):
+        default_cadence = Cadence.BAR
+        timeframe = '1m'
+
+        async def generate_signal(self, market_data):
+            return {'action': 'BUY', 'symbol': 'TEST-EQ', 'quantity': 1, 'reason': 'bar'}
+
+        async def calculate_indicators(self, data):
+            return {}
+
+    broker = SlowBroker()
+    engine = StrategyEngine(broker)
+    strategy = BarStrategy("bar", {'symbol': 'TEST-EQ'})
+    engine.add_strategy(strategy)
+    strategy.activate()
+    engine.start()
+    aggregator = BarAggregator(['1m'], PriceHistory(100))
+    aggregator.add_callback("strategies", engine.process_bar)
+
+    handler = WebSocketHandler(AngelOneClient())
+    arrivals = []
+
+    async def probe(tick):
+        arrivals.append(time.perf_counter())
+
+    handler.add_callback("bars", aggregator.process_tick)
+    handler.add_callback("probe", probe)
+    handler._start_dispatcher()
+    # The second tick closes the first minute bar, whose strategy places a slow order
+    for ts in (1722151805, 1722151865, 1722151866):
+        handler.tick_queue.put_threadsafe({'symbol': 'TEST-EQ', 'timestamp': ts, 'ltp': 100.0})
+        await asyncio.sleep(0.01)
+    while len(arrivals) < 3:
+        await asyncio.sleep(0.01)
+
+    assert arrivals[2] - arrivals[1] < 0.1
+    assert broker.orders == []
+    await engine.drain_bars()
+    assert len(broker.orders) == 1
+    await handler.disconnect()
+    engine.stop()
@@ -0,0 +1,80 @@
+import asyncio
+import pytest
+from app.core.angel_client import AngelOneClient
+from app.core.strategy_engine import StrategyEngine, ExecutionMode
+from app.core.strategy_workers import shard_for
+from app.strategies.base_strategy import BaseStrategy
+
+class PidStrategy(BaseStrategy):
+    """Signals on every tick, reporting the process it ran in"""
+
+    def __init__(self, parameters):
+        super().__init__(parameters.get('name', 'PID'), parameters)
+        self.symbol = parameters['symbol']
+
+    async def generate_signal(self, market_data):
+        import os
+        return {'action': 'BUY', 'symbol': self.symbol, 'quantity': 1, 'price': market_data['ltp'], 'pid': os.getpid()}
+
+    async def calculate_indicators(self, data):
+        return {}
+
+def test_shards_are_stable():
+    assert shard_for('SBIN-EQ', 4) == shard_for('SBIN-EQ', 4)
+    assert {shard_for(f"SYM{i}", 4) for i in range(50)} == {0, 1, 2, 3}
+
+@pytest.mark.asyncio
+async def test_process_strategy_signals_return_to_main_loop():
+    import os
+    engine = StrategyEngine(AngelOneClient())
+    received = asyncio.Queue()
+
+    async def execute(signal, strategy_name):
+        await received.put((strategy_name, signal))
+
+    engine._execute_signal = execute
+    strategy = PidStrategy({'name': 'PID', 'symbol': 'TEST-EQ'})
+    strategy.activate()
+    engine.add_strategy(strategy, mode=ExecutionMode.PROCESS)
+    engine.start()
+    try:
+        # Ticks for symbols without process strategies are not forwarded
+        await engine.process_market_data({'symbol': 'OTHER-EQ', 'ltp': 1.0})
+        await engine.process_market_data({'symbol': 'TEST-EQ', 'ltp': 101.0})
+        name, signal = await asyncio.wait_for(received.get(), timeout=30)
+        assert name == 'PID'
+        assert signal['price'] == 101.0
+        assert signal['pid'] != os.getpid()
+        assert received.empty()
+    finally:
+        engine.stop()
+
+def test_same_name_on_another_symbol_is_rejected():
+    engine = StrategyEngine(AngelOneClient())
+    engine.add_strategy(PidStrategy({'symbol': 'SBIN-EQ'}))
+    with pytest.raises(ValueError):
+        engine.add_strategy(PidStrategy({'symbol': 'INFY-EQ'}), mode=ExecutionMode.PROCESS)
+    assert engine.workers is None
+    engine.add_strategy(PidStrategy({'name': 'PID-INFY', 'symbol': 'INFY-EQ'}))
+    assert sorted(engine.strategies) == ['PID', 'PID-INFY']
+
+@pytest.mark.asyncio
+async def test_worker_keeps_the_strategy_name():
+    engine = StrategyEngine(AngelOneClient())
+    received = asyncio.Queue()
+
+    async def execute(signal, strategy_name):
+        await received.put(strategy_name)
+
+    engine._execute_signal = execute
+    strategy = PidStrategy({'symbol': 'TEST-EQ'})
+    strategy.name = 'PID-TEST'
+    strategy.activate()
+    engine.add_strategy(strategy, mode=ExecutionMode.PROCESS)
+    engine.start()
+    try:
+        await engine.process_market_data({'symbol': 'TEST-EQ', 'ltp': 101.0})
+        assert await asyncio.wait_for(received.get(), timeout=30) == 'PID-TEST'
+    finally:
+        engine.stop()
+    assert not engine.workers._tasks
@@ -0,0 +1,77 @@
+import pytest
+from SmartApi.smartWebSocketV2 import SmartWebSocketV2
+from app.core.tick_decoder import (
+    TickDecoder, encode_tick, LTP_MODE, QUOTE_MODE, SNAP_QUOTE_MODE,
+    LTP_PACKET_SIZE, QUOTE_PACKET_SIZE, SNAP_QUOTE_PACKET_SIZE
+)
+
+def _snap_quote_tick():
+    return {
+        'subscription_mode': SNAP_QUOTE_MODE,
+        'exchange_type': 1,
+        'token': '3045',
+        'sequence_number': 42,
+        'exchange_timestamp': 1722151800000,
+        'ltp': 812.35,
+        'last_traded_quantity': 10,
+        'average_price': 810.5,
+        'volume': 123456,
+        'total_buy_quantity': 1500.0,
+        'total_sell_quantity': 900.0,
+        'open': 805.0,
+        'high': 815.2,
+        'low': 801.1,
+        'close': 806.75,
+        'last_traded_timestamp': 1722151799,
+        'open_interest': 0,
+        'open_interest_change_percentage': 0,
+        'upper_circuit_limit': 887.4,
+        'lower_circuit_limit': 726.1,
+        'week_52_high': 912.0,
+        'week_52_low': 600.65,
+        'best_5_buy': [{'quantity': 100 + i, 'price': 812.3 - i * 0.05, 'orders': i + 1} for i in range(5)],
+        'best_5_sell': [{'quantity': 200 + i, 'price': 812.4 + i * 0.05, 'orders': i + 2} for i in range(5)]
+    }
+
+def test_packet_sizes():
+    assert (LTP_PACKET_SIZE, QUOTE_PACKET_SIZE, SNAP_QUOTE_PACKET_SIZE) == (51, 123, 379)
+
+def test_snap_quote_round_trip():
+    tick = _snap_quote_tick()
+    decoded = TickDecoder().decode(encode_tick(tick))
+
+    assert decoded['token'] == '3045'
+    assert decoded['exchange'] == 'NSE'
+    assert decoded['ltp'] == pytest.approx(812.35)
+    assert decoded['volume'] == 123456
+    assert decoded['week_52_low'] == pytest.approx(600.65)
+    assert [level['quantity'] for level in decoded['best_5_buy']] == [100, 101, 102, 103, 104]
+    assert decoded['best_5_sell'][0]['price'] == pytest.approx(812.4)
+
+def test_matches_library_parser():
+    frame = encode_tick(_snap_quote_tick())
+    reference = SmartWebSocketV2._parse_binary_data(SmartWebSocketV2.__new__(SmartWebSocketV2), frame)
+    decoded = TickDecoder().decode(frame)
+
+    assert decoded['token'] == reference['token']
+    assert decoded['sequence_number'] == reference['sequence_number']
+    assert decoded['ltp'] * 100 == pytest.approx(reference['last_traded_price'])
+    assert decoded['close'] * 100 == pytest.approx(reference['closed_price'])
+    assert decoded['upper_circuit_limit'] * 100 == pytest.approx(reference['upper_circuit_limit'])
+
+def test_decode_burst_from_one_buffer():
+    ticks = [
+        {'subscription_mode': LTP_MODE, 'token': '3045', 'ltp': 812.35},
+        {'subscription_mode': QUOTE_MODE, 'token': '2885', 'ltp': 2950.1, 'volume': 77},
+        _snap_quote_tick()
+    ]
+    buffer = b''.join(encode_tick(tick) for tick in ticks)
+    decoded = TickDecoder().decode_buffer(buffer)
+
+    assert [tick['token'] for tick in decoded] == ['3045', '2885', '3045']
+    assert decoded[1]['volume'] == 77
+
+def test_truncated_packet_rejected():
+    frame = encode_tick({'subscription_mode': QUOTE_MODE, 'token': '3045', 'ltp': 1.0})
+    with pytest.raises(ValueError):
+        TickDecoder().decode(frame[:LTP_PACKET_SIZE + 10])
@@ -0,0 +1,123 @@
+import asyncio
+import threading
+import time
+import pytest
+from app.core.angel_client import AngelOneClient
+from app.core.tick_decoder import encode_tick
+from app.core.tick_queue import TickQueue, OverflowPolicy
+from app.core.websocket_handler import WebSocketHandler
+
+def _produce(queue: TickQueue, ticks):
+    thread = threading.Thread(target=lambda: [queue.put_threadsafe(t) for t in ticks])
+    thread.start()
+    return thread
+
+@pytest.mark.asyncio
+async def test_drop_oldest_keeps_newest_ticks():
+    queue = TickQueue(maxsize=10, policy=OverflowPolicy.DROP_OLDEST)
+    queue.bind(asyncio.get_running_loop())
+    _produce(queue, [{'token': '1', 'ltp': i} for i in range(100)]).join()
+
+    batch = await queue.get_batch()
+    assert [t['ltp'] for t in batch] == list(range(90, 100))
+    assert queue.dropped == 90
+
+@pytest.mark.asyncio
+async def test_conflate_keeps_latest_tick_per_symbol():
+    queue = TickQueue(maxsize=100, policy=OverflowPolicy.CONFLATE)
+    queue.bind(asyncio.get_running_loop())
+    ticks = [{'token': str(i % 3), 'ltp': i} for i in range(30)]
+    _produce(queue, ticks).join()
+
+    batch = await queue.get_batch()
+    assert {t['token']: t['ltp'] for t in batch} == {'0': 27, '1': 28, '2': 29}
+
+@pytest.mark.asyncio
+async def test_block_policy_loses_nothing():
+    queue = TickQueue(maxsize=5, policy=OverflowPolicy.BLOCK)
+    queue.bind(asyncio.get_running_loop())
+    thread = _produce(queue, [{'token': '1', 'ltp': i} for i in range(50)])
+
+    received = []
+    while len(received) < 50:
+        received.extend(t['ltp'] for t in await queue.get_batch())
+    thread.join()
+    assert received == list(range(50))
+    assert queue.dropped == 0
+
+@pytest.mark.asyncio
+async def test_feed_thread_ticks_reach_callbacks():
+    handler = WebSocketHandler(AngelOneClient())
+    received = []
+    done = asyncio.Event()
+
+    async def callback(data):
+        received.append(data['ltp'])
+        if len(received) == 3:
+            done.set()
+
+    handler.add_callback("test", callback)
+    handler._start_dispatcher()
+    frame = b''.join(encode_tick({'token': '3045', 'ltp': p}) for p in (1.0, 2.0, 3.0))
+    threading.Thread(target=handler._on_data, args=(None, frame)).start()
+
+    await asyncio.wait_for(done.wait(), timeout=2)
+    await handler.disconnect()
+    assert received == [1.0, 2.0, 3.0]
+
+@pytest.mark.asyncio
+async def test_conflating_callback_skips_stale_ticks():
+    handler = WebSocketHandler(AngelOneClient())
+    seen_all, seen_latest = [], []
+    release = asyncio.Event()
+
+    async def fast(data):
+        seen_all.append((data['token'], data['ltp']))
+
+    async def slow(data):
+        seen_latest.append((data['token'], data['ltp']))
+        await release.wait()
+
+    handler.add_callback("fast", fast)
+    handler.add_callback("slow", slow, mode="conflate")
+    handler._start_dispatcher()
+
+    handler.tick_queue.put_threadsafe({'token': '1', 'ltp': 0})
+    while not seen_latest:
+        await asyncio.sleep(0.01)
+    for i in range(1, 10):
+        handler.tick_queue.put_threadsafe({'token': str(i % 2), 'ltp': i})
+    while len(seen_all) < 10:
+        await asyncio.sleep(0.01)
+
+    release.set()
+    while len(seen_latest) < 3:
+        await asyncio.sleep(0.01)
+    await handler.disconnect()
+
+    assert len(seen_all) == 10
+    assert seen_latest == [('1', 0), ('1', 9), ('0', 8)]
+
+@pytest.mark.asyncio
+async def test_reconnect_gap_is_backfilled(monkeypatch):
+    handler = WebSocketHandler(AngelOneClient())
+    now_minute = int(time.time() // 60) * 60
+    handler.token_symbols['3045'] = 'SBIN-EQ'
+    handler.last_tick_time['3045'] = now_minute - 270
+    requests = []
+
+    async def get_candle_data(exchange, token, interval, from_date, to_date):
+        requests.append((exchange, token, interval))
+        return [{'timestamp': now_minute - 60 * i, 'close': 1.0} for i in range(6, -1, -1)]
+
+    monkeypatch.setattr(handler.angel_client, "get_candle_data", get_candle_data)
+    received = {}
+
+    async def on_backfill(symbol, candles):
+        received[symbol] = [c['timestamp'] for c in candles]
+
+    handler.add_backfill_callback("bars", on_backfill)
+    await handler._backfill_gap({'3045': 1}, {'3045': now_minute - 200})
+
+    assert requests == [('NSE', '3045', 'ONE_MINUTE')]
+    assert received['SBIN-EQ'] == [now_minute - 60 * i for i in range(5, 0, -1)]
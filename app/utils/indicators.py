@@ -1,6 +1,8 @@
+import math
+from collections import deque
 import pandas as pd
 import numpy as np
-from typing import Dict
+from typing import Dict, Optional
 
 def calculate_sma(data: pd.Series, period: int) -> pd.Series:
     """Calculate Simple Moving Average"""
@@ -18,6 +20,25 @@ def calculate_rsi(data: pd.Series, period: int = 14) -> pd.Series:
     rs = gain / loss
     return 100 - (100 / (1 + rs))
 
+def calculate_wilder_rsi(data: pd.Series, period: int = 14) -> pd.Series:
+    """Calculate RSI with Wilder smoothing (seeded with the simple average of the first period)"""
+    delta = data.diff()
+    gain = delta.clip(lower=0)
+    loss = -delta.clip(upper=0)
+    
+    def wilder(series: pd.Series) -> pd.Series:
+        smoothed = pd.Series(np.nan, index=series.index)
+        if len(series) <= period:
+            return smoothed
+        smoothed.iloc[period] = series.iloc[1:period + 1].mean()
+        tail = pd.concat([smoothed.iloc[period:period + 1], series.iloc[period + 1:]])
+        smoothed.iloc[period:] = tail.ewm(alpha=1 / period, adjust=False).mean().values
+        return smoothed
+    
+    avg_gain = wilder(gain)
+    avg_loss = wilder(loss)
+    return 100 - (100 / (1 + avg_gain / avg_loss))
+
 def calculate_bollinger_bands(data: pd.Series, period: int = 20, std_dev: float = 2.0) -> Dict[str, pd.Series]:
     """Calculate Bollinger Bands"""
     sma = calculate_sma(data, period)
@@ -41,4 +62,219 @@ def calculate_macd(data: pd.Series, fast_period: int = 12, slow_period: int = 26
         'macd': macd,
         'signal': signal,
         'histogram': histogram
-    }
\ No newline at end of file
+    }
+
+def _as_matrix(prices) -> np.ndarray:
+    """(symbols x time) float64 matrix; a single series becomes one row"""
+    return np.atleast_2d(np.asarray(prices, dtype=np.float64))
+
+def _rolling_mean(x: np.ndarray, period: int) -> np.ndarray:
+    """Rolling mean along the time axis from one cumulative sum"""
+    out = np.full(x.shape, np.nan)
+    if x.shape[1] < period:
+        return out
+    csum = np.zeros((x.shape[0], x.shape[1] + 1))
+    np.cumsum(x, axis=1, out=csum[:, 1:])
+    out[:, period - 1:] = (csum[:, period:] - csum[:, :-period]) / period
+    return out
+
+def _smooth(x: np.ndarray, alpha: float, start: int = 0) -> np.ndarray:
+    """Exponential smoothing along the time axis, seeded with column ``start``.
+
+    The loop runs over time only; every step updates all symbols at once on a
+    contiguous (time x symbols) copy.
+    """
+    rows = np.ascontiguousarray(x.T)
+    out = np.full(rows.shape, np.nan)
+    if rows.shape[0] <= start:
+        return out.T
+    out[start] = rows[start]
+    for t in range(start + 1, rows.shape[0]):
+        out[t] = out[t - 1] + alpha * (rows[t] - out[t - 1])
+    return out.T
+
+def batch_sma(prices: np.ndarray, period: int) -> np.ndarray:
+    """Calculate Simple Moving Average for every row of a (symbols x time) matrix"""
+    return _rolling_mean(_as_matrix(prices), period)
+
+def batch_ema(prices: np.ndarray, period: int) -> np.ndarray:
+    """Calculate Exponential Moving Average for every row, as calculate_ema"""
+    return _smooth(_as_matrix(prices), 2 / (period + 1))
+
+def batch_rsi(prices: np.ndarray, period: int = 14, wilder: bool = False) -> np.ndarray:
+    """Calculate RSI for every row, as calculate_rsi (or calculate_wilder_rsi when ``wilder``)"""
+    x = _as_matrix(prices)
+    gain = np.zeros(x.shape)
+    loss = np.zeros(x.shape)
+    delta = np.diff(x, axis=1)
+    np.maximum(delta, 0, out=gain[:, 1:])
+    np.maximum(-delta, 0, out=loss[:, 1:])
+    
+    if wilder:
+        avg_gain = np.full(x.shape, np.nan)
+        avg_loss = np.full(x.shape, np.nan)
+        if x.shape[1] > period:
+            # Seeded with the simple average of the first period of changes
+            avg_gain[:, period] = gain[:, 1:period + 1].mean(axis=1)
+            avg_loss[:, period] = loss[:, 1:period + 1].mean(axis=1)
+            avg_gain[:, period + 1:] = gain[:, period + 1:]
+            avg_loss[:, period + 1:] = loss[:, period + 1:]
+            avg_gain = _smooth(avg_gain, 1 / period, start=period)
+            avg_loss = _smooth(avg_loss, 1 / period, start=period)
+    else:
+        avg_gain = _rolling_mean(gain, period)
+        avg_loss = _rolling_mean(loss, period)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+def batch_bollinger_bands(prices: np.ndarray, period: int = 20, std_dev: float = 2.0) -> Dict[str, np.ndarray]:
+    """Calculate Bollinger Bands for every row, as calculate_bollinger_bands"""
+    x = _as_matrix(prices)
+    sma = _rolling_mean(x, period)
+    # Variance from rolling sums of squares; centring each row first keeps
+    # the subtraction from cancelling away the precision
+    centred = x - x[:, :1]
+    mean = _rolling_mean(centred, period)
+    variance = (_rolling_mean(centred * centred, period) - mean * mean) * (period / (period - 1))
+    std = np.sqrt(np.maximum(variance, 0))
+    return {
+        'upper': sma + (std * std_dev),
+        'middle': sma,
+        'lower': sma - (std * std_dev)
+    }
+
+def batch_macd(prices: np.ndarray, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9) -> Dict[str, np.ndarray]:
+    """Calculate MACD for every row, as calculate_macd"""
+    x = _as_matrix(prices)
+    macd = _smooth(x, 2 / (fast_period + 1)) - _smooth(x, 2 / (slow_period + 1))
+    signal = _smooth(macd, 2 / (signal_period + 1))
+    return {
+        'macd': macd,
+        'signal': signal,
+        'histogram': macd - signal
+    }
+
+class SMA:
+    """Streaming Simple Moving Average using a running sum"""
+    
+    def __init__(self, period: int):
+        self.period = period
+        self.value: Optional[float] = None
+        self._window = deque()
+        self._sum = 0.0
+    
+    def update(self, x: float) -> Optional[float]:
+        self._window.append(x)
+        self._sum += x
+        if len(self._window) > self.period:
+            self._sum -= self._window.popleft()
+        if len(self._window) == self.period:
+            self.value = self._sum / self.period
+        return self.value
+
+class EMA:
+    """Streaming Exponential Moving Average, equivalent to ewm(span=period, adjust=False)"""
+    
+    def __init__(self, period: int):
+        self.period = period
+        self.alpha = 2 / (period + 1)
+        self.value: Optional[float] = None
+    
+    def update(self, x: float) -> float:
+        if self.value is None:
+            self.value = x
+        else:
+            self.value += self.alpha * (x - self.value)
+        return self.value
+
+class RSI:
+    """Streaming RSI with Wilder smoothing, equivalent to calculate_wilder_rsi"""
+    
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.value: Optional[float] = None
+        self._prev: Optional[float] = None
+        self._count = 0
+        self._avg_gain = 0.0
+        self._avg_loss = 0.0
+    
+    def update(self, x: float) -> Optional[float]:
+        if self._prev is None:
+            self._prev = x
+            return None
+        delta = x - self._prev
+        self._prev = x
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        
+        self._count += 1
+        if self._count <= self.period:
+            # Seed with the simple average of the first period
+            self._avg_gain += gain / self.period
+            self._avg_loss += loss / self.period
+            if self._count < self.period:
+                return None
+        else:
+            self._avg_gain += (gain - self._avg_gain) / self.period
+            self._avg_loss += (loss - self._avg_loss) / self.period
+        
+        if self._avg_loss == 0:
+            self.value = 100.0 if self._avg_gain > 0 else math.nan
+        else:
+            self.value = 100 - (100 / (1 + self._avg_gain / self._avg_loss))
+        return self.value
+
+class BollingerBands:
+    """Streaming Bollinger Bands using a sliding-window Welford variance"""
+    
+    def __init__(self, period: int = 20, std_dev: float = 2.0):
+        self.period = period
+        self.std_dev = std_dev
+        self.value: Optional[Dict[str, float]] = None
+        self._window = deque()
+        self._mean = 0.0
+        self._m2 = 0.0
+    
+    def update(self, x: float) -> Optional[Dict[str, float]]:
+        self._window.append(x)
+        n = len(self._window)
+        delta = x - self._mean
+        self._mean += delta / n
+        self._m2 += delta * (x - self._mean)
+        
+        if n > self.period:
+            old = self._window.popleft()
+            n -= 1
+            delta = old - self._mean
+            self._mean -= delta / n
+            self._m2 -= delta * (old - self._mean)
+        
+        if n == self.period:
+            # Sample standard deviation, as pandas rolling().std()
+            std = math.sqrt(max(self._m2, 0.0) / (n - 1))
+            self.value = {
+                'upper': self._mean + std * self.std_dev,
+                'middle': self._mean,
+                'lower': self._mean - std * self.std_dev
+            }
+        return self.value
+
+class MACD:
+    """Streaming MACD, equivalent to calculate_macd"""
+    
+    def __init__(self, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9):
+        self._fast = EMA(fast_period)
+        self._slow = EMA(slow_period)
+        self._signal = EMA(signal_period)
+        self.value: Optional[Dict[str, float]] = None
+    
+    def update(self, x: float) -> Dict[str, float]:
+        macd = self._fast.update(x) - self._slow.update(x)
+        signal = self._signal.update(macd)
+        self.value = {
+            'macd': macd,
+            'signal': signal,
+            'histogram': macd - signal
+        }
+        return self.value
@@ -9,6 +9,36 @@ order_execution_time = Histogram('trading_bot_order_execution_seconds', 'Order e
 position_value = Gauge('trading_bot_position_value', 'Current position value', ['symbol'])
 pnl_gauge = Gauge('trading_bot_pnl', 'Current P&L', ['symbol'])
 api_errors = Counter('trading_bot_api_errors_total', 'Total API errors', ['endpoint'])
+tick_queue_depth = Gauge('trading_bot_tick_queue_depth', 'Ticks waiting in the ingestion queue')
+ticks_dropped = Counter('trading_bot_ticks_dropped_total', 'Ticks dropped or conflated before delivery', ['reason'])
+indicator_cache_hits = Counter('trading_bot_indicator_cache_hits_total', 'Indicator values served from the cache', ['indicator'])
+indicator_cache_misses = Counter('trading_bot_indicator_cache_misses_total', 'Indicator values computed on a cache miss', ['indicator'])
+strategy_latency = Histogram(
+    'trading_bot_strategy_latency_seconds', 'Time for a strategy to evaluate one tick', ['strategy'],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+strategy_timeouts = Counter('trading_bot_strategy_timeouts_total', 'Strategy evaluations skipped for exceeding their deadline', ['strategy'])
+ltp_lookups = Counter('trading_bot_ltp_lookups_total', 'LTP lookups by how they were answered', ['source'])
+ltp_batch_size = Histogram(
+    'trading_bot_ltp_batch_size', 'Symbols per bulk LTP quote request',
+    buckets=(1, 2, 5, 10, 20, 30, 40, 50)
+)
+broker_requests_in_flight = Gauge('trading_bot_broker_requests_in_flight', 'SmartAPI calls running', ['endpoint'])
+broker_request_latency = Histogram(
+    'trading_bot_broker_request_seconds', 'SmartAPI call latency', ['endpoint'],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+broker_queue_depth = Gauge('trading_bot_broker_queue_depth', 'SmartAPI calls waiting for a rate limit token or slot', ['endpoint'])
+broker_queue_wait = Histogram(
+    'trading_bot_broker_queue_wait_seconds', 'Time a SmartAPI call waited before being sent', ['endpoint'],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+redis_command_latency = Histogram(
+    'trading_bot_redis_command_seconds', 'Redis round-trip latency', ['command'],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+)
+redis_pool_connections = Gauge('trading_bot_redis_pool_connections', 'Redis pool connections', ['state'])
+indicator_cache_bytes = Gauge('trading_bot_indicator_cache_bytes', 'Estimated size of the indicator cache')
 
 def track_order(strategy: str):
     """Track order placement"""
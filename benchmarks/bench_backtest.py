@@ -0,0 +1,36 @@
+"""Benchmark the vectorized backtester on years of one-minute bars.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_backtest
+"""
+import argparse
+import time
+import numpy as np
+from app.backtest.data import history_from_arrays
+from app.backtest.engine import Backtester
+from app.strategies.sma_crossover import SMAStrategy
+from app.strategies.rsi_strategy import RSIStrategy
+from app.strategies.scalping_strategy import ScalpingStrategy
+
+BARS_PER_YEAR = 252 * 375
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--years', type=int, default=5)
+    args = parser.parse_args()
+
+    count = args.years * BARS_PER_YEAR
+    close = np.random.default_rng(13).normal(0, 0.05, count).cumsum() + 500
+    data = history_from_arrays(np.arange(count) * 60.0, close, close + 0.1, close - 0.1, close, np.ones(count))
+    backtester = Backtester()
+
+    print(f"--- {count:,} one-minute bars ({args.years} years)")
+    for strategy in (SMAStrategy({}), RSIStrategy({}), ScalpingStrategy({})):
+        start = time.perf_counter()
+        result = backtester.run(strategy, data)
+        elapsed = time.perf_counter() - start
+        print(f"{strategy.name:<20} {elapsed:>8.2f}s {len(result.fills):>10,} fills")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Benchmark batched indicator kernels against the per-series pandas functions.
+
+Each run computes one indicator for a whole (symbols x bars) universe, as a
+scan after a bar close would. Run from the repository root:
+
+    python -m benchmarks.bench_indicator_kernels
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from app.utils.indicators import (
+    calculate_sma, calculate_ema, calculate_rsi, calculate_bollinger_bands, calculate_macd,
+    batch_sma, batch_ema, batch_rsi, batch_bollinger_bands, batch_macd
+)
+
+INDICATORS = {
+    'SMA(20)': (lambda s: calculate_sma(s, 20), lambda m: batch_sma(m, 20)),
+    'EMA(20)': (lambda s: calculate_ema(s, 20), lambda m: batch_ema(m, 20)),
+    'RSI(14)': (lambda s: calculate_rsi(s, 14), lambda m: batch_rsi(m, 14)),
+    'Bollinger(20, 2)': (lambda s: calculate_bollinger_bands(s, 20, 2.0), lambda m: batch_bollinger_bands(m, 20, 2.0)),
+    'MACD(12, 26, 9)': (calculate_macd, batch_macd)
+}
+
+def best_time(fn, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--symbols', type=int, nargs='+', default=[500, 2000])
+    parser.add_argument('--bars', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(11)
+    for symbols in args.symbols:
+        matrix = rng.normal(0, 1, (symbols, args.bars)).cumsum(axis=1) + 1000
+        series = [pd.Series(row) for row in matrix]
+        print(f"--- {symbols} symbols x {args.bars} bars")
+        print(f"{'indicator':<18} {'pandas loop':>12} {'batched':>12} {'speedup':>9}")
+        for name, (per_series, batched) in INDICATORS.items():
+            pandas_time = best_time(lambda: [per_series(s) for s in series], args.repeat)
+            batch_time = best_time(lambda: batched(matrix), args.repeat)
+            print(f"{name:<18} {pandas_time * 1e3:>10.1f}ms {batch_time * 1e3:>10.1f}ms {pandas_time / batch_time:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Load test the broker REST path and the feed against the local mock SmartAPI.
+
+Orders and LTP lookups go through SmartConnect exactly as AngelOneClient
+sends them, from a thread pool sized like a burst of strategy signals at
+market open. Feed connections stream binary ticks that are decoded with
+TickDecoder. Run from the repository root:
+
+    python -m benchmarks.bench_mock_smartapi --latency-ms 30 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import websockets
+from SmartApi import SmartConnect
+from app.core.tick_decoder import TickDecoder
+from app.mock.smartapi import MockSmartAPI
+
+def rest_load(url: str, requests: int, concurrency: int):
+    api = SmartConnect(api_key="bench", root=url)
+    api.generateSession("BENCH", "pin", "000000")
+    order = {'variety': 'NORMAL', 'tradingsymbol': 'SBIN-EQ', 'symboltoken': '3045', 'transactiontype': 'BUY',
+             'exchange': 'NSE', 'ordertype': 'MARKET', 'producttype': 'INTRADAY', 'duration': 'DAY',
+             'price': '0', 'quantity': '1'}
+
+    def call(i):
+        start = time.perf_counter()
+        # Every order is preceded by its LTP lookup, as in OrderManager.place_order
+        ok = api.ltpData("NSE", "SBIN-EQ", "3045").get('status') and api.placeOrderFullResponse(order).get('status')
+        return time.perf_counter() - start, bool(ok)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(call, range(requests)))
+    elapsed = time.perf_counter() - start
+    latencies = np.array([r[0] for r in results]) * 1000
+    print(f"orders            {requests} in {elapsed:.2f}s ({requests / elapsed:,.0f}/s), "
+          f"{sum(not r[1] for r in results)} failed")
+    print(f"order path ms     p50 {np.percentile(latencies, 50):.1f}  p99 {np.percentile(latencies, 99):.1f}")
+    return api
+
+async def feed_load(url: str, api: SmartConnect, connections: int, tokens: int, seconds: float):
+    headers = {'Authorization': api.access_token, 'x-api-key': 'bench', 'x-client-code': 'BENCH',
+               'x-feed-token': api.feed_token}
+    decoder = TickDecoder()
+    counts = [0] * connections
+
+    async def consume(index):
+        async with websockets.connect(url.replace("http", "ws") + "/smart-stream", additional_headers=headers,
+                                      max_queue=None) as ws:
+            shard = [str(10000 + t) for t in range(index, tokens, connections)]
+            await ws.send(json.dumps({'action': 1, 'params': {'mode': 2, 'tokenList': [
+                {'exchangeType': 1, 'tokens': shard}]}}))
+            deadline = time.perf_counter() + seconds
+            while time.perf_counter() < deadline:
+                try:
+                    frame = await asyncio.wait_for(ws.recv(), timeout=deadline - time.perf_counter())
+                except asyncio.TimeoutError:
+                    break
+                decoder.decode(frame)
+                counts[index] += 1
+
+    await asyncio.gather(*(consume(i) for i in range(connections)))
+    print(f"feed ticks        {sum(counts):,} over {connections} connections ({sum(counts) / seconds:,.0f}/s)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--orders', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=30)
+    parser.add_argument('--latency-ms', type=float, default=20.0)
+    parser.add_argument('--jitter-ms', type=float, default=10.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--tick-rate', type=float, default=5000.0, help="per feed connection")
+    parser.add_argument('--connections', type=int, default=3)
+    parser.add_argument('--tokens', type=int, default=1500)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    args = parser.parse_args()
+
+    mock = MockSmartAPI(args.latency_ms, args.jitter_ms, args.error_rate, args.tick_rate, seed=7)
+    with mock.running() as url:
+        api = rest_load(url, args.orders, args.concurrency)
+        asyncio.run(feed_load(url, api, args.connections, args.tokens, args.seconds))
+
+if __name__ == "__main__":
+    main()
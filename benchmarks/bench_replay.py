@@ -0,0 +1,53 @@
+"""Load test the live tick path by replaying a synthetic busy session.
+
+Ticks go through the decoder, ingestion queue, bar aggregator and
+StrategyEngine into a simulated broker. Run from the repository root:
+
+    python -m benchmarks.bench_replay
+"""
+import argparse
+import asyncio
+import numpy as np
+from app.backtest.replay import ReplaySession, load_ticks
+from app.strategies.scalping_strategy import ScalpingStrategy
+from app.strategies.sma_crossover import SMAStrategy
+from app.strategies.rsi_strategy import RSIStrategy
+
+def make_ticks(count: int, symbols: int):
+    rng = np.random.default_rng(17)
+    prices = 500 + rng.normal(0, 0.2, (count // symbols + 1, symbols)).cumsum(axis=0)
+    return [
+        {
+            'token': str(10000 + i % symbols),
+            'symbol': f"SYM{i % symbols}-EQ",
+            'exchange_timestamp': 1722151800000 + i * 100,
+            'ltp': float(round(prices[i // symbols, i % symbols], 2))
+        }
+        for i in range(count)
+    ]
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--ticks', type=int, default=200000)
+    parser.add_argument('--symbols', type=int, default=50)
+    parser.add_argument('--file', help="replay a recorded JSON lines file instead")
+    parser.add_argument('--speed', type=float, default=None, help="1 = real time; default as fast as possible")
+    parser.add_argument('--conflate', action='store_true', help="deliver ticks to strategies as in production")
+    args = parser.parse_args()
+
+    ticks = load_ticks(args.file) if args.file else make_ticks(args.ticks, args.symbols)
+    symbols = sorted({t['symbol'] for t in ticks})
+    strategies = []
+    for symbol in symbols:
+        strategies.append(ScalpingStrategy({'name': symbol, 'symbol': symbol}))
+        strategies.append(SMAStrategy({'symbol': symbol, 'short_period': 5, 'long_period': 20}))
+        strategies.append(RSIStrategy({'symbol': symbol}))
+    for i, strategy in enumerate(strategies):
+        strategy.name = f"{strategy.name}_{i}"
+
+    stats = await ReplaySession(strategies, conflate=args.conflate).run(ticks, speed=args.speed)
+    for key, value in stats.items():
+        print(f"{key:<18} {value:,.3f}" if isinstance(value, float) else f"{key:<18} {value}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
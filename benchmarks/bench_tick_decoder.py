@@ -0,0 +1,61 @@
+"""Benchmark SmartWebSocketV2 tick decoding throughput on a single core.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_tick_decoder
+"""
+import argparse
+import random
+import time
+from SmartApi.smartWebSocketV2 import SmartWebSocketV2
+from app.core.tick_decoder import TickDecoder, encode_tick, LTP_MODE, QUOTE_MODE, SNAP_QUOTE_MODE
+
+MODES = {'LTP': LTP_MODE, 'QUOTE': QUOTE_MODE, 'SNAP_QUOTE': SNAP_QUOTE_MODE}
+
+def make_frames(mode: int, count: int, symbols: int = 1000):
+    rng = random.Random(7)
+    frames = []
+    for i in range(count):
+        price = 100 + rng.random() * 1000
+        frames.append(encode_tick({
+            'subscription_mode': mode,
+            'token': str(1000 + i % symbols),
+            'sequence_number': i,
+            'exchange_timestamp': 1722151800000 + i,
+            'ltp': price,
+            'volume': i,
+            'open': price, 'high': price, 'low': price, 'close': price,
+            'best_5_buy': [{'quantity': 1, 'price': price, 'orders': 1}] * 5,
+            'best_5_sell': [{'quantity': 1, 'price': price, 'orders': 1}] * 5
+        }))
+    return frames
+
+def run(label: str, fn, count: int, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    rate = count / best
+    print(f"{label:<32} {rate:>14,.0f} ticks/s")
+    return rate
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--ticks', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    decoder = TickDecoder()
+    library = SmartWebSocketV2.__new__(SmartWebSocketV2)
+
+    for name, mode in MODES.items():
+        frames = make_frames(mode, args.ticks)
+        buffer = b''.join(frames)
+        print(f"--- {name} ({len(frames[0])} bytes/packet)")
+        run('TickDecoder.decode_many', lambda: decoder.decode_many(frames), args.ticks, args.repeat)
+        run('TickDecoder.decode_buffer', lambda: decoder.decode_buffer(buffer), args.ticks, args.repeat)
+        run('SmartWebSocketV2 parser', lambda: [library._parse_binary_data(f) for f in frames], args.ticks, args.repeat)
+
+if __name__ == "__main__":
+    main()